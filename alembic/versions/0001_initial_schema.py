@@ -0,0 +1,95 @@
+"""Initial schema
+
+Tables as originally created by Base.metadata.create_all. Databases that were
+created that way can run `alembic upgrade head` directly: every CREATE here is
+guarded with IF NOT EXISTS.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ASSET_TYPES = ("STOCK", "BOND", "ETF", "CASH", "CRYPTO", "COMMODITY")
+TRANSACTION_TYPES = ("BUY", "SELL", "DIVIDEND", "SPLIT", "DEPOSIT", "WITHDRAWAL")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "portfolios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_portfolios_id", "portfolios", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "assets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(20), nullable=False),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("asset_type", sa.Enum(*ASSET_TYPES, name="assettype"), nullable=False),
+        sa.Column("exchange", sa.String(50), nullable=True),
+        sa.Column("currency", sa.String(3), nullable=True),
+        sa.Column("current_price", sa.Numeric(10, 4), nullable=True),
+        sa.Column("last_updated", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_assets_id", "assets", ["id"], if_not_exists=True)
+    op.create_index("ix_assets_symbol", "assets", ["symbol"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "holdings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("portfolio_id", sa.Integer(), sa.ForeignKey("portfolios.id"), nullable=False),
+        sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+        sa.Column("quantity", sa.Numeric(15, 6), nullable=False),
+        sa.Column("average_cost", sa.Numeric(10, 4), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_holdings_id", "holdings", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("portfolio_id", sa.Integer(), sa.ForeignKey("portfolios.id"), nullable=False),
+        sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id"), nullable=False),
+        sa.Column(
+            "transaction_type", sa.Enum(*TRANSACTION_TYPES, name="transactiontype"), nullable=False
+        ),
+        sa.Column("quantity", sa.Numeric(15, 6), nullable=False),
+        sa.Column("price", sa.Numeric(10, 4), nullable=False),
+        sa.Column("fees", sa.Numeric(10, 4), nullable=True),
+        sa.Column("total_amount", sa.Numeric(15, 4), nullable=False),
+        sa.Column("transaction_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("notes", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_transactions_id", "transactions", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("transactions")
+    op.drop_table("holdings")
+    op.drop_table("assets")
+    op.drop_table("portfolios")
@@ -0,0 +1,77 @@
+"""Composite indexes for hot lookups
+
+Adds the indexes behind get_by_portfolio_and_asset, the keyset-paginated
+transaction listings and the analytics joins, and makes (portfolio_id,
+asset_id) unique on holdings. Duplicate holdings left over from before the
+constraint are merged into the oldest row first (quantities summed, average
+cost weighted by quantity).
+
+Revision ID: 0002_hot_lookup_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-19 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_hot_lookup_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _merge_duplicate_holdings() -> None:
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT portfolio_id, asset_id, MIN(id) AS keep_id, SUM(quantity) AS quantity, "
+        "SUM(quantity * average_cost) AS cost "
+        "FROM holdings GROUP BY portfolio_id, asset_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    for row in duplicates:
+        average_cost = row.cost / row.quantity if row.quantity else 0
+        bind.execute(
+            sa.text("UPDATE holdings SET quantity = :q, average_cost = :c WHERE id = :id"),
+            {"q": row.quantity, "c": average_cost, "id": row.keep_id},
+        )
+        bind.execute(
+            sa.text(
+                "DELETE FROM holdings WHERE portfolio_id = :p AND asset_id = :a AND id != :id"
+            ),
+            {"p": row.portfolio_id, "a": row.asset_id, "id": row.keep_id},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _merge_duplicate_holdings()
+    op.create_index(
+        "uq_holdings_portfolio_asset", "holdings", ["portfolio_id", "asset_id"],
+        unique=True, if_not_exists=True,
+    )
+    op.create_index(
+        "ix_holdings_portfolio_id_id", "holdings", ["portfolio_id", "id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_transactions_portfolio_date_id", "transactions",
+        ["portfolio_id", "transaction_date", "id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_transactions_asset_date_id", "transactions",
+        ["asset_id", "transaction_date", "id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_transactions_date_id", "transactions", ["transaction_date", "id"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_date_id", table_name="transactions")
+    op.drop_index("ix_transactions_asset_date_id", table_name="transactions")
+    op.drop_index("ix_transactions_portfolio_date_id", table_name="transactions")
+    op.drop_index("ix_holdings_portfolio_id_id", table_name="holdings")
+    op.drop_index("uq_holdings_portfolio_asset", table_name="holdings")
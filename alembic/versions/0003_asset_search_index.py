@@ -0,0 +1,59 @@
+"""Full-text search index over asset symbol and name
+
+Creates the assets_fts FTS5 table with its sync triggers and backfills it from
+the existing assets. SQLite only; other databases keep the substring search.
+
+Revision ID: 0003_asset_search_index
+Revises: 0002_hot_lookup_indexes
+Create Date: 2026-10-19 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_asset_search_index"
+down_revision: Union[str, Sequence[str], None] = "0002_hot_lookup_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5(
+        symbol, name,
+        content='assets', content_rowid='id',
+        tokenize="unicode61 tokenchars '.-'", prefix='1 2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_ai AFTER INSERT ON assets BEGIN
+        INSERT INTO assets_fts(rowid, symbol, name) VALUES (new.id, new.symbol, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_ad AFTER DELETE ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, symbol, name)
+        VALUES ('delete', old.id, old.symbol, old.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_au AFTER UPDATE OF symbol, name ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, symbol, name)
+        VALUES ('delete', old.id, old.symbol, old.name);
+        INSERT INTO assets_fts(rowid, symbol, name) VALUES (new.id, new.symbol, new.name);
+    END""",
+    "INSERT INTO assets_fts(assets_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for statement in STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS assets_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS assets_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS assets_fts_ai")
+    op.execute("DROP TABLE IF EXISTS assets_fts")
@@ -0,0 +1,76 @@
+"""Background jobs table and daily price history
+
+Adds the jobs table behind the background job runner and the price_history
+table that history backfill jobs write daily bars into.
+
+Revision ID: 0004_jobs_and_price_history
+Revises: 0003_asset_search_index
+Create Date: 2026-10-19 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_jobs_and_price_history"
+down_revision: Union[str, Sequence[str], None] = "0003_asset_search_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JOB_TYPES = ("PRICE_REFRESH", "BULK_IMPORT", "HISTORY_BACKFILL", "HOLDINGS_REBUILD")
+JOB_STATUSES = ("QUEUED", "RUNNING", "SUCCEEDED", "FAILED")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_type", sa.Enum(*JOB_TYPES, name="jobtype"), nullable=False),
+        sa.Column("status", sa.Enum(*JOB_STATUSES, name="jobstatus"), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("total_items", sa.Integer(), nullable=True),
+        sa.Column("completed_items", sa.Integer(), nullable=False),
+        sa.Column("failed_items", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=False),
+        sa.Column("error", sa.String(length=1000), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_jobs_id"), "jobs", ["id"], unique=False)
+    op.create_index("ix_jobs_status_type_id", "jobs", ["status", "job_type", "id"], unique=False)
+
+    op.create_table(
+        "price_history",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("open", sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column("high", sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column("low", sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column("close", sa.Numeric(precision=14, scale=4), nullable=False),
+        sa.Column("volume", sa.BigInteger(), nullable=True),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_price_history_id"), "price_history", ["id"], unique=False)
+    op.create_index(
+        "uq_price_history_asset_date", "price_history", ["asset_id", "date"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_price_history_asset_date", table_name="price_history")
+    op.drop_index(op.f("ix_price_history_id"), table_name="price_history")
+    op.drop_table("price_history")
+    op.drop_index("ix_jobs_status_type_id", table_name="jobs")
+    op.drop_index(op.f("ix_jobs_id"), table_name="jobs")
+    op.drop_table("jobs")
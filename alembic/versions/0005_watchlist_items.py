@@ -0,0 +1,46 @@
+"""Portfolio watchlists
+
+Adds watchlist_items: assets a portfolio follows without holding them. The
+refresh planner keeps their prices as fresh as held assets'.
+
+Revision ID: 0005_watchlist_items
+Revises: 0004_jobs_and_price_history
+Create Date: 2026-10-19 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_watchlist_items"
+down_revision: Union[str, Sequence[str], None] = "0004_jobs_and_price_history"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "watchlist_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("portfolio_id", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["portfolio_id"], ["portfolios.id"]),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_watchlist_items_id"), "watchlist_items", ["id"], unique=False)
+    op.create_index(
+        "uq_watchlist_items_portfolio_asset", "watchlist_items", ["portfolio_id", "asset_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_watchlist_items_portfolio_asset", table_name="watchlist_items")
+    op.drop_index(op.f("ix_watchlist_items_id"), table_name="watchlist_items")
+    op.drop_table("watchlist_items")
@@ -1,8 +1,10 @@
 from fastapi import APIRouter
-from app.api.endpoints import portfolios, assets, holdings, transactions
+from app.api.endpoints import portfolios, assets, holdings, transactions, jobs, admin
 
 api_router = APIRouter()
 api_router.include_router(portfolios.router, prefix="/portfolios", tags=["portfolios"])
 api_router.include_router(assets.router, prefix="/assets", tags=["assets"])
 api_router.include_router(holdings.router, prefix="/holdings", tags=["holdings"])
-api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
\ No newline at end of file
+api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
\ No newline at end of file
@@ -0,0 +1,63 @@
+import secrets
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.instrumentation import slow_query_log
+from app.core.profiling import profile_store
+from app.core.tracing import TracedRoute, stage_breakdown
+from app.providers import get_provider
+
+router = APIRouter(route_class=TracedRoute)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only when it carries the configured admin token"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles", response_model=List[Dict], dependencies=[Depends(require_admin)])
+def list_profiles():
+    """List stored request profiles, newest first"""
+    return profile_store.list()
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)]
+)
+def read_profile(profile_id: str):
+    """Get one request profile in collapsed-stack format"""
+    body = profile_store.read(profile_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(body)
+
+
+@router.get("/traces/summary", dependencies=[Depends(require_admin)])
+def trace_summary(limit: int = Query(10000, ge=1, description="Most recent traces to aggregate")):
+    """Mean request time and mean time per stage for each route, from the JSONL trace file"""
+    if settings.tracing_exporter != "jsonl":
+        raise HTTPException(status_code=404, detail="JSONL trace export is not enabled")
+    return stage_breakdown(settings.tracing_jsonl_path, limit=limit)
+
+
+@router.get("/slow-queries", dependencies=[Depends(require_admin)])
+def slow_queries(limit: int = Query(20, ge=1, le=200)):
+    """Statements from the slow-query log grouped by shape, by total time descending"""
+    if not slow_query_log.enabled:
+        raise HTTPException(status_code=404, detail="Slow-query log is not enabled")
+    return slow_query_log.summary(limit=limit)
+
+
+@router.get("/providers", dependencies=[Depends(require_admin)])
+def provider_status():
+    """Circuit breaker state and hedging delay of each price provider in the fallback chain"""
+    provider = get_provider()
+    if not hasattr(provider, "status"):
+        return [{"provider": provider.name, "circuit": "none"}]
+    return provider.status()
@@ -1,22 +1,27 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.tracing import TracedRoute
 from app.crud.asset import asset
+from app.models.job import JobType
 from app.schemas.asset import Asset, AssetCreate, AssetUpdate
+from app.schemas.job import Job
+from app.services.job_service import job_runner
 from app.services.price_service import PriceService
+from app.services.symbol_directory import symbol_directory
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[Asset])
-def read_assets(
+async def read_assets(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all assets"""
-    assets = asset.get_multi(db, skip=skip, limit=limit)
+    assets = await run_db(db, asset.get_multi, skip=skip, limit=limit)
     return assets
 
 
@@ -45,10 +50,19 @@ def search_assets(
     return assets
 
 
+@router.get("/typeahead")
+def typeahead_assets(
+    q: str = Query(..., description="Symbol or name prefix"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Prefix search over the in-memory symbol directory (no network or database access)"""
+    return [entry.as_dict() for entry in symbol_directory.search(q, limit=limit)]
+
+
 @router.get("/lookup/{symbol}")
-def lookup_asset(symbol: str):
+async def lookup_asset(symbol: str):
     """Lookup asset information from external data source"""
-    asset_info = PriceService.get_asset_info(symbol)
+    asset_info = await PriceService.get_asset_info_async(symbol)
     return asset_info
 
 
@@ -89,15 +103,15 @@ def create_asset_from_lookup(
 
 
 @router.get("/{asset_id}", response_model=Asset)
-def read_asset(
+async def read_asset(
     asset_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific asset"""
-    asset = asset.get(db, id=asset_id)
-    if asset is None:
+    asset_obj = await run_db(db, asset.get, id=asset_id)
+    if asset_obj is None:
         raise HTTPException(status_code=404, detail="Asset not found")
-    return asset
+    return asset_obj
 
 
 @router.put("/{asset_id}", response_model=Asset)
@@ -126,24 +140,33 @@ def delete_asset(
     return {"message": "Asset deleted successfully"}
 
 
-@router.post("/update-prices")
+@router.post("/update-prices", response_model=Job, status_code=202)
 def update_asset_prices(
     asset_ids: List[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Update current prices for assets"""
-    PriceService.update_asset_prices(db, asset_ids)
-    return {"message": "Asset prices updated successfully"}
+    """Queue a price refresh job for the given assets (stale held/watched ones when omitted); poll /jobs/{id}"""
+    return job_runner.submit(db, JobType.PRICE_REFRESH, {"asset_ids": asset_ids})
+
+
+@router.post("/backfill-history", response_model=Job, status_code=202)
+def backfill_price_history(
+    asset_ids: List[int] = None,
+    period: str = Query("1y", description="History to fetch per asset (1mo, 1y, 5y, max, ...)"),
+    db: Session = Depends(get_db)
+):
+    """Queue a job storing daily price history for the given assets (all when omitted)"""
+    return job_runner.submit(db, JobType.HISTORY_BACKFILL, {"asset_ids": asset_ids, "period": period})
 
 
 @router.get("/{symbol}/historical")
-def get_historical_data(
+async def get_historical_data(
     symbol: str,
     period: str = Query("1y", description="Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)"),
     interval: str = Query("1d", description="Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)")
 ):
     """Get historical market data for a stock symbol"""
-    historical_data = PriceService.get_historical_data(symbol, period, interval)
+    historical_data = await PriceService.get_historical_data_async(symbol, period, interval)
     
     if 'error' in historical_data:
         raise HTTPException(status_code=404, detail=historical_data['error'])
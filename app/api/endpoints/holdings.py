@@ -1,27 +1,48 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, run_db
+from app.core.tracing import TracedRoute
 from app.crud.holding import holding
+from app.crud.loading import loading_policy
 from app.crud.portfolio import portfolio
 from app.crud.asset import asset
 from app.schemas.holding import Holding, HoldingCreate, HoldingUpdate, HoldingWithAsset
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[HoldingWithAsset])
-def read_holdings(
+async def read_holdings(
+    response: Response,
     portfolio_id: int = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    skip: int = Query(0, ge=0, deprecated=True, description="Deprecated, use cursor: rows to skip with OFFSET"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get holdings, optionally filtered by portfolio"""
-    if portfolio_id:
-        holdings = holding.get_by_portfolio(db, portfolio_id=portfolio_id)
-    else:
-        holdings = holding.get_multi(db, skip=skip, limit=limit)
+    """
+    Get holdings, optionally filtered by portfolio.
+    Results are paged by id; when more rows may follow, the cursor for the
+    next page is returned in the X-Next-Cursor header. skip is deprecated
+    and applied as an OFFSET after the cursor, for older clients.
+    """
+    options = loading_policy(HoldingWithAsset)
+    try:
+        if portfolio_id:
+            holdings = await run_db(
+                db, holding.get_by_portfolio,
+                portfolio_id=portfolio_id, cursor=cursor, limit=limit, skip=skip, options=options
+            )
+        else:
+            holdings = await run_db(
+                db, holding.get_multi_after, cursor=cursor, limit=limit, skip=skip, options=options
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(holdings) == limit:
+        response.headers["X-Next-Cursor"] = holding.cursor_for(holdings[-1])
     return holdings
 
 
@@ -55,15 +76,15 @@ def create_holding(
 
 
 @router.get("/{holding_id}", response_model=HoldingWithAsset)
-def read_holding(
+async def read_holding(
     holding_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific holding"""
-    holding = holding.get(db, id=holding_id)
-    if holding is None:
+    holding_obj = await run_db(db, holding.get, id=holding_id, options=loading_policy(HoldingWithAsset))
+    if holding_obj is None:
         raise HTTPException(status_code=404, detail="Holding not found")
-    return holding
+    return holding_obj
 
 
 @router.put("/{holding_id}", response_model=Holding)
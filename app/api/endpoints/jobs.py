@@ -0,0 +1,33 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.tracing import TracedRoute
+from app.crud.job import job
+from app.models.job import JobStatus, JobType
+from app.schemas.job import Job
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get("/", response_model=List[Job])
+def read_jobs(
+    status: Optional[JobStatus] = None,
+    job_type: Optional[JobType] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get recent jobs, newest first"""
+    return job.get_recent(db, status=status, job_type=job_type, limit=limit)
+
+
+@router.get("/{job_id}", response_model=Job)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get a job's status, progress, timing and per-item errors"""
+    job_obj = job.get(db, id=job_id)
+    if job_obj is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_obj
@@ -1,23 +1,33 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.tracing import TracedRoute
+from app.crud.asset import asset
+from app.crud.loading import loading_policy
 from app.crud.portfolio import portfolio
+from app.crud.watchlist import watchlist
+from app.models.job import JobType
+from app.schemas.job import Job
 from app.schemas.portfolio import Portfolio, PortfolioCreate, PortfolioUpdate, PortfolioWithHoldings
+from app.schemas.watchlist import WatchlistItem, WatchlistItemCreate
+from app.services.export_service import ExportService, MEDIA_TYPES
+from app.services.job_service import job_runner
 from app.services.portfolio_service import PortfolioService
 from app.services.price_service import PriceService
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[Portfolio])
-def read_portfolios(
+async def read_portfolios(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all portfolios"""
-    portfolios = portfolio.get_multi(db, skip=skip, limit=limit)
+    portfolios = await run_db(db, portfolio.get_multi, skip=skip, limit=limit)
     return portfolios
 
 
@@ -31,12 +41,12 @@ def create_portfolio(
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioWithHoldings)
-def read_portfolio(
+async def read_portfolio(
     portfolio_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific portfolio with holdings"""
-    portfolio_obj = portfolio.get_with_holdings(db, id=portfolio_id)
+    portfolio_obj = await run_db(db, portfolio.get_with_holdings, id=portfolio_id)
     if portfolio_obj is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     return portfolio_obj
@@ -68,6 +78,95 @@ def delete_portfolio(
     return {"message": "Portfolio deleted successfully"}
 
 
+@router.post("/{portfolio_id}/rebuild-holdings", response_model=Job, status_code=202)
+def rebuild_portfolio_holdings(
+    portfolio_id: int,
+    db: Session = Depends(get_db)
+):
+    """Queue a job recomputing the portfolio's holdings from its transactions"""
+    if portfolio.get(db, id=portfolio_id) is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return job_runner.submit(db, JobType.HOLDINGS_REBUILD, {"portfolio_ids": [portfolio_id]})
+
+
+@router.get("/{portfolio_id}/watchlist", response_model=List[WatchlistItem])
+def read_watchlist(
+    portfolio_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the assets the portfolio watches"""
+    if portfolio.get(db, id=portfolio_id) is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return watchlist.get_by_portfolio(db, portfolio_id=portfolio_id, options=loading_policy(WatchlistItem))
+
+
+@router.post("/{portfolio_id}/watchlist", response_model=WatchlistItem)
+def add_to_watchlist(
+    portfolio_id: int,
+    item: WatchlistItemCreate,
+    db: Session = Depends(get_db)
+):
+    """Watch an asset; its price is refreshed like a held asset's"""
+    if portfolio.get(db, id=portfolio_id) is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    if asset.get(db, id=item.asset_id) is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return watchlist.add(db, portfolio_id=portfolio_id, asset_id=item.asset_id)
+
+
+@router.delete("/{portfolio_id}/watchlist/{asset_id}")
+def remove_from_watchlist(
+    portfolio_id: int,
+    asset_id: int,
+    db: Session = Depends(get_db)
+):
+    """Stop watching an asset"""
+    item = watchlist.get_by_portfolio_and_asset(db, portfolio_id=portfolio_id, asset_id=asset_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Watchlist item not found")
+    watchlist.remove(db=db, id=item.id)
+    return {"message": "Asset removed from watchlist"}
+
+
+def _export_response(db: Session, statement, fmt: str, filename: str) -> StreamingResponse:
+    # The stream opens its own connection so it outlives the request-scoped session
+    return StreamingResponse(
+        ExportService.stream(db.get_bind(), statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+
+@router.get("/{portfolio_id}/transactions/export")
+def export_portfolio_transactions(
+    portfolio_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    db: Session = Depends(get_db)
+):
+    """Stream the portfolio's transaction ledger as CSV or NDJSON"""
+    portfolio_obj = portfolio.get(db, id=portfolio_id)
+    if portfolio_obj is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    statement = ExportService.transactions_statement(portfolio_id)
+    return _export_response(db, statement, format, f"portfolio-{portfolio_id}-transactions")
+
+
+@router.get("/{portfolio_id}/holdings/export")
+def export_portfolio_holdings(
+    portfolio_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    db: Session = Depends(get_db)
+):
+    """Stream the portfolio's holdings as CSV or NDJSON"""
+    portfolio_obj = portfolio.get(db, id=portfolio_id)
+    if portfolio_obj is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    statement = ExportService.holdings_statement(portfolio_id)
+    return _export_response(db, statement, format, f"portfolio-{portfolio_id}-holdings")
+
+
 @router.get("/{portfolio_id}/performance")
 def get_portfolio_performance(
     portfolio_id: int,
@@ -1,31 +1,58 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, run_db
+from app.core.tracing import TracedRoute
 from app.crud.transaction import transaction
+from app.crud.loading import loading_policy
 from app.crud.portfolio import portfolio
 from app.crud.asset import asset
+from app.models.job import JobType
+from app.schemas.job import Job
 from app.schemas.transaction import Transaction, TransactionCreate, TransactionUpdate, TransactionWithAsset
+from app.services.job_service import job_runner
 from app.services.portfolio_service import PortfolioService
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[TransactionWithAsset])
-def read_transactions(
+async def read_transactions(
+    response: Response,
     portfolio_id: int = None,
     asset_id: int = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    skip: int = Query(0, ge=0, deprecated=True, description="Deprecated, use cursor: rows to skip with OFFSET"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get transactions, optionally filtered by portfolio or asset"""
-    if portfolio_id:
-        transactions = transaction.get_by_portfolio(db, portfolio_id=portfolio_id)
-    elif asset_id:
-        transactions = transaction.get_by_asset(db, asset_id=asset_id)
-    else:
-        transactions = transaction.get_multi(db, skip=skip, limit=limit)
+    """
+    Get transactions newest first, optionally filtered by portfolio or asset.
+    Results are paged by (transaction_date, id); when more rows may follow, the
+    cursor for the next page is returned in the X-Next-Cursor header. skip is
+    deprecated and applied as an OFFSET after the cursor, for older clients.
+    """
+    options = loading_policy(TransactionWithAsset)
+    try:
+        if portfolio_id:
+            transactions = await run_db(
+                db, transaction.get_by_portfolio,
+                portfolio_id=portfolio_id, cursor=cursor, limit=limit, skip=skip, options=options
+            )
+        elif asset_id:
+            transactions = await run_db(
+                db, transaction.get_by_asset,
+                asset_id=asset_id, cursor=cursor, limit=limit, skip=skip, options=options
+            )
+        else:
+            transactions = await run_db(
+                db, transaction.get_multi_after, cursor=cursor, limit=limit, skip=skip, options=options
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(transactions) == limit:
+        response.headers["X-Next-Cursor"] = transaction.cursor_for(transactions[-1])
     return transactions
 
 
@@ -54,16 +81,28 @@ def create_transaction(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/import", response_model=Job, status_code=202)
+def import_transactions(
+    transactions: List[TransactionCreate],
+    db: Session = Depends(get_db)
+):
+    """Queue a job processing the transactions in order, updating holdings; per-row errors are reported on the job"""
+    rows = [t.model_dump(mode="json") for t in transactions]
+    return job_runner.submit(db, JobType.BULK_IMPORT, {"transactions": rows})
+
+
 @router.get("/{transaction_id}", response_model=TransactionWithAsset)
-def read_transaction(
+async def read_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific transaction"""
-    transaction = transaction.get(db, id=transaction_id)
-    if transaction is None:
+    transaction_obj = await run_db(
+        db, transaction.get, id=transaction_id, options=loading_policy(TransactionWithAsset)
+    )
+    if transaction_obj is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+    return transaction_obj
 
 
 @router.put("/{transaction_id}", response_model=Transaction)
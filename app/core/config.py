@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -7,6 +7,105 @@ class Settings(BaseSettings):
     secret_key: str = "dev-secret-key-change-in-production"
     alpha_vantage_api_key: Optional[str] = None
     debug: bool = True
+    # Serve list and read endpoints from an async engine (aiosqlite for SQLite URLs)
+    async_db: bool = False
+    async_database_url: Optional[str] = None
+    # Create missing tables during startup; turn off when the schema is managed by `alembic upgrade`
+    create_tables_on_startup: bool = True
+
+    # Price providers
+    # Concurrent price provider calls from async endpoints
+    price_provider_concurrency: int = 16
+    # Price source: "yfinance", "replay" (recorded file at price_replay_path) or "synthetic"
+    # (seeded random walks); the offline providers sleep the injected latency per call
+    price_provider: str = "yfinance"
+    price_replay_path: Optional[str] = None
+    price_synthetic_seed: int = 0
+    price_provider_latency_ms: float = 0.0
+    price_provider_jitter_ms: float = 0.0
+    # Comma-separated fallback order, e.g. "yfinance,alpha_vantage"; by default price_provider,
+    # followed by alpha_vantage when alpha_vantage_api_key is set
+    price_provider_chain: Optional[str] = None
+    # No provider call waits longer than the deadline; a request slower than the provider's
+    # p95 is hedged to the next provider, and repeated failures open its circuit
+    price_call_deadline_ms: float = 5000.0
+    price_hedge_quantile: float = 0.95
+    price_circuit_failures: int = 5
+    price_circuit_reset_seconds: float = 30.0
+    # Adaptive token bucket per remote provider (calls/s), shared by every PriceService caller;
+    # halved on 429s, trimmed when calls slow past the latency target, grown while saturated
+    price_rate_limit: float = 5.0
+    price_rate_burst: float = 10.0
+    price_rate_min: float = 0.5
+    price_rate_max: float = 50.0
+    price_rate_latency_target_ms: float = 2000.0
+    # Refresh planner: a refresh without explicit assets re-prices only held or watched assets
+    # whose last_updated is older than their asset type's budget (seconds; "default" for the rest)
+    price_staleness_seconds: Dict[str, float] = {
+        "crypto": 300.0, "stock": 900.0, "etf": 900.0, "commodity": 1800.0, "bond": 21600.0, "default": 900.0
+    }
+    # Skip assets whose market is closed once their post-close price is stored, and plan open
+    # markets first; assets with no known exchange follow market_default_calendar
+    price_market_hours: bool = True
+    market_default_calendar: str = "XNYS"
+    # Seconds between planned refreshes queued by the price worker; 0 leaves refreshes to callers
+    price_refresh_interval: float = 0.0
+
+    # Pagination
+    default_page_size: int = 100
+    max_page_size: int = 500
+
+    # Symbol directory (in-memory typeahead)
+    preload_symbol_directory: bool = True
+    symbol_listing_path: Optional[str] = None
+    # Lookups reuse a symbol's full provider record (price, currency, sector, ...) for this long
+    asset_info_cache_seconds: float = 900.0
+
+    # Startup warm-up; /ready answers 503 until it finishes. In the background it lets
+    # the server accept liveness probes while warming instead of delaying startup
+    warmup_background: bool = False
+    warmup_prices: bool = False
+    warmup_analytics: bool = True
+    warmup_valuation_portfolios: int = 0
+    # Portfolio valuations are reused for this long; writes made in this process clear them sooner
+    valuation_cache_seconds: float = 30.0
+
+    # Background jobs: in-process workers polling the jobs table; 0 leaves jobs to other processes
+    job_workers: int = 2
+    job_poll_interval: float = 1.0
+    # A running job that has not reported progress for this long is queued again
+    job_stale_seconds: float = 120.0
+    # Set false when a separate `python -m app.workers.price_worker` process runs the price jobs
+    price_jobs_in_api: bool = True
+
+    # Per-request SQL instrumentation (Server-Timing header, N+1 warnings)
+    sql_instrumentation: bool = True
+    sql_repeat_warning_threshold: int = 10
+    sql_slowest_statements: int = 3
+
+    # Prometheus-style /metrics; set a shared directory when running several workers
+    metrics_enabled: bool = True
+    metrics_multiprocess_dir: Optional[str] = None
+    metrics_flush_interval: float = 1.0
+
+    # Admin endpoints and on-demand profiling; both are off while admin_token is unset
+    admin_token: Optional[str] = None
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "./profiles"
+    profile_max_files: int = 100
+
+    # Request tracing; exporter is "jsonl", "otlp" or unset to disable
+    tracing_exporter: Optional[str] = None
+    tracing_jsonl_path: str = "./traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_sample_rate: float = 1.0
+
+    # Slow-query log; unset slow_query_ms disables it
+    slow_query_ms: Optional[float] = None
+    slow_query_log_path: str = "./logs/slow_queries.log"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 3
     
     class Config:
         env_file = ".env"
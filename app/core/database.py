@@ -1,8 +1,18 @@
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, Union
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from .config import settings
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+# Async drivers substituted into DATABASE_URL when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
 engine = create_engine(
     settings.database_url,
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
@@ -13,6 +23,12 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_tables() -> None:
+    """Create any missing tables; deployments that run Alembic migrations can skip this"""
+    import app.models  # noqa: F401  registers every model on Base.metadata
+    Base.metadata.create_all(bind=engine)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -21,6 +37,52 @@ def get_db():
         db.close()
 
 
+_async_sessionmaker = None
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a synchronous database URL"""
+    scheme, sep, rest = url.partition("://")
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {scheme} URLs")
+    return ASYNC_DRIVERS[scheme] + sep + rest
+
+
+def get_async_sessionmaker():
+    """Session factory for the async engine, created on first use so sync-only deployments never load it"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        async_engine = create_async_engine(
+            settings.async_database_url or async_database_url(settings.database_url)
+        )
+        _async_sessionmaker = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+# Dependency for the list and read endpoints: an AsyncSession when ASYNC_DB is set,
+# otherwise the same sync session (and override key) as get_db
+get_read_db = get_async_db if settings.async_db else get_db
+
+
+async def run_db(db: Union[Session, "AsyncSession"], func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call sync CRUD code as func(session, *args, **kwargs) from an async endpoint.
+    An AsyncSession runs it on the event loop through run_sync; a sync Session
+    runs it on the thread pool, as a sync endpoint would.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(func, db, *args, **kwargs)
+    return await db.run_sync(func, *args, **kwargs)
+
+
 def get_db_url() -> str:
     """Get the database URL for use with other database clients like ibis"""
     return settings.database_url
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+Per-request SQL instrumentation and the slow-query log.
+
+Statements executed through any SQLAlchemy engine, or through an ibis connection
+passed to instrument_ibis, are recorded against the request that is currently
+being served. QueryStatsMiddleware opens the per-request record, reports it in a
+Server-Timing header and warns when one statement shape repeats often enough to
+look like an N+1 loop. The header carries only the DB total and query count
+unless debug is on or the request has the admin token, since statement text
+describes the schema.
+
+Independently of requests, statements slower than the configured threshold are
+written to a rotating JSON-lines log together with their parameters, the
+endpoint that issued them and SQLite's EXPLAIN QUERY PLAN output.
+"""
+import heapq
+import json
+import logging
+import logging.handlers
+import re
+import secrets
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with literals and IN-list lengths folded, so repeats compare equal"""
+    shape = _LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements recorded while serving one request"""
+
+    def __init__(self, keep_slowest: int = 3, scope: Optional[Dict[str, Any]] = None):
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+        self._keep_slowest = keep_slowest
+        # Min-heap of (duration, sequence, statement); the smallest is evicted first
+        self._slowest: List[Tuple[float, int, str]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.shapes[statement_shape(statement)] += 1
+        entry = (duration, self.count, statement)
+        if len(self._slowest) < self._keep_slowest:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        """Slowest statements, longest first"""
+        return [(duration, statement) for duration, _, statement in sorted(self._slowest, reverse=True)]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than threshold times"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self, statements: bool = False) -> str:
+        """Server-Timing header value: the DB total, followed by the slowest statements if asked for"""
+        metrics = [f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries"']
+        if not statements:
+            return metrics[0]
+        for i, (duration, statement) in enumerate(self.slowest, start=1):
+            desc = _WHITESPACE.sub(" ", statement).replace("\\", "").replace('"', "'")[:100]
+            metrics.append(f'db-slow-{i};dur={duration * 1000:.2f};desc="{desc}"')
+        return ", ".join(metrics)
+
+    @property
+    def endpoint(self) -> Optional[str]:
+        """Method and route template of the request, once it has been routed"""
+        if self.scope is None:
+            return None
+        return f"{self.scope.get('method')} {route_template(self.scope)}"
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Stats for the request being served, or None outside of a request"""
+    return _current.get()
+
+
+def record_statement(statement: str, duration: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+class SlowQueryLog:
+    """Writes statements slower than threshold_ms to a rotating JSON-lines file"""
+
+    MAX_PARAMS_CHARS = 1000
+
+    def __init__(self):
+        self.threshold: Optional[float] = None
+        self.path: Optional[Path] = None
+        self._logger = logging.getLogger("app.slow_queries")
+        self._logger.propagate = False
+        self._handler: Optional[logging.Handler] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    def configure(
+        self,
+        threshold_ms: Optional[float],
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3
+    ) -> None:
+        """Enable logging above threshold_ms, or disable it when threshold_ms is None"""
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+        self.threshold = None if threshold_ms is None else threshold_ms / 1000
+        self.path = Path(path)
+        if self.threshold is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backup_count
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(self._handler)
+        self._logger.setLevel(logging.INFO)
+
+    def maybe_record(
+        self,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        explain: Callable[[], Optional[List[str]]],
+        source: str
+    ) -> None:
+        if self.threshold is None or duration < self.threshold:
+            return
+        stats = _current.get()
+        try:
+            plan = explain()
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        params = json.dumps(parameters, default=str)
+        if len(params) > self.MAX_PARAMS_CHARS:
+            params = params[:self.MAX_PARAMS_CHARS] + "..."
+        self._logger.info(json.dumps({
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": source,
+            "duration_ms": round(duration * 1000, 3),
+            "endpoint": stats.endpoint if stats is not None else None,
+            "statement": statement,
+            "parameters": params,
+            "plan": plan,
+        }))
+
+    def summary(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Statement shapes from the current and rotated logs, by total time descending"""
+        if self.path is None:
+            return []
+        if self._handler is not None:
+            self._handler.flush()
+        files = sorted(self.path.parent.glob(self.path.name + "*"))
+        groups: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "count": 0, "total_ms": 0.0, "max_ms": 0.0, "endpoints": Counter(), "plan": None
+        })
+        for path in files:
+            with path.open() as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    group = groups[statement_shape(entry["statement"])]
+                    group["count"] += 1
+                    group["total_ms"] += entry["duration_ms"]
+                    if entry["duration_ms"] >= group["max_ms"]:
+                        group["max_ms"] = entry["duration_ms"]
+                        group["plan"] = entry.get("plan")
+                    if entry.get("endpoint"):
+                        group["endpoints"][entry["endpoint"]] += 1
+        ranked = sorted(groups.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                "statement": shape,
+                "count": group["count"],
+                "total_ms": round(group["total_ms"], 3),
+                "mean_ms": round(group["total_ms"] / group["count"], 3),
+                "max_ms": group["max_ms"],
+                "endpoints": dict(group["endpoints"].most_common()),
+                "plan": group["plan"],
+            }
+            for shape, group in ranked
+        ]
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _explain_sqlite(dbapi_connection, statement: str, parameters: Any) -> Optional[List[str]]:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None or slow_query_log.enabled:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    record_statement(statement, duration)
+
+    def explain():
+        # executemany parameters are a list of rows; there is no single plan to ask for
+        if conn.dialect.name != "sqlite" or executemany:
+            return None
+        return _explain_sqlite(conn.connection.dbapi_connection, statement, parameters)
+
+    slow_query_log.maybe_record(statement, parameters, duration, explain, source="sqlalchemy")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute is skipped for failed statements; drop their start time
+    starts = context.connection.info.get("query_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_ibis(con: Any) -> Any:
+    """Time statements sent through an ibis backend's raw_sql, which execute() uses"""
+    raw_sql = con.raw_sql
+
+    def timed_raw_sql(query, **kwargs):
+        if _current.get() is None and not slow_query_log.enabled:
+            return raw_sql(query, **kwargs)
+        start = time.perf_counter()
+        try:
+            return raw_sql(query, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            statement = query if isinstance(query, str) else query.sql(dialect=con.name)
+            record_statement(statement, duration)
+            slow_query_log.maybe_record(
+                statement, None, duration,
+                lambda: _explain_sqlite(con.con, statement, None) if con.name == "sqlite" else None,
+                source="ibis"
+            )
+
+    con.raw_sql = timed_raw_sql
+    return con
+
+
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+
+def _show_statements(scope: Dict[str, Any]) -> bool:
+    """Slow statement text is only published in debug mode or to admin token holders"""
+    if settings.debug:
+        return True
+    if not settings.admin_token:
+        return False
+    for name, value in scope.get("headers", ()):
+        if name == ADMIN_TOKEN_HEADER:
+            return secrets.compare_digest(value.decode("latin-1"), settings.admin_token)
+    return False
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that records SQL statements per HTTP request"""
+
+    def __init__(self, app, repeat_threshold: Optional[int] = None, keep_slowest: Optional[int] = None):
+        self.app = app
+        self.repeat_threshold = (
+            settings.sql_repeat_warning_threshold if repeat_threshold is None else repeat_threshold
+        )
+        self.keep_slowest = (
+            settings.sql_slowest_statements if keep_slowest is None else keep_slowest
+        )
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(keep_slowest=self.keep_slowest, scope=scope)
+        token = _current.set(stats)
+        statements = _show_statements(scope)
+
+        async def send_with_timing(message):
+            # Statements run while streaming a body happen after this header is sent
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(statements).encode("latin-1", "replace")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            for shape, n in stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1: statement repeated %d times in %s %s: %s",
+                    n, scope.get("method"), scope.get("path"), shape[:200]
+                )
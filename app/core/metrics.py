@@ -0,0 +1,400 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Each worker process keeps its own counters, gauges and histograms in memory. When
+a multiprocess directory is configured, every worker periodically writes a JSON
+snapshot of its registry there and /metrics merges all snapshots, so a scrape of
+any uvicorn worker reports totals for the whole deployment.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """Base for labelled metrics; samples are keyed by label values in labelnames order"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames) or not all(n in labels for n in self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Dict[LabelValues, Any]:
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    @staticmethod
+    def merge(a: Any, b: Any) -> Any:
+        return a + b
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Point-in-time value; across workers the values are summed"""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(Metric):
+    """Observations bucketed by upper bound; each sample is [bucket counts..., sum]"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        # Index len(buckets) is the +Inf bucket
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            sample[index] += 1
+            sample[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def _copy(value: List[float]) -> List[float]:
+        return list(value)
+
+    @staticmethod
+    def merge(a: List[float], b: List[float]) -> List[float]:
+        return [x + y for x, y in zip(a, b)]
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that refresh gauges right before a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> None:
+        for collector in self._collectors:
+            collector()
+
+    def snapshot(self, include_gauges: bool = True) -> Dict[str, Dict[str, Any]]:
+        """JSON-serialisable copy of every metric and its samples"""
+        data = {}
+        for name, metric in list(self._metrics.items()):
+            if metric.type == "gauge" and not include_gauges:
+                continue
+            data[name] = {
+                "type": metric.type,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": [[list(key), value] for key, value in metric.samples().items()],
+            }
+        return data
+
+    def render(self) -> str:
+        """Prometheus text format for this process"""
+        self.collect()
+        return render_snapshots([self.snapshot()])
+
+    # Multiprocess mode
+
+    def write_snapshot(self, directory: str, include_gauges: bool = True) -> None:
+        """Atomically replace this process's snapshot file in the shared directory"""
+        if include_gauges:
+            self.collect()
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        target = path / f"metrics_{os.getpid()}.json"
+        tmp = path / f".metrics_{os.getpid()}.json.tmp"
+        tmp.write_text(json.dumps(self.snapshot(include_gauges=include_gauges)))
+        os.replace(tmp, target)
+        self._last_flush = time.monotonic()
+
+    def maybe_write_snapshot(self, directory: str, interval: float) -> None:
+        """write_snapshot at most once per interval seconds"""
+        if time.monotonic() - self._last_flush >= interval:
+            self.write_snapshot(directory)
+
+    def render_multiprocess(self, directory: str) -> str:
+        """Prometheus text format merged across every worker's snapshot file"""
+        self.write_snapshot(directory)
+        snapshots = []
+        for path in sorted(Path(directory).glob("metrics_*.json")):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # A worker may be replacing its file right now; skip it for this scrape
+                continue
+        return render_snapshots(snapshots)
+
+
+_MERGE = {"counter": Counter.merge, "gauge": Gauge.merge, "histogram": Histogram.merge}
+
+
+def render_snapshots(snapshots: Sequence[Dict[str, Dict[str, Any]]]) -> str:
+    """Merge snapshots (sum per label set) and render them in the text format"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            merge = _MERGE[metric["type"]]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                target["samples"][key] = value if current is None else merge(current, value)
+
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for key in sorted(metric["samples"]):
+            value = metric["samples"][key]
+            if metric["type"] == "histogram":
+                cumulative = 0
+                bounds = [_format_value(b) for b in metric["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    labels = _format_labels(labelnames, key, le=bound)
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(labelnames, key)
+                lines.append(f"{name}_sum{labels} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{labels} {cumulative}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], le: Optional[str] = None) -> str:
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(labelnames, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "SQLAlchemy connection pool usage", ("state",)
+)
+price_provider_calls = registry.counter(
+    "price_provider_calls_total", "Price provider calls by operation and outcome", ("operation", "outcome")
+)
+price_provider_duration = registry.histogram(
+    "price_provider_duration_seconds", "Price provider call latency", ("operation",)
+)
+price_provider_attempts = registry.counter(
+    "price_provider_attempts_total",
+    "Provider chain attempts by provider, operation and outcome (ok, empty, error, timeout, rejected)",
+    ("provider", "operation", "outcome")
+)
+price_provider_hedges = registry.counter(
+    "price_provider_hedges_total", "Hedged requests sent to a provider after the previous one passed its p95",
+    ("provider",)
+)
+price_provider_circuit = registry.gauge(
+    "price_provider_circuit_open", "1 while a provider's circuit breaker is open or half-open", ("provider",)
+)
+price_provider_rate = registry.gauge(
+    "price_provider_rate_limit", "Current adaptive rate limit in calls per second", ("provider",)
+)
+price_provider_throttled = registry.counter(
+    "price_provider_throttled_total", "Provider answers that signalled a rate limit (HTTP 429 or notice)", ("provider",)
+)
+price_provider_queue_seconds = registry.histogram(
+    "price_provider_queue_seconds", "Time spent waiting for a rate-limit token", ("provider", "priority")
+)
+price_provider_coalesced = registry.counter(
+    "price_provider_coalesced_total", "Price provider calls that joined an identical in-flight call", ("operation",)
+)
+cache_requests = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+)
+analytics_duration = registry.histogram(
+    "analytics_query_duration_seconds", "AnalyticsService query duration", ("query",)
+)
+
+
+@contextmanager
+def provider_call(operation: str) -> Iterator[None]:
+    """Time a price provider call and count it as ok or error"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        price_provider_duration.observe(time.perf_counter() - start, operation=operation)
+        price_provider_calls.inc(operation=operation, outcome=outcome)
+
+
+def timed(histogram: Histogram, **labels: Any) -> Callable:
+    """Decorator observing the wrapped function's duration in histogram"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def track_pool(engine) -> None:
+    """Report the engine's pool usage in db_pool_connections on every scrape"""
+    def collect() -> None:
+        pool = engine.pool
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, state, None)
+            if callable(method):
+                db_pool_connections.set(method(), state=state)
+
+    registry.add_collector(collect)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the matched route, including the prefix of any router it was
+    included under. Unmatched paths share one label so arbitrary URLs cannot grow
+    the registry.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    # The template's segments match the tail of the concrete path; the rest is the prefix
+    prefix = scope["path"].rsplit("/", template.count("/"))[0]
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware that counts and times requests per matched route template"""
+
+    def __init__(self, app, multiprocess_dir: Optional[str] = None, flush_interval: float = 1.0):
+        self.app = app
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - start, method=method, route=route)
+            http_requests.inc(method=method, route=route, status=status_code)
+            if self.multiprocess_dir:
+                registry.maybe_write_snapshot(self.multiprocess_dir, self.flush_interval)
@@ -0,0 +1,182 @@
+"""
+Opt-in sampling profiler for individual requests.
+
+A request is profiled when it carries the admin token in the X-Profile header or
+is picked by the configured sampling rate. A background thread then samples the
+stacks of whichever threads are executing that request's endpoint and, when the
+request finishes, writes them in collapsed-stack format (one "frame;frame;frame
+count" line per distinct stack), which flamegraph.pl and speedscope read directly.
+Requests that are not profiled only pay for the header check.
+"""
+import inspect
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+PROFILE_SUFFIX = ".collapsed"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@lru_cache(maxsize=4096)
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for root in (os.getcwd(), *sys.path):
+        if root and filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class RequestSampler:
+    """Samples the threads running one request's endpoint until stopped"""
+
+    def __init__(self, scope: Dict[str, Any], interval: float):
+        self.scope = scope
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _endpoint_code(self):
+        endpoint = self.scope.get("endpoint")
+        if endpoint is None:
+            return None
+        return getattr(inspect.unwrap(endpoint), "__code__", None)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            target = self._endpoint_code()
+            if target is None:
+                # Not routed yet
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                if target not in codes:
+                    continue
+                self.stacks[";".join(_frame_label(c) for c in reversed(codes))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Collapsed-stack files in a local directory, oldest pruned beyond max_files"""
+
+    def __init__(self, directory: str, max_files: int = 100):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def new_id(self, scope: Dict[str, Any]) -> str:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = _UNSAFE.sub("_", scope.get("path", "")).strip("_")[:60]
+        return f"{stamp}_{scope.get('method', '')}_{path}_{secrets.token_hex(4)}"
+
+    def save(self, profile_id: str, body: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        target.write_text(body)
+        for stale in self.list()[self.max_files:]:
+            (self.directory / f"{stale['id']}{PROFILE_SUFFIX}").unlink(missing_ok=True)
+        return target
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first"""
+        if not self.directory.is_dir():
+            return []
+        files = sorted(
+            self.directory.glob(f"*{PROFILE_SUFFIX}"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        return [
+            {
+                "id": p.name[:-len(PROFILE_SUFFIX)],
+                "size": p.stat().st_size,
+                "created_at": datetime.utcfromtimestamp(p.stat().st_mtime).isoformat(),
+            }
+            for p in files
+        ]
+
+    def read(self, profile_id: str) -> Optional[str]:
+        if _UNSAFE.search(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        return path.read_text() if path.is_file() else None
+
+
+profile_store = ProfileStore(settings.profile_dir, max_files=settings.profile_max_files)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that runs selected requests under RequestSampler"""
+
+    def __init__(
+        self,
+        app,
+        admin_token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        store: ProfileStore = profile_store,
+    ):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.store = store
+
+    def _selected(self, scope: Dict[str, Any]) -> bool:
+        if self.admin_token:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER.encode():
+                    return secrets.compare_digest(value.decode("latin-1"), self.admin_token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id(scope)
+        sampler = RequestSampler(scope, self.interval)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.encode(), profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            await run_in_threadpool(sampler.stop)
+            await run_in_threadpool(self.store.save, profile_id, sampler.collapsed())
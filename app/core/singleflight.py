@@ -0,0 +1,75 @@
+"""
+Single-flight call coalescing.
+
+When many requests ask for the same upstream data at once (the dashboard loading
+SPY history at market open), only the first caller for a key runs the fetch; the
+others wait for it and receive the same result, or the same exception. Nothing is
+cached: once the call finishes the next caller for that key fetches again.
+
+Shared results are handed to every waiter, so callers must treat them as read-only.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from app.core.metrics import price_provider_coalesced
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key; name labels the coalesced-calls metric"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) unless a call for key is already running in another thread, then share its outcome"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            price_provider_coalesced.inc(operation=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        do() for coroutines on one event loop. Waiters await the leader's task
+        instead of each holding a worker thread, and a cancelled waiter does not
+        cancel the fetch the others are waiting on.
+        """
+        task_key = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = self._tasks[task_key] = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        else:
+            price_provider_coalesced.inc(operation=self.name)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
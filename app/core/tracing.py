@@ -0,0 +1,431 @@
+"""
+Lightweight in-process tracing.
+
+TracingMiddleware opens a trace per HTTP request and keeps it in a context
+variable, so spans opened anywhere while serving the request (in the event loop
+or in threadpool workers) attach to it. Finished traces are handed to a
+background exporter that appends them to a JSONL file or posts them to a local
+OTLP/HTTP collector. With no trace active, span() costs one context variable read.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from fastapi.routing import APIRoute
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], start_ns: Optional[int] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def finish(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = time.time_ns() if end_ns is None else end_ns
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def as_dict(self, trace_start_ns: int) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start_ns - trace_start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class Trace:
+    """Spans recorded for one request; the first span is the root"""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = _new_id(16)
+        self.root = Span(name, None, attributes=attributes)
+        self.spans: List[Span] = [self.root]
+        self._lock = threading.Lock()
+        # Set by TracedRoute when the endpoint function returns; serialization starts there
+        self.endpoint_end_ns: Optional[int] = None
+
+    def start_span(self, name: str, parent: Optional[Span], **attributes: Any) -> Span:
+        s = Span(name, (parent or self.root).span_id, attributes=attributes)
+        with self._lock:
+            self.spans.append(s)
+        return s
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, parent: Optional[Span], **attributes: Any) -> Span:
+        s = self.start_span(name, parent, **attributes)
+        s.start_ns = start_ns
+        s.finish(end_ns)
+        return s
+
+    def as_dict(self) -> Dict[str, Any]:
+        start = self.root.start_ns
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "timestamp": start / 1e9,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "attributes": self.root.attributes,
+            "spans": [s.as_dict(start) for s in self.spans[1:]],
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current span, or a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    s = trace.start_span(name, _current_span.get(), **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        s.finish()
+
+
+def traced(name: str) -> Callable:
+    """Decorator running the wrapped function inside span(name)"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# SQLAlchemy statements become db.query spans
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault("trace_start", []).append(time.time_ns())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("trace_start")
+    trace = _current_trace.get()
+    if starts and trace is not None:
+        trace.add_span(
+            "db.query", starts.pop(), time.time_ns(), _current_span.get(),
+            statement=statement[:200], executemany=executemany
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    starts = context.connection.info.get("trace_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def trace_ibis(con: Any) -> Any:
+    """Span the compile, execute and materialize stages of an ibis backend's execute()"""
+    for attr, name in (("compile", "ibis.compile"), ("raw_sql", "ibis.execute"),
+                       ("_fetch_from_cursor", "ibis.materialize")):
+        method = getattr(con, attr, None)
+        if method is None:
+            continue
+
+        def wrapper(*args, _method=method, _name=name, **kwargs):
+            if _current_trace.get() is None:
+                return _method(*args, **kwargs)
+            with span(_name):
+                return _method(*args, **kwargs)
+
+        setattr(con, attr, wrapper)
+    return con
+
+
+class TracedRoute(APIRoute):
+    """APIRoute whose endpoint runs in an endpoint span and marks where serialization begins"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, self._wrap(endpoint), **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint: Callable) -> Callable:
+        def finish(trace: Optional[Trace]) -> None:
+            if trace is not None:
+                trace.endpoint_end_ns = time.time_ns()
+
+        if asyncio.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def async_wrapper(*args, **kwargs):
+                with span("endpoint", function=endpoint.__name__):
+                    result = await endpoint(*args, **kwargs)
+                finish(_current_trace.get())
+                return result
+            return async_wrapper
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with span("endpoint", function=endpoint.__name__):
+                result = endpoint(*args, **kwargs)
+            finish(_current_trace.get())
+            return result
+        return wrapper
+
+
+# Exporters
+
+class JsonlExporter:
+    """Appends one JSON object per trace to a file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def export(self, traces: List[Trace]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            for trace in traces:
+                f.write(json.dumps(trace.as_dict(), default=str) + "\n")
+
+
+class OtlpHttpExporter:
+    """Posts traces as OTLP/HTTP JSON to a collector such as http://localhost:4318/v1/traces"""
+
+    def __init__(self, endpoint: str, service_name: str = "portfolio-tracker", timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        out = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                out.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                out.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                out.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                out.append({"key": key, "value": {"stringValue": str(value)}})
+        return out
+
+    def payload(self, traces: List[Trace]) -> Dict[str, Any]:
+        spans = []
+        for trace in traces:
+            for s in trace.spans:
+                item = {
+                    "traceId": trace.trace_id,
+                    "spanId": s.span_id,
+                    "name": s.name,
+                    # SPAN_KIND_SERVER for the request span, SPAN_KIND_INTERNAL otherwise
+                    "kind": 2 if s is trace.root else 1,
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                    "attributes": self._attributes(s.attributes),
+                }
+                if s.parent_id:
+                    item["parentSpanId"] = s.parent_id
+                if s.error:
+                    item["status"] = {"code": 2, "message": s.error}
+                spans.append(item)
+        return {"resourceSpans": [{
+            "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]}
+
+    def export(self, traces: List[Trace]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(traces)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class BatchExporter:
+    """Queues finished traces and exports them in batches from a daemon thread"""
+
+    def __init__(self, exporter: Any, max_queue: int = 10000, batch_size: int = 100, interval: float = 1.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # flush() may run on another thread while the daemon exports
+        self._export_lock = threading.Lock()
+
+    def submit(self, trace: Trace) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> List[Trace]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> None:
+        """Export everything queued so far and wait for batches already in flight"""
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            self._export(batch)
+        self._queue.join()
+
+    def _export(self, batch: List[Trace]) -> None:
+        try:
+            with self._export_lock:
+                self.exporter.export(batch)
+        except Exception as e:
+            logger.warning("Dropped %d traces: %s", len(batch), e)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first] + self._drain()
+            self._export(batch)
+            time.sleep(self.interval)
+
+
+def make_exporter(kind: str, jsonl_path: str, otlp_endpoint: str) -> BatchExporter:
+    if kind == "jsonl":
+        return BatchExporter(JsonlExporter(jsonl_path))
+    if kind == "otlp":
+        return BatchExporter(OtlpHttpExporter(otlp_endpoint))
+    raise ValueError(f"Unknown trace exporter: {kind}")
+
+
+class TracingMiddleware:
+    """ASGI middleware that opens a trace per sampled request and exports it when done"""
+
+    def __init__(self, app, exporter: BatchExporter, sample_rate: float = 1.0):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] != "http" or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}", {"http.method": scope["method"]})
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(trace.root)
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                now = time.time_ns()
+                if trace.endpoint_end_ns is not None:
+                    trace.add_span("serialize", trace.endpoint_end_ns, now, trace.root)
+                trace.root.attributes["http.status_code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                trace.root.attributes["http.route"] = route_template(scope)
+                trace.root.name = f"{scope['method']} {trace.root.attributes['http.route']}"
+            trace.root.finish()
+            self.exporter.submit(trace)
+
+
+def stage_breakdown(path: str, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Per-route totals and per-stage span time aggregated from a JSONL trace file"""
+    routes: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {"requests": 0, "total_ms": 0.0, "stages": defaultdict(float)}
+    )
+    p = Path(path)
+    if not p.is_file():
+        return {}
+    with p.open() as f:
+        # Stream the file; with a limit only the last lines are kept in memory
+        lines = deque(f, maxlen=limit) if limit else f
+        for line in lines:
+            try:
+                trace = json.loads(line)
+            except ValueError:
+                continue
+            entry = routes[trace["name"]]
+            entry["requests"] += 1
+            entry["total_ms"] += trace["duration_ms"]
+            for s in trace["spans"]:
+                entry["stages"][s["name"]] += s["duration_ms"]
+    return {
+        name: {
+            "requests": entry["requests"],
+            "mean_ms": round(entry["total_ms"] / entry["requests"], 3),
+            "stage_mean_ms": {
+                stage: round(total / entry["requests"], 3)
+                for stage, total in sorted(entry["stages"].items(), key=lambda kv: -kv[1])
+            },
+        }
+        for name, entry in routes.items()
+    }
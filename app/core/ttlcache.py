@@ -0,0 +1,50 @@
+"""
+Small in-process cache whose entries expire after a fixed time.
+
+Entries are kept in insertion order and the oldest are dropped once max_entries
+is reached. Cached values are shared with every caller, so treat them as read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+from app.core.metrics import cache_requests
+
+
+class TTLCache:
+    """Thread-safe TTL cache; name labels the cache_requests_total metric"""
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Callable[[], float],
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        # Read on every lookup, so a changed setting applies to entries already cached
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[0] >= self.ttl():
+                del self._entries[key]
+                entry = None
+        cache_requests.inc(cache=self.name, result="miss" if entry is None else "hit")
+        return None if entry is None else entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock(), value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
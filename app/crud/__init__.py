@@ -2,5 +2,8 @@ from .portfolio import portfolio
 from .asset import asset
 from .holding import holding
 from .transaction import transaction
+from .job import job
+from .price_history import price_history
+from .watchlist import watchlist
 
-__all__ = ["portfolio", "asset", "holding", "transaction"]
\ No newline at end of file
+__all__ = ["portfolio", "asset", "holding", "transaction", "job", "price_history", "watchlist"]
\ No newline at end of file
@@ -1,23 +1,185 @@
-from typing import Optional
+import re
+import weakref
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.asset import Asset
 from app.schemas.asset import AssetCreate, AssetUpdate
 
+_TOKEN = re.compile(r"[\w.\-]+")
+
+# Highest code point; symbol < prefix + _MAX_CHAR bounds an index range on the prefix
+_MAX_CHAR = "\U0010ffff"
+
+# Tiers: exact symbol, symbol prefix (index range), name/symbol token prefix (FTS).
+# Every branch stops at :limit before the rows are merged, ranked and deduplicated.
+_SEARCH = text("""
+    SELECT assets.* FROM (
+        SELECT id, 0 AS tier FROM assets WHERE symbol = :symbol
+        UNION ALL
+        SELECT id, 1 FROM (
+            SELECT id FROM assets
+            WHERE symbol > :symbol AND symbol < :symbol_upper
+            ORDER BY symbol LIMIT :limit
+        )
+        UNION ALL
+        SELECT rowid, 2 FROM (
+            SELECT rowid FROM assets_fts WHERE assets_fts MATCH :match LIMIT :limit
+        )
+    ) AS ranked
+    JOIN assets ON assets.id = ranked.id
+    GROUP BY assets.id
+    ORDER BY MIN(ranked.tier), assets.symbol
+    LIMIT :limit
+""")
+
+
+# Asset columns mirrored by the in-memory symbol directory
+_DIRECTORY_FIELDS = ("symbol", "name", "asset_type", "exchange")
+
+
+def _directory():
+    # Imported lazily: app.services imports this module through PriceService
+    from app.services.symbol_directory import symbol_directory
+    return symbol_directory
+
 
 class CRUDAsset(CRUDBase[Asset, AssetCreate, AssetUpdate]):
+    def __init__(self, model):
+        super().__init__(model)
+        # Whether an engine has the assets_fts index, looked up once per engine
+        self._fts_engines: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
     def get_by_symbol(self, db: Session, *, symbol: str) -> Optional[Asset]:
         return db.query(Asset).filter(Asset.symbol == symbol).first()
 
-    def search_by_name_or_symbol(self, db: Session, *, query: str, limit: int = 10):
+    def search_by_name_or_symbol(self, db: Session, *, query: str, limit: int = 10) -> List[Asset]:
+        """
+        Search assets for typeahead, ranking an exact symbol match first, then
+        symbol prefixes, then name token prefixes from the assets_fts index.
+        Each tier is an index range that stops at the limit, so the cost does not
+        grow with the number of matches. Falls back to a substring scan when the
+        index is unavailable.
+        """
+        if not self._has_fts(db):
+            return (
+                db.query(Asset)
+                .filter(
+                    (Asset.name.ilike(f"%{query}%")) | (Asset.symbol.ilike(f"%{query}%"))
+                )
+                .limit(limit)
+                .all()
+            )
+
+        tokens = _TOKEN.findall(query)
+        if not tokens:
+            return []
+
+        symbol = query.strip().upper()
+        match = " AND ".join('"{}"*'.format(token.replace('"', '')) for token in tokens)
         return (
             db.query(Asset)
-            .filter(
-                (Asset.name.ilike(f"%{query}%")) | (Asset.symbol.ilike(f"%{query}%"))
+            .from_statement(_SEARCH)
+            .params(
+                symbol=symbol,
+                symbol_upper=symbol + _MAX_CHAR,
+                match=match,
+                limit=limit
             )
-            .limit(limit)
             .all()
         )
 
+    def create(self, db: Session, *, obj_in: AssetCreate) -> Asset:
+        db_obj = super().create(db, obj_in=obj_in)
+        if _directory().loaded:
+            _directory().upsert_assets([db_obj])
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Asset,
+        obj_in: Union[AssetUpdate, Dict[str, Any]],
+        refresh: bool = True
+    ) -> Asset:
+        before = tuple(getattr(db_obj, field) for field in _DIRECTORY_FIELDS)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in, refresh=refresh)
+        after = tuple(getattr(db_obj, field) for field in _DIRECTORY_FIELDS)
+        if before != after and _directory().loaded:
+            if before[0] != after[0]:
+                _directory().remove([before[0]])
+            _directory().upsert_assets([db_obj])
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Asset:
+        existing = self.get(db, id=id)
+        symbol = existing.symbol if existing is not None else None
+        obj = super().remove(db, id=id)
+        if symbol and _directory().loaded:
+            _directory().remove([symbol])
+        return obj
+
+    def bulk_create(self, db: Session, *, objs_in: Sequence, **kwargs) -> int:
+        count = super().bulk_create(db, objs_in=objs_in, **kwargs)
+        if _directory().loaded:
+            self._sync_directory(db, symbols=[self._as_dict(o)["symbol"] for o in objs_in])
+        return count
+
+    def bulk_update(
+        self, db: Session, *, values_by_id: Mapping[Any, Dict[str, Any]], **kwargs
+    ) -> int:
+        count = super().bulk_update(db, values_by_id=values_by_id, **kwargs)
+        # Price refreshes don't touch directory fields and skip the sync entirely
+        touched = [
+            id for id, values in values_by_id.items()
+            if any(field in values for field in _DIRECTORY_FIELDS)
+        ]
+        if touched and _directory().loaded:
+            # A renamed symbol leaves its old entry behind; reload to drop it
+            if any("symbol" in values_by_id[id] for id in touched):
+                _directory().load_from_db(db)
+            else:
+                self._sync_directory(db, ids=touched)
+        return count
+
+    def upsert(self, db: Session, *, objs_in: Sequence, **kwargs) -> int:
+        count = super().upsert(db, objs_in=objs_in, **kwargs)
+        if _directory().loaded:
+            self._sync_directory(db, symbols=[self._as_dict(o)["symbol"] for o in objs_in])
+        return count
+
+    def _sync_directory(
+        self,
+        db: Session,
+        *,
+        symbols: Optional[Sequence[str]] = None,
+        ids: Optional[Sequence[int]] = None,
+        chunk_size: int = 500
+    ) -> None:
+        """Re-read the given assets' directory fields and apply them to the directory"""
+        column, keys = (Asset.symbol, symbols) if symbols is not None else (Asset.id, ids)
+        entries = []
+        for start in range(0, len(keys), chunk_size):
+            rows = (
+                db.query(Asset.symbol, Asset.name, Asset.asset_type, Asset.exchange)
+                .filter(column.in_(keys[start:start + chunk_size]))
+                .all()
+            )
+            entries.extend(_directory().make_entry(*row) for row in rows)
+        _directory().upsert(entries)
+
+    def _has_fts(self, db: Session) -> bool:
+        engine = db.get_bind()
+        if engine.dialect.name != "sqlite":
+            return False
+        available = self._fts_engines.get(engine)
+        if available is None:
+            available = inspect(engine).has_table("assets_fts")
+            self._fts_engines[engine] = available
+        return available
+
 
-asset = CRUDAsset(Asset)
\ No newline at end of file
+asset = CRUDAsset(Asset)
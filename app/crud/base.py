@@ -1,33 +1,81 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from functools import lru_cache
+from itertools import groupby
+from typing import (
+    Any, Dict, FrozenSet, Generic, Iterator, List, Mapping, Optional, Sequence, Type, TypeVar,
+    Union
+)
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import inspect, insert, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.base import NO_VALUE
 from app.core.database import Base
+from app.crud.loading import LoadOptions
+from app.crud.pagination import decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows sent per executemany round-trip by the bulk methods
+BULK_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def column_keys(model: type) -> FrozenSet[str]:
+    """Mapped column attribute names of a model, computed once per model"""
+    return frozenset(attr.key for attr in inspect(model).column_attrs)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    def get(self, db: Session, id: Any, *, options: LoadOptions = ()) -> Optional[ModelType]:
+        return db.query(self.model).options(*options).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, options: LoadOptions = ()
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return db.query(self.model).options(*options).offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+    def get_multi_after(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        skip: int = 0,
+        options: LoadOptions = ()
+    ) -> List[ModelType]:
+        """Keyset page ordered by id, starting after the row the cursor points at (then skipping skip rows)"""
+        query = db.query(self.model).options(*options)
+        if cursor:
+            query = query.filter(self.model.id > self.decode_id_cursor(cursor))
+        return query.order_by(self.model.id).offset(skip).limit(limit).all()
+
+    def cursor_for(self, db_obj: ModelType) -> str:
+        return encode_cursor([db_obj.id])
+
+    @staticmethod
+    def decode_id_cursor(cursor: str) -> int:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise ValueError("Invalid pagination cursor")
+        return values[0]
+
+    def create(self, db: Session, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
+        """Insert and commit; with commit=False only flush, leaving the commit to the caller"""
         if hasattr(obj_in, 'model_dump'):
             obj_in_data = obj_in.model_dump()
         else:
             obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -37,9 +85,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        refresh: bool = True,
+        commit: bool = True
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
+        """
+        Apply the column values in obj_in that differ from db_obj and commit, so
+        unchanged values are not written but earlier work in the session is still
+        committed. With refresh=False db_obj is not re-selected after the commit:
+        its column values are kept as they were flushed, saving the follow-up SELECT
+        for callers that don't need server-generated values. With commit=False the
+        changes are only flushed and the caller commits.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -47,16 +104,132 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 update_data = obj_in.model_dump(exclude_unset=True)
             else:
                 update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+
+        columns = column_keys(type(db_obj))
+        state = inspect(db_obj)
+        changed = False
+        for field, value in update_data.items():
+            if field not in columns:
+                continue
+            # loaded_value avoids a lazy load for expired attributes; those are just set
+            current = state.attrs[field].loaded_value
+            if current is NO_VALUE or current != value:
+                setattr(db_obj, field, value)
+                changed = True
+
+        if changed:
+            db.add(db_obj)
+        if not commit:
+            db.flush()
+        elif refresh:
+            db.commit()
+            if changed:
+                db.refresh(db_obj)
+        else:
+            db.flush()
+            # Only this object keeps its values; the rest of the session expires as usual
+            loaded = {key: state.dict[key] for key in columns if key in state.dict}
+            db.commit()
+            for key, value in loaded.items():
+                set_committed_value(db_obj, key, value)
         return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
+    def bulk_create(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        batch_size: int = BULK_BATCH_SIZE
+    ) -> int:
+        """Insert many rows with one executemany per batch and a single commit"""
+        rows = [self._as_dict(obj_in) for obj_in in objs_in]
+        for batch in self._batches(rows, batch_size):
+            db.execute(insert(self.model), batch)
+        db.commit()
+        return len(rows)
+
+    def bulk_update(
+        self,
+        db: Session,
+        *,
+        values_by_id: Mapping[Any, Dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE
+    ) -> int:
+        """
+        Apply {id: {column: value}} with one UPDATE ... WHERE id = ? executemany per
+        batch and a single commit. Objects already loaded in the session are expired
+        by the commit, so they pick up the new values on next access.
+        """
+        rows = [{**values, "id": id} for id, values in values_by_id.items()]
+        for batch in self._batches(rows, batch_size):
+            db.execute(update(self.model), batch)
+        db.commit()
+        return len(rows)
+
+    def upsert(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Sequence[str],
+        update_fields: Optional[Sequence[str]] = None,
+        batch_size: int = BULK_BATCH_SIZE
+    ) -> int:
+        """
+        INSERT ... ON CONFLICT (index_elements) DO UPDATE, one statement per batch.
+        update_fields defaults to every supplied column outside the conflict target;
+        rows with nothing else to set are inserted with ON CONFLICT DO NOTHING.
+        Only SQLite and PostgreSQL have the statement; other dialects raise ValueError.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            raise ValueError(f"upsert needs ON CONFLICT support, which the {dialect} dialect lacks")
+
+        rows = [self._as_dict(obj_in) for obj_in in objs_in]
+        for batch in self._batches(rows, batch_size):
+            stmt = dialect_insert(self.model.__table__)
+            fields = update_fields or [k for k in batch[0] if k not in index_elements]
+            if fields:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(index_elements),
+                    set_={field: stmt.excluded[field] for field in fields}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+            db.execute(stmt, batch)
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def _as_dict(obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(obj_in, dict):
+            return obj_in
+        if hasattr(obj_in, 'model_dump'):
+            return obj_in.model_dump()
+        return jsonable_encoder(obj_in)
+
+    @staticmethod
+    def _batches(
+        rows: List[Dict[str, Any]], batch_size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Split rows into executemany batches whose dicts all share the same keys"""
+        def keys(row: Dict[str, Any]):
+            return tuple(sorted(row))
+
+        for _, group in groupby(sorted(rows, key=keys), key=keys):
+            group = list(group)
+            for start in range(0, len(group), batch_size):
+                yield group[start:start + batch_size]
+
+    def remove(self, db: Session, *, id: int, commit: bool = True) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         return obj
\ No newline at end of file
@@ -1,18 +1,33 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.loading import LoadOptions
 from app.models.holding import Holding
 from app.schemas.holding import HoldingCreate, HoldingUpdate
 
 
 class CRUDHolding(CRUDBase[Holding, HoldingCreate, HoldingUpdate]):
-    def get_by_portfolio(self, db: Session, *, portfolio_id: int) -> List[Holding]:
-        return (
+    def get_by_portfolio(
+        self,
+        db: Session,
+        *,
+        portfolio_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        options: LoadOptions = ()
+    ) -> List[Holding]:
+        query = (
             db.query(Holding)
-            .options(joinedload(Holding.asset))
+            .options(*options)
             .filter(Holding.portfolio_id == portfolio_id)
-            .all()
         )
+        if cursor:
+            query = query.filter(Holding.id > self.decode_id_cursor(cursor))
+        query = query.order_by(Holding.id).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
     def get_by_portfolio_and_asset(
         self, db: Session, *, portfolio_id: int, asset_id: int
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.job import Job, JobStatus, JobType
+from app.schemas.job import JobCreate, JobUpdate
+
+
+class CRUDJob(CRUDBase[Job, JobCreate, JobUpdate]):
+    def get_recent(
+        self,
+        db: Session,
+        *,
+        status: Optional[JobStatus] = None,
+        job_type: Optional[JobType] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        query = db.query(Job)
+        if status:
+            query = query.filter(Job.status == status)
+        if job_type:
+            query = query.filter(Job.job_type == job_type)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+
+    def get_active(self, db: Session, *, job_type: JobType) -> Optional[Job]:
+        """A queued or running job of this type, if any"""
+        return (
+            db.query(Job)
+            .filter(Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]), Job.job_type == job_type)
+            .first()
+        )
+
+    def claim_next(
+        self, db: Session, *, job_types: Optional[Sequence[JobType]] = None
+    ) -> Optional[Job]:
+        """
+        Move the oldest queued job to running and return it, or None when nothing is
+        queued. The UPDATE only matches while the row is still queued, so concurrent
+        workers, in this process or another, never claim the same job.
+        """
+        while True:
+            query = db.query(Job.id).filter(Job.status == JobStatus.QUEUED)
+            if job_types:
+                query = query.filter(Job.job_type.in_(job_types))
+            candidate = query.order_by(Job.id).first()
+            if candidate is None:
+                return None
+            now = datetime.utcnow()
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == candidate.id, Job.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    started_at=func.coalesce(Job.started_at, now),
+                    heartbeat_at=now,
+                    attempts=Job.attempts + 1,
+                )
+            ).rowcount
+            db.commit()
+            if claimed:
+                return self.get(db, candidate.id)
+
+    def requeue_stale(
+        self,
+        db: Session,
+        *,
+        heartbeat_before: datetime,
+        job_types: Optional[Sequence[JobType]] = None
+    ) -> int:
+        """Queue running jobs whose worker stopped heartbeating (crash or restart) again"""
+        stmt = update(Job).where(
+            Job.status == JobStatus.RUNNING, Job.heartbeat_at < heartbeat_before
+        )
+        if job_types:
+            stmt = stmt.where(Job.job_type.in_(job_types))
+        requeued = db.execute(stmt.values(status=JobStatus.QUEUED)).rowcount
+        db.commit()
+        return requeued
+
+
+job = CRUDJob(Job)
@@ -0,0 +1,28 @@
+from typing import Dict, Sequence, Tuple
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.models.watchlist import WatchlistItem
+from app import schemas
+
+LoadOptions = Sequence[ORMOption]
+
+# Eager loads needed to build each response schema without lazy loads.
+# Many-to-one relationships are joined into the same SELECT; one-to-many
+# collections use one extra SELECT ... IN per query so LIMIT still applies to
+# parent rows. Schemas without relationships need no entry.
+LOADING_POLICIES: Dict[type, Tuple[ORMOption, ...]] = {
+    schemas.HoldingWithAsset: (joinedload(Holding.asset),),
+    schemas.TransactionWithAsset: (joinedload(Transaction.asset),),
+    schemas.WatchlistItem: (joinedload(WatchlistItem.asset),),
+    schemas.PortfolioWithHoldings: (
+        selectinload(Portfolio.holdings).joinedload(Holding.asset),
+    ),
+}
+
+
+def loading_policy(schema: type) -> Tuple[ORMOption, ...]:
+    """Loader options for building the given response schema from ORM rows"""
+    return LOADING_POLICIES.get(schema, ())
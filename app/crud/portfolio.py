@@ -1,28 +1,20 @@
 from typing import List
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.loading import loading_policy
 from app.models.portfolio import Portfolio
-from app.schemas.portfolio import PortfolioCreate, PortfolioUpdate
+from app.schemas.portfolio import PortfolioCreate, PortfolioUpdate, PortfolioWithHoldings
 
 
 class CRUDPortfolio(CRUDBase[Portfolio, PortfolioCreate, PortfolioUpdate]):
     def get_with_holdings(self, db: Session, *, id: int) -> Portfolio:
-        return (
-            db.query(Portfolio)
-            .options(joinedload(Portfolio.holdings).joinedload("asset"))
-            .filter(Portfolio.id == id)
-            .first()
-        )
+        return self.get(db, id, options=loading_policy(PortfolioWithHoldings))
 
     def get_multi_with_holdings(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[Portfolio]:
-        return (
-            db.query(Portfolio)
-            .options(joinedload(Portfolio.holdings).joinedload("asset"))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.get_multi(
+            db, skip=skip, limit=limit, options=loading_policy(PortfolioWithHoldings)
         )
 
 
@@ -0,0 +1,23 @@
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.price_history import PriceHistory
+
+
+class CRUDPriceHistory(CRUDBase[PriceHistory, Any, Any]):
+    def upsert_bars(
+        self,
+        db: Session,
+        *,
+        bars: Sequence[Dict[str, Any]],
+        update_fields: Optional[Sequence[str]] = None
+    ) -> int:
+        """Insert or overwrite daily bars keyed by (asset_id, date)"""
+        if not bars:
+            return 0
+        return self.upsert(
+            db, objs_in=bars, index_elements=["asset_id", "date"], update_fields=update_fields
+        )
+
+
+price_history = CRUDPriceHistory(PriceHistory)
@@ -1,28 +1,98 @@
-from typing import List
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
 from app.crud.base import CRUDBase
+from app.crud.loading import LoadOptions
+from app.crud.pagination import decode_cursor, encode_cursor
 from app.models.transaction import Transaction
 from app.schemas.transaction import TransactionCreate, TransactionUpdate
 
 
 class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate]):
-    def get_by_portfolio(self, db: Session, *, portfolio_id: int) -> List[Transaction]:
-        return (
+    def get_by_portfolio(
+        self,
+        db: Session,
+        *,
+        portfolio_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        options: LoadOptions = ()
+    ) -> List[Transaction]:
+        query = (
             db.query(Transaction)
-            .options(joinedload(Transaction.asset))
+            .options(*options)
             .filter(Transaction.portfolio_id == portfolio_id)
-            .order_by(Transaction.transaction_date.desc())
-            .all()
         )
+        return self._paginate(query, cursor=cursor, limit=limit, skip=skip).all()
 
-    def get_by_asset(self, db: Session, *, asset_id: int) -> List[Transaction]:
-        return (
+    def get_by_asset(
+        self,
+        db: Session,
+        *,
+        asset_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        options: LoadOptions = ()
+    ) -> List[Transaction]:
+        query = (
             db.query(Transaction)
-            .options(joinedload(Transaction.asset))
+            .options(*options)
             .filter(Transaction.asset_id == asset_id)
-            .order_by(Transaction.transaction_date.desc())
-            .all()
         )
+        return self._paginate(query, cursor=cursor, limit=limit, skip=skip).all()
+
+    def get_multi_after(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        skip: int = 0,
+        options: LoadOptions = ()
+    ) -> List[Transaction]:
+        """Keyset page over all transactions, newest first"""
+        query = db.query(Transaction).options(*options)
+        return self._paginate(query, cursor=cursor, limit=limit, skip=skip).all()
+
+    def cursor_for(self, db_obj: Transaction) -> str:
+        return encode_cursor([db_obj.transaction_date, db_obj.id])
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        values = decode_cursor(cursor)
+        if len(values) != 2 or not isinstance(values[1], int):
+            raise ValueError("Invalid pagination cursor")
+        try:
+            return datetime.fromisoformat(values[0]), values[1]
+        except (TypeError, ValueError):
+            raise ValueError("Invalid pagination cursor")
+
+    def _paginate(
+        self, query: Query, *, cursor: Optional[str], limit: Optional[int], skip: int = 0
+    ) -> Query:
+        """
+        Order by (transaction_date, id) descending and seek past the cursor.
+        Seeking on the sort key instead of OFFSET keeps deep pages as cheap as
+        the first one, given the composite indexes on Transaction.
+        """
+        if cursor:
+            last_date, last_id = self._decode_cursor(cursor)
+            # The redundant upper bound on transaction_date lets SQLite turn
+            # the seek into an index range instead of scanning the OR branches
+            query = query.filter(
+                Transaction.transaction_date <= last_date,
+                or_(
+                    Transaction.transaction_date < last_date,
+                    Transaction.id < last_id
+                )
+            )
+        query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc()).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
 
 transaction = CRUDTransaction(Transaction)
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Any, List, Optional
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.crud.loading import LoadOptions
+from app.models.watchlist import WatchlistItem
+
+
+class CRUDWatchlist(CRUDBase[WatchlistItem, Any, Any]):
+    def get_by_portfolio(
+        self, db: Session, *, portfolio_id: int, options: LoadOptions = ()
+    ) -> List[WatchlistItem]:
+        return (
+            db.query(WatchlistItem)
+            .options(*options)
+            .filter(WatchlistItem.portfolio_id == portfolio_id)
+            .order_by(WatchlistItem.id)
+            .all()
+        )
+
+    def get_by_portfolio_and_asset(
+        self, db: Session, *, portfolio_id: int, asset_id: int
+    ) -> Optional[WatchlistItem]:
+        return (
+            db.query(WatchlistItem)
+            .filter(
+                WatchlistItem.portfolio_id == portfolio_id,
+                WatchlistItem.asset_id == asset_id
+            )
+            .first()
+        )
+
+    def add(self, db: Session, *, portfolio_id: int, asset_id: int) -> WatchlistItem:
+        """Watch an asset from a portfolio; watching it again returns the existing entry"""
+        existing = self.get_by_portfolio_and_asset(db, portfolio_id=portfolio_id, asset_id=asset_id)
+        if existing is not None:
+            return existing
+        return self.create(db, obj_in={"portfolio_id": portfolio_id, "asset_id": asset_id})
+
+
+watchlist = CRUDWatchlist(WatchlistItem)
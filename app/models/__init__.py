@@ -2,5 +2,8 @@ from .portfolio import Portfolio
 from .holding import Holding
 from .transaction import Transaction
 from .asset import Asset
+from .job import Job
+from .price_history import PriceHistory
+from .watchlist import WatchlistItem
 
-__all__ = ["Portfolio", "Holding", "Transaction", "Asset"]
\ No newline at end of file
+__all__ = ["Portfolio", "Holding", "Transaction", "Asset", "Job", "PriceHistory", "WatchlistItem"]
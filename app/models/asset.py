@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Numeric
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Numeric, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -29,4 +29,37 @@ class Asset(Base):
 
     # Relationships
     holdings = relationship("Holding", back_populates="asset")
-    transactions = relationship("Transaction", back_populates="asset")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="asset")
+
+
+# Full-text index over symbol and name used by CRUDAsset.search_by_name_or_symbol.
+# It is an external-content FTS5 table kept in sync by triggers, so every write path
+# (ORM, bulk upsert, raw SQL) updates it. '.' and '-' are token characters so
+# symbols such as BRK.B stay a single token.
+ASSET_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5(
+        symbol, name,
+        content='assets', content_rowid='id',
+        tokenize="unicode61 tokenchars '.-'", prefix='1 2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_ai AFTER INSERT ON assets BEGIN
+        INSERT INTO assets_fts(rowid, symbol, name) VALUES (new.id, new.symbol, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_ad AFTER DELETE ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, symbol, name)
+        VALUES ('delete', old.id, old.symbol, old.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assets_fts_au AFTER UPDATE OF symbol, name ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, symbol, name)
+        VALUES ('delete', old.id, old.symbol, old.name);
+        INSERT INTO assets_fts(rowid, symbol, name) VALUES (new.id, new.symbol, new.name);
+    END""",
+]
+
+for _statement in ASSET_SEARCH_DDL:
+    event.listen(Asset.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Asset.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS assets_fts").execute_if(dialect="sqlite")
+)
\ No newline at end of file
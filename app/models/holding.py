@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -6,6 +6,11 @@ from app.core.database import Base
 
 class Holding(Base):
     __tablename__ = "holdings"
+    __table_args__ = (
+        # One holding per asset per portfolio; also serves get_by_portfolio_and_asset
+        Index("uq_holdings_portfolio_asset", "portfolio_id", "asset_id", unique=True),
+        Index("ix_holdings_portfolio_id_id", "portfolio_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False)
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Enum, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class JobType(str, enum.Enum):
+    PRICE_REFRESH = "price_refresh"
+    BULK_IMPORT = "bulk_import"
+    HISTORY_BACKFILL = "history_backfill"
+    HOLDINGS_REBUILD = "holdings_rebuild"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job of the types they handle
+        Index("ix_jobs_status_type_id", "status", "job_type", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(Enum(JobType), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    params = Column(JSON, nullable=False, default=dict)
+    total_items = Column(Integer, nullable=True)
+    completed_items = Column(Integer, nullable=False, default=0)
+    failed_items = Column(Integer, nullable=False, default=0)
+    # Per-item failures as [{"item": ..., "error": ...}], capped at MAX_JOB_ERRORS
+    errors = Column(JSON, nullable=False, default=list)
+    # Set when the job as a whole failed rather than individual items
+    error = Column(String(1000), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def processed_items(self) -> int:
+        return (self.completed_items or 0) + (self.failed_items or 0)
+
+    @property
+    def progress(self) -> Optional[float]:
+        if not self.total_items:
+            return 1.0 if self.status == JobStatus.SUCCEEDED else None
+        return self.processed_items / self.total_items
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
@@ -15,4 +15,5 @@ class Portfolio(Base):
 
     # Relationships
     holdings = relationship("Holding", back_populates="portfolio", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="portfolio", cascade="all, delete-orphan")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="portfolio", cascade="all, delete-orphan")
+    watchlist = relationship("WatchlistItem", back_populates="portfolio", cascade="all, delete-orphan")
\ No newline at end of file
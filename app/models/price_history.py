@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, Date, BigInteger, Index
+from app.core.database import Base
+
+
+class PriceHistory(Base):
+    """Daily OHLCV bars written by history backfill jobs"""
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index("uq_price_history_asset_date", "asset_id", "date", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    open = Column(Numeric(14, 4), nullable=True)
+    high = Column(Numeric(14, 4), nullable=True)
+    low = Column(Numeric(14, 4), nullable=True)
+    close = Column(Numeric(14, 4), nullable=False)
+    volume = Column(BigInteger, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Enum, String
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Enum, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -16,6 +16,12 @@ class TransactionType(str, enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination seeks on (transaction_date, id) within a portfolio or asset
+        Index("ix_transactions_portfolio_date_id", "portfolio_id", "transaction_date", "id"),
+        Index("ix_transactions_asset_date_id", "asset_id", "transaction_date", "id"),
+        Index("ix_transactions_date_id", "transaction_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class WatchlistItem(Base):
+    """An asset a portfolio follows without holding it; its price is kept fresh like a holding's"""
+    __tablename__ = "watchlist_items"
+    __table_args__ = (
+        Index("uq_watchlist_items_portfolio_asset", "portfolio_id", "asset_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    portfolio = relationship("Portfolio", back_populates="watchlist")
+    asset = relationship("Asset")
@@ -0,0 +1,15 @@
+from .alpha_vantage import AlphaVantageProvider
+from .base import PriceProvider
+from .chain import CircuitBreaker, ProviderChain, ProviderUnavailable
+from .factory import build_chain, build_provider, get_provider, set_provider
+from .ratelimit import AdaptiveRateLimiter, Priority, ProviderThrottled, priority
+from .replay import ReplayProvider, record
+from .synthetic import SyntheticProvider
+from .yahoo import YFinanceProvider
+
+__all__ = [
+    "PriceProvider", "YFinanceProvider", "AlphaVantageProvider", "ReplayProvider", "SyntheticProvider",
+    "ProviderChain", "CircuitBreaker", "ProviderUnavailable",
+    "AdaptiveRateLimiter", "Priority", "ProviderThrottled", "priority",
+    "build_provider", "build_chain", "get_provider", "set_provider", "record",
+]
@@ -0,0 +1,86 @@
+import json
+import urllib.parse
+import urllib.request
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from app.models.asset import AssetType
+from app.providers.base import Bar, PriceProvider, slice_period
+from app.providers.ratelimit import ProviderThrottled
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+# TIME_SERIES_DAILY returns the latest 100 bars unless asked for the full history
+COMPACT_PERIODS = {"1d", "5d", "1mo", "3mo"}
+
+
+class AlphaVantageProvider(PriceProvider):
+    """
+    Alpha Vantage REST API, used as a fallback behind yfinance. Unknown symbols
+    raise LookupError; throttling notes raise ProviderThrottled and HTTP failures
+    OSError, so the rate limiter and circuit breaker can count them.
+    """
+
+    name = "alpha_vantage"
+    rate_limited = True
+
+    def __init__(self, api_key: str, base_url: str = ALPHA_VANTAGE_URL, timeout: float = 10.0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        data = self._get(function="GLOBAL_QUOTE", symbol=symbol).get("Global Quote") or {}
+        price = data.get("05. price")
+        return Decimal(price) if price else None
+
+    def info(self, symbol: str) -> Dict:
+        data = self._get(function="OVERVIEW", symbol=symbol)
+        if not data.get("Symbol"):
+            raise LookupError(f"{self.name} has no overview for {symbol}")
+        return {
+            'symbol': symbol.upper(),
+            'name': data.get("Name") or symbol.upper(),
+            'asset_type': AssetType.ETF if data.get("AssetType") == "ETF" else AssetType.STOCK,
+            'exchange': data.get("Exchange"),
+            'currency': data.get("Currency") or 'USD',
+            'current_price': None,
+            'sector': data.get("Sector"),
+            'industry': data.get("Industry")
+        }
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        if interval != "1d":
+            raise ValueError(f"{self.name} provider only serves daily bars, not {interval}")
+        data = self._get(
+            function="TIME_SERIES_DAILY",
+            symbol=symbol,
+            outputsize="compact" if period in COMPACT_PERIODS else "full"
+        )
+        series = data.get("Time Series (Daily)") or {}
+        bars = [
+            {
+                'date': day,
+                'open': float(values["1. open"]),
+                'high': float(values["2. high"]),
+                'low': float(values["3. low"]),
+                'close': float(values["4. close"]),
+                'volume': int(values["5. volume"])
+            }
+            for day, values in sorted(series.items())
+        ]
+        if not bars:
+            return []
+        return slice_period(bars, period, date.fromisoformat(bars[-1]['date']))
+
+    def _get(self, **params: str) -> Dict:
+        query = urllib.parse.urlencode({**params, "apikey": self.api_key})
+        with urllib.request.urlopen(f"{self.base_url}?{query}", timeout=self.timeout) as response:
+            data = json.loads(response.read())
+        if "Error Message" in data:
+            raise LookupError(data["Error Message"])
+        # Rate-limit and premium-endpoint notices come back as 200s with one of these keys
+        for key in ("Note", "Information"):
+            if key in data:
+                raise ProviderThrottled(f"{self.name}: {data[key]}")
+        return data
@@ -0,0 +1,91 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Protocol, Sequence, runtime_checkable
+
+# A daily (or intraday) bar as PriceService returns it:
+# {"date": "YYYY-MM-DD", "open", "high", "low", "close": float, "volume": int}
+Bar = Dict
+
+# Calendar days covered by each yfinance-style period; "Nd" periods count trading
+# days instead, and "ytd" and "max" are handled in slice_period
+PERIOD_DAYS = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+
+def period_start(period: str, end: date) -> Optional[date]:
+    """First calendar date of a month/year period ending at end; None for "max" """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return date(end.year, 1, 1)
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Unsupported period: {period}")
+    return end - timedelta(days=PERIOD_DAYS[period] - 1)
+
+
+def slice_period(bars: List[Bar], period: str, end: date) -> List[Bar]:
+    """The bars (oldest first) that yfinance would return for period ending at end"""
+    if period in ("1d", "5d"):
+        return bars[-int(period[:-1]):]
+    start = period_start(period, end)
+    if start is None:
+        return list(bars)
+    start_key = start.isoformat()
+    return [bar for bar in bars if bar['date'] >= start_key]
+
+
+@runtime_checkable
+class PriceProvider(Protocol):
+    """
+    Source of quotes, asset info and price history for PriceService.
+
+    Implementations raise on failure; PriceService turns errors into its
+    usual None / fallback results and records metrics and spans around calls.
+    """
+
+    name: str
+    # Remote providers get an adaptive rate limiter in the provider chain
+    rate_limited: bool = False
+    # quotes() answers a whole batch in one request; otherwise it loops over quote()
+    batch_quotes: bool = False
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        """Latest price, or None when the provider has none"""
+        ...
+
+    def quotes(self, symbols: Sequence[str]) -> Dict[str, Optional[Decimal]]:
+        """Latest prices for many symbols; symbols that fail map to None"""
+        prices = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self.quote(symbol)
+            except Exception as e:
+                print(f"Error fetching price for {symbol}: {e}")
+                prices[symbol] = None
+        return prices
+
+    def info(self, symbol: str) -> Dict:
+        """
+        Asset details: symbol, name, asset_type, exchange, currency,
+        current_price, sector and industry
+        """
+        ...
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        """Bars oldest first; empty when the symbol has no data"""
+        ...
+
+
+class InjectedLatency:
+    """Sleeps a fixed delay plus uniform jitter per call, to model a remote provider offline"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, rng: Optional[random.Random] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = rng or random.Random()
+
+    def __call__(self) -> None:
+        delay = self.latency_ms + (self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
@@ -0,0 +1,361 @@
+"""
+Provider fallback chain with per-call deadlines, hedged requests and circuit breakers.
+
+Each call goes to the first provider whose circuit is closed. If it has not
+answered within that provider's recent p95 latency, a hedged request is sent to
+the next provider and whichever answers first wins. Errors and empty answers
+fall through to the next provider at once. Nothing waits past the call
+deadline: a provider still running then is abandoned (its thread finishes in
+the background) and the call raises TimeoutError, so a hanging upstream costs
+at most one deadline per call instead of its own timeout.
+
+A provider that keeps failing or timing out has its circuit opened and is
+skipped until reset_after seconds have passed; then one trial call decides
+whether it closes again. Providers with a rate limiter take a token per
+upstream request first (see app.providers.ratelimit); time queued for one
+counts toward hedging and the deadline but never against the provider's
+circuit.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+from app.core.metrics import price_provider_attempts, price_provider_circuit, price_provider_hedges
+from app.providers.base import Bar, PriceProvider
+from app.providers.ratelimit import AdaptiveRateLimiter, Priority, current_priority, is_throttle
+
+
+class ProviderUnavailable(RuntimeError):
+    """Every provider in the chain is skipped because its circuit is open"""
+
+
+class QueueTimeout(TimeoutError):
+    """The call waited for a rate-limit token until its deadline and never reached the provider"""
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures; allows one trial call after reset_after seconds"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_after:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+class LatencyWindow:
+    """Latencies of a provider's recent successful calls, for its hedging delay"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class _Link:
+    """A provider in the chain with its breaker and latency window"""
+
+    def __init__(self, provider: PriceProvider, breaker: CircuitBreaker, limiter: Optional[AdaptiveRateLimiter]):
+        self.provider = provider
+        self.breaker = breaker
+        self.limiter = limiter
+        self.latency = LatencyWindow()
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+
+class _Attempt:
+    """One provider call; its outcome is recorded once, by the call or by the deadline, whichever is first"""
+
+    def __init__(self, link: _Link, operation: str):
+        self.link = link
+        self.operation = operation
+        self.started = time.monotonic()
+        self.future: Optional[Future] = None
+        # Set once a rate-limit token is held and the provider is being called
+        self.calling = False
+        self._settled = False
+        self._lock = threading.Lock()
+
+    def settle(self, outcome: str) -> None:
+        with self._lock:
+            if self._settled:
+                return
+            self._settled = True
+        price_provider_attempts.inc(provider=self.link.name, operation=self.operation, outcome=outcome)
+        if outcome in ("ok", "empty"):
+            self.link.breaker.record_success()
+        elif outcome in ("error", "throttled", "timeout"):
+            self.link.breaker.record_failure()
+        price_provider_circuit.set(int(self.link.breaker.state != CircuitBreaker.CLOSED), provider=self.link.name)
+
+
+def _error_outcome(error: BaseException) -> str:
+    if isinstance(error, QueueTimeout):
+        return "queued"
+    if isinstance(error, LookupError):
+        return "empty"
+    return "throttled" if is_throttle(error) else "error"
+
+
+def _is_empty(result: Any) -> bool:
+    if isinstance(result, dict) and result and all(v is None for v in result.values()):
+        return True
+    return result is None or result == []
+
+
+class ProviderChain(PriceProvider):
+    """PriceProvider that fans a call out over several providers; see the module docstring"""
+
+    name = "chain"
+
+    def __init__(
+        self,
+        providers: Sequence[PriceProvider],
+        *,
+        deadline: float = 5.0,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.05,
+        failure_threshold: int = 5,
+        reset_after: float = 30.0,
+        max_workers: int = 32,
+        limiter_factory: Optional[Callable[[PriceProvider], Optional[AdaptiveRateLimiter]]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not providers:
+            raise ValueError("A provider chain needs at least one provider")
+        self.links = [
+            _Link(p, CircuitBreaker(failure_threshold, reset_after, clock), limiter_factory and limiter_factory(p))
+            for p in providers
+        ]
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-provider")
+
+    @property
+    def providers(self) -> List[PriceProvider]:
+        return [link.provider for link in self.links]
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        return self._call("quote", symbol)[1]
+
+    def quotes(self, symbols: Sequence[str]) -> Dict[str, Optional[Decimal]]:
+        """
+        Batch quotes when every provider has a native batch request and no rate
+        limiter; otherwise one quote call per symbol, each with its own deadline,
+        limiter token and latency sample, since a batch would count as a single
+        upstream request. Symbols that fail map to None.
+        """
+        if all(getattr(link.provider, "batch_quotes", False) and link.limiter is None for link in self.links):
+            return self._batch_quotes(symbols)
+        prices: Dict[str, Optional[Decimal]] = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self.quote(symbol)
+            except Exception as e:
+                print(f"Error fetching price for {symbol}: {e}")
+                prices[symbol] = None
+        return prices
+
+    def _batch_quotes(self, symbols: Sequence[str]) -> Dict[str, Optional[Decimal]]:
+        """One batch per provider: symbols a provider has no price for are asked of the next one"""
+        prices: Dict[str, Optional[Decimal]] = {symbol: None for symbol in symbols}
+        tried: Set[int] = set()
+        missing = list(symbols)
+        while missing and len(tried) < len(self.links):
+            try:
+                index, batch = self._call("quotes", missing, exclude=tried)
+            except ProviderUnavailable:
+                break
+            except Exception:
+                # Keep the prices already found; fail only when there are none
+                if len(missing) == len(symbols):
+                    raise
+                break
+            tried.add(index)
+            prices.update({s: p for s, p in batch.items() if p is not None})
+            missing = [s for s in missing if prices[s] is None]
+        return prices
+
+    def info(self, symbol: str) -> Dict:
+        return self._call("info", symbol)[1]
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        return self._call("history", symbol, period, interval)[1]
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Circuit state and hedging delay of each provider, in chain order"""
+        return [
+            {
+                "provider": link.name,
+                "circuit": link.breaker.state,
+                "consecutive_failures": link.breaker.failures,
+                "hedge_after_ms": round(self._hedge_delay(link) * 1000, 1),
+                "rate_limit_per_second": round(link.limiter.rate, 2) if link.limiter else None,
+            }
+            for link in self.links
+        ]
+
+    def _hedge_delay(self, link: _Link) -> float:
+        p = link.latency.percentile(self.hedge_quantile, self.hedge_min_samples)
+        # Until a provider has enough samples, and whenever its tail is slower than
+        # that, hedge halfway to the deadline so the next provider still has time
+        if p is None:
+            return self.deadline / 2
+        return min(max(p, self.hedge_min_delay), self.deadline / 2)
+
+    def _start(self, index: int, operation: str, args: Tuple, level: Priority, deadline: float) -> _Attempt:
+        link = self.links[index]
+        attempt = _Attempt(link, operation)
+
+        def run():
+            if link.limiter is not None and not link.limiter.acquire(level, timeout=deadline - time.monotonic()):
+                raise QueueTimeout(f"No {link.name} rate-limit token before the deadline")
+            attempt.calling = True
+            called = time.monotonic()
+            try:
+                result = getattr(link.provider, operation)(*args)
+            except Exception as e:
+                if link.limiter is not None and is_throttle(e):
+                    link.limiter.on_throttled()
+                raise
+            if link.limiter is not None:
+                link.limiter.on_success(time.monotonic() - called)
+            link.latency.observe(time.monotonic() - attempt.started)
+            return result
+
+        attempt.future = self._executor.submit(run)
+        return attempt
+
+    def _call(self, operation: str, *args: Any, exclude: Set[int] = frozenset()) -> Tuple[int, Any]:
+        """
+        Run operation across the chain until one provider answers with data, all
+        providers are exhausted, or the deadline passes; returns (link index, result)
+        """
+        deadline = time.monotonic() + self.deadline
+        level = current_priority()
+        candidates = iter(i for i in range(len(self.links)) if i not in exclude)
+        pending: Dict[Future, Tuple[int, _Attempt]] = {}
+        empty: Optional[Tuple[int, Any]] = None
+        error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            for index in candidates:
+                link = self.links[index]
+                if not link.breaker.allow():
+                    price_provider_attempts.inc(provider=link.name, operation=operation, outcome="rejected")
+                    continue
+                attempt = self._start(index, operation, args, level, deadline)
+                pending[attempt.future] = (index, attempt)
+                return True
+            return False
+
+        if not launch():
+            raise ProviderUnavailable(f"No price provider available for {operation}: all circuits open")
+        hedge_at = time.monotonic() + self._hedge_delay(self.links[next(iter(pending.values()))[0]])
+
+        while pending:
+            now = time.monotonic()
+            done, _ = wait(pending, timeout=max(0.0, min(deadline, hedge_at) - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, attempt = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    attempt.settle(_error_outcome(e))
+                    # Report the first provider's failure; fallbacks failing too is secondary
+                    error = error or e
+                    continue
+                if _is_empty(result):
+                    attempt.settle("empty")
+                    empty = empty or (index, result)
+                    continue
+                attempt.settle("ok")
+                self._abandon(pending)
+                return index, result
+
+            now = time.monotonic()
+            if now >= deadline:
+                self._abandon(pending, timed_out=True)
+                raise TimeoutError(f"Price {operation} exceeded its {self.deadline:g}s deadline")
+            if not pending:
+                # Every running attempt failed or came back empty: fall through at once
+                if launch():
+                    hedge_at = now + self._hedge_delay(self.links[next(iter(pending.values()))[0]])
+                continue
+            if now >= hedge_at:
+                if launch():
+                    index, _ = list(pending.values())[-1]
+                    price_provider_hedges.inc(provider=self.links[index].name)
+                    hedge_at = now + self._hedge_delay(self.links[index])
+                else:
+                    hedge_at = deadline
+
+        if empty is not None:
+            return empty
+        if error is not None:
+            raise error
+        raise ProviderUnavailable(f"No price provider available for {operation}: all circuits open")
+
+    def _abandon(self, pending: Dict[Future, Tuple[int, _Attempt]], timed_out: bool = False) -> None:
+        """Stop waiting for attempts; losers of a hedge race are recorded when they finish"""
+        for future, (_, attempt) in pending.items():
+            if timed_out:
+                # Time spent queued for a token is our own limiter, not the provider's fault
+                attempt.settle("timeout" if attempt.calling else "queued")
+            else:
+                future.add_done_callback(lambda f, a=attempt: a.settle(self._late_outcome(a, f)))
+
+    def _late_outcome(self, attempt: _Attempt, future: Future) -> str:
+        e = future.exception()
+        if e is not None:
+            return _error_outcome(e)
+        return "timeout" if time.monotonic() - attempt.started > self.deadline else "ok"
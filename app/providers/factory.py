@@ -0,0 +1,94 @@
+import threading
+from typing import List, Optional, Sequence
+from app.core.config import settings
+from app.providers.base import PriceProvider
+from app.providers.chain import ProviderChain
+from app.providers.ratelimit import AdaptiveRateLimiter
+
+_provider: Optional[PriceProvider] = None
+_lock = threading.Lock()
+
+
+def build_provider(name: Optional[str] = None) -> PriceProvider:
+    """One provider by name ("yfinance", "alpha_vantage", "replay" or "synthetic"); default settings.price_provider"""
+    name = name or settings.price_provider
+    if name == "yfinance":
+        from app.providers.yahoo import YFinanceProvider
+        return YFinanceProvider()
+    if name == "alpha_vantage":
+        from app.providers.alpha_vantage import AlphaVantageProvider
+        if not settings.alpha_vantage_api_key:
+            raise ValueError("ALPHA_VANTAGE_API_KEY is required for the alpha_vantage price provider")
+        return AlphaVantageProvider(settings.alpha_vantage_api_key, timeout=settings.price_call_deadline_ms / 1000)
+    if name == "replay":
+        from app.providers.replay import ReplayProvider
+        if not settings.price_replay_path:
+            raise ValueError("PRICE_REPLAY_PATH is required for the replay price provider")
+        return ReplayProvider(
+            settings.price_replay_path,
+            latency_ms=settings.price_provider_latency_ms,
+            jitter_ms=settings.price_provider_jitter_ms
+        )
+    if name == "synthetic":
+        from app.providers.synthetic import SyntheticProvider
+        return SyntheticProvider(
+            seed=settings.price_synthetic_seed,
+            latency_ms=settings.price_provider_latency_ms,
+            jitter_ms=settings.price_provider_jitter_ms
+        )
+    raise ValueError(f"Unknown price provider: {name}")
+
+
+def chain_names() -> List[str]:
+    """Provider names in fallback order"""
+    if settings.price_provider_chain:
+        return [name.strip() for name in settings.price_provider_chain.split(",") if name.strip()]
+    names = [settings.price_provider]
+    if settings.alpha_vantage_api_key and "alpha_vantage" not in names:
+        names.append("alpha_vantage")
+    return names
+
+
+def build_limiter(provider: PriceProvider) -> Optional[AdaptiveRateLimiter]:
+    """Rate limiter from settings for remote providers; None for offline ones"""
+    if not getattr(provider, "rate_limited", False):
+        return None
+    return AdaptiveRateLimiter(
+        provider.name,
+        rate=settings.price_rate_limit,
+        burst=settings.price_rate_burst,
+        min_rate=settings.price_rate_min,
+        max_rate=settings.price_rate_max,
+        latency_target=settings.price_rate_latency_target_ms / 1000,
+    )
+
+
+def build_chain(names: Optional[Sequence[str]] = None) -> ProviderChain:
+    """The configured providers behind one chain with deadlines, hedging and circuit breakers"""
+    return ProviderChain(
+        [build_provider(name) for name in (names or chain_names())],
+        deadline=settings.price_call_deadline_ms / 1000,
+        hedge_quantile=settings.price_hedge_quantile,
+        failure_threshold=settings.price_circuit_failures,
+        reset_after=settings.price_circuit_reset_seconds,
+        max_workers=max(settings.price_provider_concurrency * 2, 8),
+        limiter_factory=build_limiter,
+    )
+
+
+def get_provider() -> PriceProvider:
+    """The process-wide provider chain, built from settings on first use"""
+    global _provider
+    if _provider is None:
+        with _lock:
+            if _provider is None:
+                _provider = build_chain()
+    return _provider
+
+
+def set_provider(provider: Optional[PriceProvider]) -> Optional[PriceProvider]:
+    """Replace the process-wide provider (None rebuilds the chain from settings); returns the previous one"""
+    global _provider
+    with _lock:
+        previous, _provider = _provider, provider
+    return previous
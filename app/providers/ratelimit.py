@@ -0,0 +1,151 @@
+"""
+Adaptive token-bucket rate limiting for upstream price providers.
+
+Each rate-limited provider in the chain has one AdaptiveRateLimiter, shared by
+every PriceService entry point in the process. Callers take a token before each
+provider call; when the bucket is empty they queue by priority, so user-facing
+lookups are served before background refreshes and backfills, and FIFO within a
+priority.
+
+The rate adapts AIMD-style: it grows by about `increase` tokens/s for every second
+the bucket is the bottleneck, is halved (and held for `cooldown` seconds) when
+the provider answers with a 429 or a throttling notice, and is trimmed by 10%
+when a call succeeds but slower than `latency_target`, the usual sign of an
+upstream about to throttle.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Iterator, List, Optional, Tuple
+from app.core.metrics import price_provider_queue_seconds, price_provider_rate, price_provider_throttled
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar("price_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run provider calls made inside the block at this priority"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class ProviderThrottled(RuntimeError):
+    """The provider refused the call because of its rate limit"""
+
+
+def is_throttle(error: BaseException) -> bool:
+    """Whether a provider error means "slow down": HTTP 429 or a rate-limit error/notice"""
+    if isinstance(error, ProviderThrottled) or "ratelimit" in type(error).__name__.lower():
+        return True
+    for attr in ("code", "status", "status_code"):
+        if getattr(error, attr, None) == 429:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "too many requests" in message or "rate limit" in message
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with a priority wait queue and an AIMD-adjusted rate; see the module docstring"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 5.0,
+        burst: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        increase: float = 1.0,
+        latency_target: float = 2.0,
+        cooldown: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.clock = clock
+        self.tokens = burst
+        self._updated = clock()
+        self._hold_until = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        price_provider_rate.set(rate, provider=name)
+
+    def acquire(self, level: Optional[Priority] = None, timeout: Optional[float] = None) -> bool:
+        """Take a token, waiting behind higher-priority callers; False if timeout passes first"""
+        level = current_priority() if level is None else level
+        start = self.clock()
+        entry = (int(level), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry and self.tokens >= 1:
+                        self.tokens -= 1
+                        return True
+                    wait = None
+                    if self._waiters[0] == entry:
+                        wait = (1 - self.tokens) / self.rate
+                    if timeout is not None:
+                        remaining = start + timeout - self.clock()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                price_provider_queue_seconds.observe(self.clock() - start, provider=self.name, priority=level.name.lower())
+
+    def on_success(self, latency: float) -> None:
+        with self._cond:
+            if latency > self.latency_target:
+                self._set_rate(self.rate * 0.9)
+            elif self.clock() >= self._hold_until and (self._waiters or self.tokens < 1):
+                # Only grow while the limiter is what holds callers back
+                self._set_rate(self.rate + self.increase / self.rate)
+
+    def on_throttled(self) -> None:
+        with self._cond:
+            price_provider_throttled.inc(provider=self.name)
+            self._set_rate(self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self._hold_until = self.clock() + self.cooldown
+
+    def _set_rate(self, rate: float) -> None:
+        self._refill()
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        price_provider_rate.set(self.rate, provider=self.name)
+        self._cond.notify_all()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,138 @@
+import json
+import random
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+from app.models.asset import AssetType
+from app.providers.base import Bar, InjectedLatency, PriceProvider, slice_period
+
+
+class ReplayProvider(PriceProvider):
+    """
+    Serves a recording made with record(), with configurable injected latency, so
+    runs are repeatable without network. Periods are measured back from the last
+    recorded bar, so an old recording replays the same data forever.
+
+    JSON recordings hold {"interval", "quotes", "info", "history"} keyed by symbol.
+    Parquet recordings (pandas with pyarrow) hold only bars, one row per
+    (symbol, date); quotes are then the last recorded close.
+    """
+
+    name = "replay"
+    batch_quotes = True
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.latency = InjectedLatency(latency_ms, jitter_ms, random.Random(seed))
+        recording = _load(self.path)
+        self.interval: str = recording.get("interval", "1d")
+        self._quotes: Dict[str, Decimal] = {
+            symbol: Decimal(str(price)) for symbol, price in recording.get("quotes", {}).items()
+        }
+        self._info: Dict[str, Dict] = recording.get("info", {})
+        self._history: Dict[str, List[Bar]] = recording.get("history", {})
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(set(self._quotes) | set(self._info) | set(self._history))
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        self.latency()
+        return self._quote(symbol)
+
+    def quotes(self, symbols: Sequence[str]) -> Dict[str, Optional[Decimal]]:
+        self.latency()
+        return {symbol: self._quote(symbol) for symbol in symbols}
+
+    def info(self, symbol: str) -> Dict:
+        self.latency()
+        if symbol not in self._info:
+            raise LookupError(f"{symbol} is not in the recording {self.path.name}")
+        info = dict(self._info[symbol])
+        info['asset_type'] = AssetType(info.get('asset_type', AssetType.STOCK.value))
+        return info
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        if interval != self.interval:
+            raise ValueError(f"Recording {self.path.name} has {self.interval} bars, not {interval}")
+        self.latency()
+        bars = self._history.get(symbol, [])
+        if not bars:
+            return []
+        return slice_period(bars, period, date.fromisoformat(bars[-1]['date'][:10]))
+
+    def _quote(self, symbol: str) -> Optional[Decimal]:
+        if symbol in self._quotes:
+            return self._quotes[symbol]
+        bars = self._history.get(symbol)
+        return Decimal(str(bars[-1]['close'])) if bars else None
+
+
+def record(
+    source: PriceProvider,
+    symbols: Sequence[str],
+    path: Union[str, Path],
+    period: str = "1y",
+    interval: str = "1d"
+) -> Path:
+    """Capture quotes, info and history for symbols from source into a replay file (.json or .parquet)"""
+    path = Path(path)
+    history = {symbol: source.history(symbol, period, interval) for symbol in symbols}
+    if path.suffix == ".parquet":
+        import pandas as pd
+
+        rows = [{"symbol": symbol, **bar} for symbol, bars in history.items() for bar in bars]
+        pd.DataFrame(rows).to_parquet(path, index=False)
+        return path
+
+    quotes = source.quotes(symbols)
+    info = {}
+    for symbol in symbols:
+        try:
+            info[symbol] = source.info(symbol)
+        except Exception as e:
+            print(f"Error recording asset info for {symbol}: {e}")
+    recording = {
+        "interval": interval,
+        "quotes": {symbol: str(price) for symbol, price in quotes.items() if price is not None},
+        "info": info,
+        "history": history,
+    }
+    path.write_text(json.dumps(recording, default=_json_default))
+    return path
+
+
+def _json_default(value):
+    if isinstance(value, AssetType):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _load(path: Path) -> Dict:
+    if path.suffix != ".parquet":
+        return json.loads(path.read_text())
+
+    import pandas as pd
+
+    frame = pd.read_parquet(path).sort_values(["symbol", "date"])
+    history: Dict[str, List[Bar]] = defaultdict(list)
+    for row in frame.itertuples(index=False):
+        history[row.symbol].append({
+            'date': str(row.date)[:10],
+            'open': float(row.open),
+            'high': float(row.high),
+            'low': float(row.low),
+            'close': float(row.close),
+            'volume': int(row.volume)
+        })
+    return {"history": dict(history)}
@@ -0,0 +1,102 @@
+import math
+import random
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+from app.models.asset import AssetType
+from app.providers.base import Bar, InjectedLatency, PriceProvider, period_start, slice_period
+
+# Longest history generated, used for "max"
+HISTORY_DAYS = 3653
+
+
+class SyntheticProvider(PriceProvider):
+    """
+    Deterministic random-walk prices for any symbol, for offline tests and benchmarks
+    at arbitrary universe sizes. Each symbol's path is a geometric random walk over
+    business days, seeded by (seed, symbol), so the same symbol always gets the same
+    bars. The walk runs backwards from the quote at the end date, so a quote costs
+    no walk at all and shorter periods are exact suffixes of longer ones. Injected
+    latency is paid once per call, including once per quotes() batch.
+    """
+
+    name = "synthetic"
+    batch_quotes = True
+
+    def __init__(
+        self,
+        seed: int = 0,
+        end: Optional[date] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0
+    ):
+        self.seed = seed
+        self.end = end
+        self.latency = InjectedLatency(latency_ms, jitter_ms, random.Random(seed))
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        self.latency()
+        return self._last_close(symbol)
+
+    def quotes(self, symbols: Sequence[str]) -> Dict[str, Optional[Decimal]]:
+        self.latency()
+        return {symbol: self._last_close(symbol) for symbol in symbols}
+
+    def info(self, symbol: str) -> Dict:
+        self.latency()
+        price = self._last_close(symbol)
+        return {
+            'symbol': symbol.upper(),
+            'name': f"Synthetic {symbol.upper()}",
+            'asset_type': AssetType.STOCK,
+            'exchange': "SYN",
+            'currency': "USD",
+            'current_price': float(price),
+            'sector': None,
+            'industry': None
+        }
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        if interval != "1d":
+            raise ValueError(f"{self.name} provider only generates daily bars, not {interval}")
+        self.latency()
+        end = self._end()
+        start = period_start(period, end) if period not in ("1d", "5d") else end - timedelta(days=7)
+        bars = self._walk(symbol, start or end - timedelta(days=HISTORY_DAYS - 1))
+        return slice_period(bars, period, end)
+
+    def _end(self) -> date:
+        return self.end or date.today()
+
+    def _last_close(self, symbol: str) -> Decimal:
+        return Decimal(str(round(self._params(symbol)[0], 4)))
+
+    def _params(self, symbol: str) -> tuple:
+        rng = random.Random(zlib.crc32(f"{self.seed}:{symbol.upper()}".encode()))
+        price = rng.uniform(20, 500)
+        volatility = rng.uniform(0.008, 0.03)
+        drift = rng.uniform(-0.0002, 0.0006)
+        base_volume = rng.randint(10_000, 5_000_000)
+        return price, volatility, drift, base_volume, rng
+
+    def _walk(self, symbol: str, start: date) -> List[Bar]:
+        """Bars from start to the end date, generated newest first"""
+        price, volatility, drift, base_volume, rng = self._params(symbol)
+        day = self._end()
+        bars = []
+        while day >= start:
+            if day.weekday() < 5:
+                open_ = price / math.exp(drift + rng.gauss(0, volatility))
+                bars.append({
+                    'date': day.isoformat(),
+                    'open': round(open_, 4),
+                    'high': round(max(open_, price) * (1 + abs(rng.gauss(0, volatility / 2))), 4),
+                    'low': round(min(open_, price) * (1 - abs(rng.gauss(0, volatility / 2))), 4),
+                    'close': round(price, 4),
+                    'volume': int(base_volume * rng.lognormvariate(0, 0.3))
+                })
+                price = open_ / math.exp(rng.gauss(0, volatility / 4))
+            day -= timedelta(days=1)
+        bars.reverse()
+        return bars
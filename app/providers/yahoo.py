@@ -0,0 +1,61 @@
+from decimal import Decimal
+from typing import Dict, List, Optional
+from app.models.asset import AssetType
+from app.providers.base import Bar, PriceProvider
+
+# yfinance (and the pandas/numpy it pulls in) is imported inside the methods that
+# call it, so importing the API does not pay for it at startup
+
+
+class YFinanceProvider(PriceProvider):
+    """Yahoo Finance through yfinance; every call is a network round trip"""
+
+    name = "yfinance"
+    rate_limited = True
+
+    def quote(self, symbol: str) -> Optional[Decimal]:
+        import yfinance as yf
+
+        info = yf.Ticker(symbol).info
+        price = info.get('currentPrice') or info.get('regularMarketPrice')
+        return Decimal(str(price)) if price else None
+
+    def info(self, symbol: str) -> Dict:
+        import yfinance as yf
+
+        info = yf.Ticker(symbol).info
+
+        # Determine asset type based on available info
+        asset_type = AssetType.STOCK  # default
+        if 'fundFamily' in info or 'category' in info:
+            asset_type = AssetType.ETF
+        elif 'bondRating' in info or 'maturityDate' in info:
+            asset_type = AssetType.BOND
+
+        return {
+            'symbol': symbol.upper(),
+            'name': info.get('longName', info.get('shortName', symbol)),
+            'asset_type': asset_type,
+            'exchange': info.get('exchange'),
+            'currency': info.get('currency', 'USD'),
+            'current_price': info.get('currentPrice', info.get('regularMarketPrice')),
+            'sector': info.get('sector'),
+            'industry': info.get('industry')
+        }
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d") -> List[Bar]:
+        import pandas as pd
+        import yfinance as yf
+
+        hist = yf.Ticker(symbol).history(period=period, interval=interval)
+        return [
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'open': float(row['Open']),
+                'high': float(row['High']),
+                'low': float(row['Low']),
+                'close': float(row['Close']),
+                'volume': int(row['Volume']) if pd.notna(row['Volume']) else 0
+            }
+            for day, row in hist.iterrows()
+        ]
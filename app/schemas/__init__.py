@@ -2,10 +2,14 @@ from .portfolio import PortfolioCreate, PortfolioUpdate, Portfolio, PortfolioWit
 from .asset import AssetCreate, AssetUpdate, Asset
 from .holding import HoldingCreate, HoldingUpdate, Holding, HoldingWithAsset
 from .transaction import TransactionCreate, TransactionUpdate, Transaction, TransactionWithAsset
+from .job import JobCreate, JobUpdate, Job
+from .watchlist import WatchlistItemCreate, WatchlistItem
 
 __all__ = [
     "PortfolioCreate", "PortfolioUpdate", "Portfolio", "PortfolioWithHoldings",
     "AssetCreate", "AssetUpdate", "Asset",
     "HoldingCreate", "HoldingUpdate", "Holding", "HoldingWithAsset",
-    "TransactionCreate", "TransactionUpdate", "Transaction", "TransactionWithAsset"
+    "TransactionCreate", "TransactionUpdate", "Transaction", "TransactionWithAsset",
+    "JobCreate", "JobUpdate", "Job",
+    "WatchlistItemCreate", "WatchlistItem"
 ]
\ No newline at end of file
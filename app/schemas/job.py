@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from app.models.job import JobStatus, JobType
+
+
+class JobCreate(BaseModel):
+    job_type: JobType
+    params: Dict[str, Any] = {}
+
+
+class JobUpdate(BaseModel):
+    status: Optional[JobStatus] = None
+
+
+class JobItemError(BaseModel):
+    item: Any
+    error: str
+
+
+class Job(BaseModel):
+    id: int
+    job_type: JobType
+    status: JobStatus
+    params: Dict[str, Any]
+    total_items: Optional[int] = None
+    completed_items: int
+    failed_items: int
+    progress: Optional[float] = None
+    errors: List[JobItemError] = []
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
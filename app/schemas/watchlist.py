@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from .asset import Asset
+
+
+class WatchlistItemCreate(BaseModel):
+    asset_id: int
+
+
+class WatchlistItem(BaseModel):
+    id: int
+    portfolio_id: int
+    asset_id: int
+    created_at: datetime
+    asset: Asset
+
+    class Config:
+        from_attributes = True
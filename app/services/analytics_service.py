@@ -1,33 +1,99 @@
-import ibis
-from typing import Dict
+import functools
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db_url
+from app.core.instrumentation import instrument_ibis
+from app.core.metrics import analytics_duration, timed
+from app.core.tracing import trace_ibis, traced
+
+# Tables whose writes change portfolio valuations
+VALUATION_TABLES = frozenset({"holdings", "assets", "transactions"})
+
+
+def _serialized(method):
+    """Run one query method at a time on the service's shared connection"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class AnalyticsService:
     """
     Analytics service using Ibis for efficient database-driven analytics.
     This replaces manual Python calculations with SQL-based operations.
+
+    Use get_analytics() for the process-wide instance: its connection, reflected
+    tables and cached valuations are what the startup warm-up prepares.
     """
     
     def __init__(self):
+        # ibis (with pandas and numpy) is imported on first use rather than at startup
+        import ibis
+
         # Connect to the same SQLite database using ibis
         db_url = get_db_url()
         # Convert SQLAlchemy URL to ibis format
         if db_url.startswith("sqlite:///"):
             db_path = db_url.replace("sqlite:///", "")
-            self.con = ibis.sqlite.connect(db_path)
+            # Shared by request threads; _serialized keeps its use to one thread at a time
+            raw = sqlite3.connect(db_path, check_same_thread=False)
+            self.con = trace_ibis(instrument_ibis(ibis.sqlite.from_connection(raw)))
         else:
             raise ValueError(f"Unsupported database URL: {db_url}")
+        self._lock = threading.RLock()
+        self._tables: Dict[str, Any] = {}
+        # portfolio_id -> (computed at, get_portfolio_value_analysis result)
+        self._valuations: Dict[int, Tuple[float, Dict]] = {}
+        self._generation = 0
+
+    def table(self, name: str):
+        """Table handle, reflected once per service"""
+        if name not in self._tables:
+            self._tables[name] = self.con.table(name)
+        return self._tables[name]
+
+    def portfolio_value(self, portfolio_id: int) -> Dict:
+        """
+        get_portfolio_value_analysis, served from the valuation cache while it is
+        younger than settings.valuation_cache_seconds and no holding, asset or
+        transaction was written in this process since
+        """
+        cached = self._valuations.get(portfolio_id)
+        if cached is not None and time.monotonic() - cached[0] < settings.valuation_cache_seconds:
+            return cached[1]
+        generation = self._generation
+        result = self.get_portfolio_value_analysis(portfolio_id)
+        # A write while the query ran may not be in the result; don't keep it
+        if generation == self._generation:
+            self._valuations[portfolio_id] = (time.monotonic(), result)
+        return result
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._valuations.clear()
+
+    def close(self) -> None:
+        self.con.disconnect()
     
+    @timed(analytics_duration, query="portfolio_value")
+    @traced("analytics.portfolio_value")
+    @_serialized
     def get_portfolio_value_analysis(self, portfolio_id: int) -> Dict:
         """
         Calculate portfolio value and performance using ibis for efficient SQL operations.
         This replaces the manual calculations in PortfolioService.calculate_portfolio_value.
         """
         # Define tables
-        holdings = self.con.table("holdings")
-        assets = self.con.table("assets")
+        holdings = self.table("holdings")
+        assets = self.table("assets")
         
         # Join holdings with assets and calculate metrics
         portfolio_data = (
@@ -101,14 +167,17 @@ class AnalyticsService:
             "holdings": holdings_data
         }
     
+    @timed(analytics_duration, query="diversification")
+    @traced("analytics.diversification")
+    @_serialized
     def get_portfolio_diversification_analysis(self, portfolio_id: int) -> Dict:
         """
         Calculate portfolio diversification using ibis aggregations.
         This replaces the manual calculations in PortfolioService.get_portfolio_diversification.
         """
         # Define tables
-        holdings = self.con.table("holdings")
-        assets = self.con.table("assets")
+        holdings = self.table("holdings")
+        assets = self.table("assets")
         
         # Get portfolio holdings with current values
         portfolio_holdings = (
@@ -175,15 +244,18 @@ class AnalyticsService:
             "by_asset": asset_percentages
         }
     
+    @timed(analytics_duration, query="performance")
+    @traced("analytics.performance")
+    @_serialized
     def get_portfolio_performance_metrics(self, portfolio_id: int) -> Dict:
         """
         Calculate advanced portfolio performance metrics using ibis.
         This provides additional analytics not available in the original service.
         """
         # Define tables
-        holdings = self.con.table("holdings")
-        assets = self.con.table("assets")
-        transactions = self.con.table("transactions")
+        holdings = self.table("holdings")
+        assets = self.table("assets")
+        transactions = self.table("transactions")
         
         # Get portfolio performance data
         performance_query = (
@@ -247,14 +319,17 @@ class AnalyticsService:
             }
         }
     
+    @timed(analytics_duration, query="asset_allocation")
+    @traced("analytics.asset_allocation")
+    @_serialized
     def get_asset_allocation_analysis(self, portfolio_id: int) -> Dict:
         """
         Perform detailed asset allocation analysis using ibis.
         This provides asset type and currency diversification insights.
         """
         # Define tables
-        holdings = self.con.table("holdings")
-        assets = self.con.table("assets")
+        holdings = self.table("holdings")
+        assets = self.table("assets")
         
         # Get asset allocation data (only using columns that exist)
         allocation_query = (
@@ -306,4 +381,49 @@ class AnalyticsService:
             "by_asset_type": by_asset_type,
             "by_currency": by_currency,
             "total_value": total_value
-        }
\ No newline at end of file
+        }
+
+
+_shared: Dict[str, AnalyticsService] = {}
+_shared_lock = threading.Lock()
+
+
+def get_analytics() -> AnalyticsService:
+    """The process-wide AnalyticsService for the current database, created on first use"""
+    db_url = get_db_url()
+    with _shared_lock:
+        service = _shared.get(db_url)
+        if service is None:
+            service = _shared[db_url] = AnalyticsService()
+        return service
+
+
+def close_analytics() -> None:
+    """Close and drop the shared services; the next get_analytics() reconnects"""
+    with _shared_lock:
+        services = list(_shared.values())
+        _shared.clear()
+    for service in services:
+        service.close()
+
+
+def _invalidate_valuations() -> None:
+    for service in list(_shared.values()):
+        service.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _valuations_after_flush(session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in VALUATION_TABLES:
+            _invalidate_valuations()
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _valuations_after_bulk_write(orm_execute_state) -> None:
+    # Bulk UPDATE/INSERT/DELETE statements skip the flush
+    if orm_execute_state.is_update or orm_execute_state.is_insert or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if getattr(table, "name", None) in VALUATION_TABLES:
+            _invalidate_valuations()
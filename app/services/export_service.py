@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator, List, Sequence
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Engine
+from app.models.asset import Asset
+from app.models.holding import Holding
+from app.models.transaction import Transaction
+
+EXPORT_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows fetched from the server-side cursor per round-trip
+EXPORT_BATCH_SIZE = 1000
+
+
+def _plain(value):
+    """Convert a raw column value into something csv/json can write"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class ExportService:
+    """
+    Streams ledger exports straight from a server-side cursor.
+    Statements are Core selects, so no ORM identities or Pydantic models are
+    built and memory stays flat regardless of the number of rows.
+    """
+
+    @staticmethod
+    def transactions_statement(portfolio_id: int) -> Select:
+        return (
+            select(
+                Transaction.id,
+                Transaction.transaction_date,
+                Asset.symbol,
+                Transaction.transaction_type,
+                Transaction.quantity,
+                Transaction.price,
+                Transaction.fees,
+                Transaction.total_amount,
+                Transaction.notes,
+            )
+            .join(Asset, Asset.id == Transaction.asset_id)
+            .where(Transaction.portfolio_id == portfolio_id)
+            .order_by(Transaction.transaction_date, Transaction.id)
+        )
+
+    @staticmethod
+    def holdings_statement(portfolio_id: int) -> Select:
+        return (
+            select(
+                Holding.id,
+                Asset.symbol,
+                Asset.name,
+                Asset.asset_type,
+                Holding.quantity,
+                Holding.average_cost,
+                Asset.current_price,
+                Asset.currency,
+            )
+            .join(Asset, Asset.id == Holding.asset_id)
+            .where(Holding.portfolio_id == portfolio_id)
+            .order_by(Holding.id)
+        )
+
+    @staticmethod
+    def stream(engine: Engine, statement: Select, fmt: str) -> Iterator[str]:
+        """Yield the statement's rows encoded as csv or ndjson, one chunk per batch"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        columns = [c.name for c in statement.selected_columns]
+        encode = ExportService._encode_csv if fmt == "csv" else ExportService._encode_ndjson
+
+        if fmt == "csv":
+            # Send the header right away so the first byte does not wait on the query
+            yield ExportService._encode_csv(columns, [columns])
+
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(statement)
+            for batch in result.partitions():
+                yield encode(columns, batch)
+
+    @staticmethod
+    def _encode_csv(columns: List[str], rows: Sequence[Sequence]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_plain(v) for v in row])
+        return buffer.getvalue()
+
+    @staticmethod
+    def _encode_ndjson(columns: List[str], rows: Sequence[Sequence]) -> str:
+        return "".join(
+            json.dumps(dict(zip(columns, (_plain(v) for v in row)))) + "\n"
+            for row in rows
+        )
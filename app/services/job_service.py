@@ -0,0 +1,269 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.job import job
+from app.models.job import Job, JobStatus, JobType
+from app.models.portfolio import Portfolio
+from app.providers import Priority, priority
+from app.schemas.job import JobCreate
+from app.schemas.transaction import TransactionCreate
+from app.services.portfolio_service import PortfolioService
+from app.services.price_service import PriceService
+from app.services.refresh_planner import RefreshPlanner
+
+# Per-item errors kept on the job row; failed_items still counts every failure
+MAX_JOB_ERRORS = 100
+# Prices fetched between bulk writes (and progress commits) in a refresh job
+PRICE_REFRESH_BATCH_SIZE = 50
+
+
+class JobContext:
+    """What a job handler sees: its session, params, and progress reporting"""
+
+    def __init__(self, db: Session, job_obj: Job, heartbeat_interval: float = 30.0):
+        self.db = db
+        self.job = job_obj
+        self.heartbeat_interval = heartbeat_interval
+        self._beat = time.monotonic()
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.job.params or {}
+
+    def each(
+        self,
+        items: Sequence,
+        func: Callable[[Any], Any],
+        label: Callable[[Any], Any] = str,
+        batch_size: int = 1,
+        flush: Optional[Callable[[], None]] = None,
+        commits: bool = False
+    ) -> None:
+        """
+        Run func on every item, recording success or the item's error. Every
+        batch_size items, flush() writes whatever func buffered and the progress is
+        committed with it, so a resumed job skips exactly the items whose results
+        were stored. Items must therefore come back in the same order on every run.
+        Within a batch the heartbeat alone is committed every heartbeat_interval
+        seconds, so a long batch is not mistaken for an abandoned job.
+
+        With commits, func commits its own writes in a single commit: the item is
+        counted on the job first, so that commit stores the progress with the item's
+        result and a resumed job cannot apply it twice. If func raises, nothing of
+        the item, progress included, has been committed.
+        """
+        self.job.total_items = len(items)
+        self._save()
+        remaining = items[self.job.processed_items:]
+        completed, failed, errors = 0, 0, []
+        for i, item in enumerate(remaining, 1):
+            name = label(item)
+            try:
+                if commits:
+                    self.job.completed_items += 1
+                func(item)
+                if not commits:
+                    completed += 1
+            except Exception as e:
+                self.db.rollback()
+                failed += 1
+                errors.append({"item": name, "error": str(e)})
+            if i % batch_size == 0 or i == len(remaining):
+                if flush is not None:
+                    flush()
+                self.job.completed_items += completed
+                self.job.failed_items += failed
+                room = MAX_JOB_ERRORS - len(self.job.errors)
+                if errors and room > 0:
+                    self.job.errors = self.job.errors + errors[:room]
+                self._save()
+                completed, failed, errors = 0, 0, []
+            elif time.monotonic() - self._beat >= self.heartbeat_interval:
+                self._save()
+
+    def _save(self) -> None:
+        self.job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+        self._beat = time.monotonic()
+
+
+def _planned_assets(ctx: JobContext) -> List:
+    """Stale held/watched assets, planned once and kept on the job so a resumed run walks the same list"""
+    planned = ctx.params.get("planned_asset_ids")
+    if planned is None:
+        planned = [a.id for a in RefreshPlanner.plan(ctx.db)]
+        ctx.job.params = {**ctx.params, "planned_asset_ids": planned}
+        ctx.db.commit()
+    return PriceService.tradeable_assets(ctx.db, planned) if planned else []
+
+
+def refresh_prices(ctx: JobContext) -> None:
+    prices: Dict[int, Decimal] = {}
+
+    def fetch(asset_obj):
+        price = PriceService.get_current_price(asset_obj.symbol)
+        if price is None:
+            raise ValueError("No price returned")
+        prices[asset_obj.id] = price
+
+    def write():
+        PriceService.store_quotes(ctx.db, prices)
+        prices.clear()
+
+    if ctx.params.get("asset_ids"):
+        assets = PriceService.tradeable_assets(ctx.db, ctx.params["asset_ids"])
+    else:
+        assets = _planned_assets(ctx)
+    # Background work queues behind user-facing lookups at the provider rate limiter
+    with priority(Priority.BACKGROUND):
+        ctx.each(assets, fetch, label=lambda a: a.symbol, batch_size=PRICE_REFRESH_BATCH_SIZE, flush=write)
+
+
+def import_transactions(ctx: JobContext) -> None:
+    def process(row):
+        PortfolioService.process_transaction(ctx.db, TransactionCreate(**row[1]))
+    ctx.each(list(enumerate(ctx.params.get("transactions", []))), process, label=lambda row: row[0], commits=True)
+
+
+def backfill_history(ctx: JobContext) -> None:
+    period = ctx.params.get("period", "1y")
+    assets = PriceService.tradeable_assets(ctx.db, ctx.params.get("asset_ids"))
+    with priority(Priority.BACKGROUND):
+        ctx.each(assets, lambda a: PriceService.backfill_history(ctx.db, a, period), label=lambda a: a.symbol)
+
+
+def rebuild_holdings(ctx: JobContext) -> None:
+    portfolio_ids = ctx.params.get("portfolio_ids") or [
+        row.id for row in ctx.db.query(Portfolio.id).order_by(Portfolio.id)
+    ]
+    ctx.each(portfolio_ids, lambda pid: PortfolioService.rebuild_holdings(ctx.db, pid))
+
+
+# Jobs that call the price provider; a separate price_worker process can own them
+PRICE_JOB_TYPES = (JobType.PRICE_REFRESH, JobType.HISTORY_BACKFILL)
+
+JOB_HANDLERS: Dict[JobType, Callable[[JobContext], None]] = {
+    JobType.PRICE_REFRESH: refresh_prices,
+    JobType.BULK_IMPORT: import_transactions,
+    JobType.HISTORY_BACKFILL: backfill_history,
+    JobType.HOLDINGS_REBUILD: rebuild_holdings,
+}
+
+
+class JobRunner:
+    """
+    In-process worker pool over the jobs table. Jobs are rows, so they outlive the
+    process: a job whose worker stops heartbeating is queued again and resumes
+    after its last recorded item. Workers poll the table, so jobs enqueued by other
+    processes are picked up too; submit() just wakes them early.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        stale_after: float = 120.0,
+        job_types: Optional[Sequence[JobType]] = None,
+        handlers: Optional[Dict[JobType, Callable[[JobContext], None]]] = None
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.handlers = handlers or JOB_HANDLERS
+        self.job_types = list(self.handlers if job_types is None else job_types)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, db: Session, job_type: JobType, params: Optional[Dict[str, Any]] = None) -> Job:
+        job_obj = job.create(db, obj_in=JobCreate(job_type=job_type, params=params or {}))
+        self._wake.set()
+        return job_obj
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def requeue_stale(self) -> int:
+        db = self.session_factory()
+        try:
+            return job.requeue_stale(
+                db,
+                heartbeat_before=datetime.utcnow() - timedelta(seconds=self.stale_after),
+                job_types=self.job_types
+            )
+        finally:
+            db.close()
+
+    def run_next(self) -> Optional[int]:
+        """Claim and run one queued job in the calling thread; returns its id"""
+        db = self.session_factory()
+        try:
+            job_obj = job.claim_next(db, job_types=self.job_types)
+            if job_obj is None:
+                return None
+            try:
+                # Heartbeat well inside the stale window, so a running job is never requeued
+                ctx = JobContext(db, job_obj, heartbeat_interval=self.stale_after / 4)
+                self.handlers[job_obj.job_type](ctx)
+                job_obj.status = JobStatus.SUCCEEDED
+            except Exception as e:
+                db.rollback()
+                job_obj.status = JobStatus.FAILED
+                job_obj.error = f"{type(e).__name__}: {e}"[:1000]
+            job_obj.finished_at = datetime.utcnow()
+            db.commit()
+            return job_obj.id
+        finally:
+            db.close()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_next() is not None:
+                    continue
+                self.requeue_stale()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+def schedule_price_refresh(runner: JobRunner, db: Session) -> Optional[Job]:
+    """Queue a planned price refresh when prices are due and no refresh is already queued or running"""
+    if job.get_active(db, job_type=JobType.PRICE_REFRESH) is not None:
+        return None
+    if not RefreshPlanner.plan(db):
+        return None
+    return runner.submit(db, JobType.PRICE_REFRESH)
+
+
+def api_job_types() -> List[JobType]:
+    """Job types the API process runs itself; price jobs go to price_worker when disabled"""
+    return [t for t in JOB_HANDLERS if settings.price_jobs_in_api or t not in PRICE_JOB_TYPES]
+
+
+job_runner = JobRunner(
+    workers=settings.job_workers,
+    job_types=api_job_types(),
+    poll_interval=settings.job_poll_interval,
+    stale_after=settings.job_stale_seconds,
+)
@@ -0,0 +1,140 @@
+"""
+Exchange trading calendars, usable offline: regular hours per exchange, the
+bundled holiday and early-close tables in app.services.market_holidays, and
+weekends. The refresh planner uses them to skip markets that are closed once
+their closing prices have been fetched.
+
+Times passed in and returned are naive UTC, like the datetime.utcnow()
+timestamps stored on assets.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.core.config import settings
+from app.models.asset import AssetType
+from app.services import market_holidays
+
+# Longest run of closed days previous_close looks back over
+MAX_CLOSED_DAYS = 10
+
+
+def to_utc_naive(at: datetime) -> datetime:
+    return at if at.tzinfo is None else at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class ExchangeCalendar:
+    code: str
+    timezone: str
+    open: time = time(0, 0)
+    close: time = time(0, 0)
+    holidays: FrozenSet[date] = frozenset()
+    early_closes: Mapping[date, time] = field(default_factory=dict)
+    weekdays: FrozenSet[int] = frozenset(range(5))
+    # The session for a date opens at `open` on the previous evening (futures)
+    overnight: bool = False
+    # Never closes (crypto); there are no sessions and no closes
+    always_open: bool = False
+
+    def is_session(self, day: date) -> bool:
+        return self.always_open or (day.weekday() in self.weekdays and day not in self.holidays)
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Open and close of the session for this local date, or None when the market is closed all day"""
+        if self.always_open or not self.is_session(day):
+            return None
+        tz = ZoneInfo(self.timezone)
+        open_day = day - timedelta(days=1) if self.overnight else day
+        opens = datetime.combine(open_day, self.open, tz)
+        closes = datetime.combine(day, self.early_closes.get(day, self.close), tz)
+        return to_utc_naive(opens), to_utc_naive(closes)
+
+    def is_open(self, at: datetime) -> bool:
+        if self.always_open:
+            return True
+        at = to_utc_naive(at)
+        day = self._local_date(at)
+        for session_day in (day, day + timedelta(days=1)) if self.overnight else (day,):
+            bounds = self.session(session_day)
+            if bounds is not None and bounds[0] <= at < bounds[1]:
+                return True
+        return False
+
+    def previous_close(self, at: datetime) -> Optional[datetime]:
+        """The most recent session close at or before `at`; None for markets that never close"""
+        last = self._last_session(at)
+        return last and last[1]
+
+    def closed_session_date(self, at: datetime) -> Optional[date]:
+        """
+        Trading date of the session whose close is the latest price at `at`: None while
+        the market is open, and for markets that never close
+        """
+        if self.is_open(at):
+            return None
+        last = self._last_session(at)
+        return last and last[0]
+
+    def _last_session(self, at: datetime) -> Optional[Tuple[date, datetime]]:
+        if self.always_open:
+            return None
+        at = to_utc_naive(at)
+        day = self._local_date(at)
+        for offset in range(MAX_CLOSED_DAYS + 1):
+            bounds = self.session(day - timedelta(days=offset))
+            if bounds is not None and bounds[1] <= at:
+                return day - timedelta(days=offset), bounds[1]
+        return None
+
+    def _local_date(self, at: datetime) -> date:
+        return at.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(self.timezone)).date()
+
+
+CALENDARS: Dict[str, ExchangeCalendar] = {
+    calendar.code: calendar for calendar in (
+        ExchangeCalendar(
+            "XNYS", "America/New_York", time(9, 30), time(16, 0),
+            market_holidays.US_EQUITY_HOLIDAYS, market_holidays.US_EQUITY_EARLY_CLOSES
+        ),
+        ExchangeCalendar(
+            "XLON", "Europe/London", time(8, 0), time(16, 30),
+            market_holidays.LONDON_HOLIDAYS, market_holidays.LONDON_EARLY_CLOSES
+        ),
+        ExchangeCalendar("XETR", "Europe/Berlin", time(9, 0), time(17, 30), market_holidays.XETRA_HOLIDAYS),
+        ExchangeCalendar("XTSE", "America/Toronto", time(9, 30), time(16, 0), market_holidays.TORONTO_HOLIDAYS),
+        # CME Globex futures: Sunday to Friday, 17:00 to 16:00 Chicago time; holiday halts are not modelled
+        ExchangeCalendar("CMES", "America/Chicago", time(17, 0), time(16, 0), overnight=True),
+        ExchangeCalendar("24/7", "UTC", always_open=True),
+    )
+}
+
+# Exchange names and codes as stored on assets (yfinance short codes included)
+EXCHANGE_ALIASES: Dict[str, str] = {
+    **dict.fromkeys(
+        ("XNYS", "NYSE", "NYQ", "XNAS", "NASDAQ", "NMS", "NGM", "NCM", "NAS", "AMEX", "ASE",
+         "NYSEARCA", "ARCA", "PCX", "BATS", "BTS"),
+        "XNYS"
+    ),
+    **dict.fromkeys(("XLON", "LSE", "LON"), "XLON"),
+    **dict.fromkeys(("XETR", "XETRA", "GER", "ETR"), "XETR"),
+    **dict.fromkeys(("XTSE", "TSX", "TOR"), "XTSE"),
+    **dict.fromkeys(("CMES", "CME", "NYM", "NYMEX", "CMX", "COMEX", "CBT", "CBOT"), "CMES"),
+    **dict.fromkeys(("CCC", "CRYPTO"), "24/7"),
+}
+
+
+def calendar_for(exchange: Optional[str], asset_type: AssetType) -> Optional[ExchangeCalendar]:
+    """
+    The calendar an asset trades on: crypto around the clock, a known exchange by
+    name, commodities on CME hours, anything else on settings.market_default_calendar.
+    Cash has no market and gets None.
+    """
+    if asset_type == AssetType.CASH:
+        return None
+    if asset_type == AssetType.CRYPTO:
+        return CALENDARS["24/7"]
+    code = EXCHANGE_ALIASES.get((exchange or "").strip().upper())
+    if code is None:
+        code = "CMES" if asset_type == AssetType.COMMODITY else settings.market_default_calendar
+    return CALENDARS[code]
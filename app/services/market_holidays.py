@@ -0,0 +1,74 @@
+"""
+Bundled exchange holiday tables used by app.services.market_calendar, so market
+hours are known without a network call. Each table lists full-day closures and
+early closes (local closing time) for HOLIDAY_YEARS; outside those years only
+weekends are treated as closed. Extend the tables when a new year's schedule is
+published.
+"""
+from datetime import date, time
+from typing import Dict, FrozenSet
+
+HOLIDAY_YEARS = range(2024, 2028)
+
+
+def _dates(*days: str) -> FrozenSet[date]:
+    return frozenset(date.fromisoformat(day) for day in days)
+
+
+# NYSE and Nasdaq share one schedule
+US_EQUITY_HOLIDAYS = _dates(
+    "2024-01-01", "2024-01-15", "2024-02-19", "2024-03-29", "2024-05-27", "2024-06-19",
+    "2024-07-04", "2024-09-02", "2024-11-28", "2024-12-25",
+    "2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26",
+    "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25",
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+    "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18",
+    "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+)
+US_EQUITY_EARLY_CLOSES: Dict[date, time] = {
+    day: time(13, 0) for day in _dates(
+        "2024-07-03", "2024-11-29", "2024-12-24",
+        "2025-07-03", "2025-11-28", "2025-12-24",
+        "2026-11-27", "2026-12-24",
+        "2027-11-26",
+    )
+}
+
+LONDON_HOLIDAYS = _dates(
+    "2024-01-01", "2024-03-29", "2024-04-01", "2024-05-06", "2024-05-27", "2024-08-26",
+    "2024-12-25", "2024-12-26",
+    "2025-01-01", "2025-04-18", "2025-04-21", "2025-05-05", "2025-05-26", "2025-08-25",
+    "2025-12-25", "2025-12-26",
+    "2026-01-01", "2026-04-03", "2026-04-06", "2026-05-04", "2026-05-25", "2026-08-31",
+    "2026-12-25", "2026-12-28",
+    "2027-01-01", "2027-03-26", "2027-03-29", "2027-05-03", "2027-05-31", "2027-08-30",
+    "2027-12-27", "2027-12-28",
+)
+LONDON_EARLY_CLOSES: Dict[date, time] = {
+    day: time(12, 30) for day in _dates(
+        "2024-12-24", "2024-12-31", "2025-12-24", "2025-12-31",
+        "2026-12-24", "2026-12-31", "2027-12-24", "2027-12-31",
+    )
+}
+
+XETRA_HOLIDAYS = _dates(
+    "2024-01-01", "2024-03-29", "2024-04-01", "2024-05-01", "2024-12-24", "2024-12-25",
+    "2024-12-26", "2024-12-31",
+    "2025-01-01", "2025-04-18", "2025-04-21", "2025-05-01", "2025-12-24", "2025-12-25",
+    "2025-12-26", "2025-12-31",
+    "2026-01-01", "2026-04-03", "2026-04-06", "2026-05-01", "2026-12-24", "2026-12-25",
+    "2026-12-31",
+    "2027-01-01", "2027-03-26", "2027-03-29", "2027-12-24", "2027-12-31",
+)
+
+TORONTO_HOLIDAYS = _dates(
+    "2024-01-01", "2024-02-19", "2024-03-29", "2024-05-20", "2024-07-01", "2024-08-05",
+    "2024-09-02", "2024-10-14", "2024-12-25", "2024-12-26",
+    "2025-01-01", "2025-02-17", "2025-04-18", "2025-05-19", "2025-07-01", "2025-08-04",
+    "2025-09-01", "2025-10-13", "2025-12-25", "2025-12-26",
+    "2026-01-01", "2026-02-16", "2026-04-03", "2026-05-18", "2026-07-01", "2026-08-03",
+    "2026-09-07", "2026-10-12", "2026-12-25", "2026-12-28",
+    "2027-01-01", "2027-02-15", "2027-03-26", "2027-05-24", "2027-07-01", "2027-08-02",
+    "2027-09-06", "2027-10-11", "2027-12-27", "2027-12-28",
+)
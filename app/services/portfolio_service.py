@@ -1,10 +1,13 @@
-from typing import Dict
+from decimal import Decimal
+from typing import Dict, List
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.crud.holding import holding
 from app.crud.transaction import transaction
-from app.models.transaction import TransactionType
+from app.models.holding import Holding
+from app.models.transaction import Transaction, TransactionType
 from app.schemas.transaction import TransactionCreate
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_service import get_analytics
 
 
 class PortfolioService:
@@ -14,21 +17,29 @@ class PortfolioService:
         Calculate total portfolio value and performance metrics using ibis for efficient SQL operations.
         This method now uses the AnalyticsService for database-driven calculations.
         """
-        analytics = AnalyticsService()
-        return analytics.get_portfolio_value_analysis(portfolio_id)
+        return get_analytics().portfolio_value(portfolio_id)
 
     @staticmethod
     def process_transaction(db: Session, transaction_data: TransactionCreate) -> Dict:
-        """Process a transaction and update holdings accordingly"""
-        # Create the transaction record
-        new_transaction = transaction.create(db, obj_in=transaction_data)
-        
+        """
+        Process a transaction and update holdings accordingly. The transaction row
+        and the holding change are flushed and committed together, with whatever else
+        the caller has pending in the session (a job's progress, for instance).
+        """
         # Get or create holding
         existing_holding = holding.get_by_portfolio_and_asset(
             db, 
             portfolio_id=transaction_data.portfolio_id,
             asset_id=transaction_data.asset_id
         )
+        # Reject an oversized sell before anything is written
+        if transaction_data.transaction_type == TransactionType.SELL and not (
+            existing_holding and existing_holding.quantity >= transaction_data.quantity
+        ):
+            raise ValueError("Insufficient holdings to sell")
+
+        # Create the transaction record
+        new_transaction = transaction.create(db, obj_in=transaction_data, commit=False)
         
         if transaction_data.transaction_type == TransactionType.BUY:
             if existing_holding:
@@ -45,7 +56,8 @@ class PortfolioService:
                     obj_in={
                         "quantity": new_quantity,
                         "average_cost": new_average_cost
-                    }
+                    },
+                    commit=False
                 )
             else:
                 # Create new holding
@@ -56,34 +68,67 @@ class PortfolioService:
                     quantity=transaction_data.quantity,
                     average_cost=transaction_data.price
                 )
-                holding.create(db, obj_in=holding_data)
+                holding.create(db, obj_in=holding_data, commit=False)
                 
         elif transaction_data.transaction_type == TransactionType.SELL:
-            if existing_holding and existing_holding.quantity >= transaction_data.quantity:
-                new_quantity = existing_holding.quantity - transaction_data.quantity
-                if new_quantity == 0:
-                    # Remove holding if quantity becomes zero
-                    holding.remove(db, id=existing_holding.id)
-                else:
-                    # Update quantity (keep same average cost)
-                    holding.update(
-                        db,
-                        db_obj=existing_holding,
-                        obj_in={"quantity": new_quantity}
-                    )
+            new_quantity = existing_holding.quantity - transaction_data.quantity
+            if new_quantity == 0:
+                # Remove holding if quantity becomes zero
+                holding.remove(db, id=existing_holding.id, commit=False)
             else:
-                raise ValueError("Insufficient holdings to sell")
-        
+                # Update quantity (keep same average cost)
+                holding.update(
+                    db,
+                    db_obj=existing_holding,
+                    obj_in={"quantity": new_quantity},
+                    commit=False
+                )
+
+        db.commit()
         return {"transaction_id": new_transaction.id, "status": "processed"}
 
+    @staticmethod
+    def rebuild_holdings(db: Session, portfolio_id: int) -> int:
+        """
+        Recompute a portfolio's holdings by replaying its transactions oldest first,
+        with the same buy/sell rules as process_transaction, and replace the stored
+        rows in one commit. Returns the number of holdings written.
+        """
+        positions: Dict[int, List[Decimal]] = {}
+        replay = (
+            db.query(Transaction)
+            .filter(Transaction.portfolio_id == portfolio_id)
+            .order_by(Transaction.transaction_date, Transaction.id)
+        )
+        for tx in replay:
+            quantity, average_cost = positions.get(tx.asset_id, [Decimal("0"), Decimal("0")])
+            if tx.transaction_type == TransactionType.BUY:
+                new_quantity = quantity + tx.quantity
+                average_cost = (quantity * average_cost + tx.quantity * tx.price) / new_quantity
+                positions[tx.asset_id] = [new_quantity, average_cost]
+            elif tx.transaction_type == TransactionType.SELL:
+                if quantity < tx.quantity:
+                    raise ValueError(f"Transaction {tx.id} sells more than is held")
+                positions[tx.asset_id] = [quantity - tx.quantity, average_cost]
+
+        db.query(Holding).filter(Holding.portfolio_id == portfolio_id).delete(synchronize_session=False)
+        rows = [
+            {"portfolio_id": portfolio_id, "asset_id": asset_id, "quantity": quantity, "average_cost": cost}
+            for asset_id, (quantity, cost) in positions.items()
+            if quantity > 0
+        ]
+        if rows:
+            db.execute(insert(Holding), rows)
+        db.commit()
+        return len(rows)
+
     @staticmethod
     def get_portfolio_diversification(db: Session, portfolio_id: int) -> Dict:
         """
         Calculate portfolio diversification using ibis for efficient SQL aggregations.
         This method now uses the AnalyticsService for database-driven calculations.
         """
-        analytics = AnalyticsService()
-        return analytics.get_portfolio_diversification_analysis(portfolio_id)
+        return get_analytics().get_portfolio_diversification_analysis(portfolio_id)
     
     @staticmethod
     def get_portfolio_performance_metrics(db: Session, portfolio_id: int) -> Dict:
@@ -91,8 +136,7 @@ class PortfolioService:
         Get advanced portfolio performance metrics using ibis.
         This is a new method that provides additional analytics capabilities.
         """
-        analytics = AnalyticsService()
-        return analytics.get_portfolio_performance_metrics(portfolio_id)
+        return get_analytics().get_portfolio_performance_metrics(portfolio_id)
     
     @staticmethod
     def get_asset_allocation_analysis(db: Session, portfolio_id: int) -> Dict:
@@ -100,5 +144,4 @@ class PortfolioService:
         Perform detailed asset allocation analysis using ibis.
         This is a new method that provides sector and geographic diversification insights.
         """
-        analytics = AnalyticsService()
-        return analytics.get_asset_allocation_analysis(portfolio_id)
\ No newline at end of file
+        return get_analytics().get_asset_allocation_analysis(portfolio_id)
\ No newline at end of file
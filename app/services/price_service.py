@@ -1,38 +1,83 @@
-import yfinance as yf
 from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from anyio import CapacityLimiter, to_thread
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import provider_call
+from app.core.singleflight import SingleFlight
+from app.core.tracing import span
+from app.core.ttlcache import TTLCache
 from app.crud.asset import asset
-from app.models.asset import AssetType
-import pandas as pd
+from app.crud.price_history import price_history
+from app.models.asset import Asset, AssetType
+from app.providers import get_provider
+from app.services.market_calendar import calendar_for
+from app.services.refresh_planner import RefreshPlanner
+from app.services.symbol_directory import symbol_directory
+
+# Quotes, info and history come from the PriceProvider chosen by settings.price_provider
+# (yfinance by default); see app.providers
+
+# Provider calls are blocking, so the async variants run them on worker threads bounded by
+# this limiter rather than the one that serves sync endpoints; slow upstream calls
+# then queue here instead of starving the CRUD routes
+provider_limiter = CapacityLimiter(settings.price_provider_concurrency)
+
+# Identical concurrent info/history lookups share one upstream fetch
+info_flight = SingleFlight("info")
+history_flight = SingleFlight("history")
+
+# Full provider records by upper-cased symbol; failed lookups are never cached
+info_cache = TTLCache("asset_info", ttl=lambda: settings.asset_info_cache_seconds)
+
+
+async def _offload(func, *args):
+    return await to_thread.run_sync(func, *args, limiter=provider_limiter)
 
 
 class PriceService:
     @staticmethod
     def get_current_price(symbol: str) -> Optional[Decimal]:
-        """Get current price for a single symbol using yfinance"""
+        """Get current price for a single symbol from the configured provider"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            price = info.get('currentPrice') or info.get('regularMarketPrice')
-            if price:
-                return Decimal(str(price))
+            with provider_call("quote"), span("price.quote", symbol=symbol):
+                return get_provider().quote(symbol)
         except Exception as e:
             print(f"Error fetching price for {symbol}: {e}")
         return None
 
     @staticmethod
     def get_multiple_prices(symbols: List[str]) -> Dict[str, Optional[Decimal]]:
-        """Get current prices for multiple symbols"""
-        prices = {}
-        for symbol in symbols:
-            prices[symbol] = PriceService.get_current_price(symbol)
-        return prices
+        """Get current prices for multiple symbols in one provider batch"""
+        if not symbols:
+            return {}
+        try:
+            with provider_call("quotes"), span("price.quotes", symbols=len(symbols)):
+                return get_provider().quotes(symbols)
+        except Exception as e:
+            print(f"Error fetching prices for {len(symbols)} symbols: {e}")
+        return {symbol: None for symbol in symbols}
+
+    @staticmethod
+    def update_asset_prices(db: Session, asset_ids: Optional[List[int]] = None) -> int:
+        """
+        Update prices for the given assets or, when none are given, for the held and
+        watched assets the refresh planner finds stale; returns how many were requested
+        """
+        if asset_ids:
+            tradeable_assets = PriceService.tradeable_assets(db, asset_ids)
+        else:
+            tradeable_assets = RefreshPlanner.plan(db)
+        if not tradeable_assets:
+            return 0
+        prices = PriceService.get_multiple_prices([a.symbol for a in tradeable_assets])
+        PriceService._store_prices(db, tradeable_assets, prices)
+        return len(tradeable_assets)
 
     @staticmethod
-    def update_asset_prices(db: Session, asset_ids: Optional[List[int]] = None):
-        """Update prices for assets in the database"""
+    def tradeable_assets(db: Session, asset_ids: Optional[List[int]] = None) -> List:
+        """The given assets, or all of them, minus cash"""
         if asset_ids:
             assets = [asset.get(db, id=asset_id) for asset_id in asset_ids]
             assets = [a for a in assets if a is not None]
@@ -40,58 +85,118 @@ class PriceService:
             assets = asset.get_multi(db, limit=1000)
 
         # Filter out cash assets as they don't have market prices
-        tradeable_assets = [a for a in assets if a.asset_type != AssetType.CASH]
-        
-        symbols = [a.symbol for a in tradeable_assets]
-        prices = PriceService.get_multiple_prices(symbols)
-
-        for asset_obj in tradeable_assets:
-            new_price = prices.get(asset_obj.symbol)
-            if new_price:
-                asset.update(
-                    db,
-                    db_obj=asset_obj,
-                    obj_in={
-                        "current_price": new_price,
-                        "last_updated": datetime.utcnow()
-                    }
-                )
+        return [a for a in assets if a.asset_type != AssetType.CASH]
+
+    @staticmethod
+    def _store_prices(db: Session, tradeable_assets: List, prices: Dict[str, Optional[Decimal]]):
+        PriceService.store_quotes(db, {
+            asset_obj.id: prices[asset_obj.symbol]
+            for asset_obj in tradeable_assets
+            if prices.get(asset_obj.symbol)
+        })
+
+    @staticmethod
+    def store_quotes(db: Session, quotes: Dict[int, Decimal], now: Optional[datetime] = None) -> int:
+        """
+        Write {asset_id: price} as each asset's current price, with one bulk UPDATE.
+        Quotes taken after a session closed are that session's close and are upserted
+        into price_history under its trading date; intraday quotes, and markets that
+        never close, are left to the history backfill.
+        """
+        if not quotes:
+            return 0
+        now = now or datetime.utcnow()
+        asset.bulk_update(db, values_by_id={
+            asset_id: {"current_price": price, "last_updated": now} for asset_id, price in quotes.items()
+        })
+        sessions: Dict[int, date] = {}
+        markets = db.query(Asset.id, Asset.exchange, Asset.asset_type).filter(Asset.id.in_(list(quotes)))
+        for asset_id, exchange, asset_type in markets:
+            calendar = calendar_for(exchange, asset_type)
+            session_date = calendar and calendar.closed_session_date(now)
+            if session_date is not None:
+                sessions[asset_id] = session_date
+        price_history.upsert_bars(
+            db,
+            bars=[{"asset_id": asset_id, "date": day, "close": quotes[asset_id]} for asset_id, day in sessions.items()],
+            update_fields=["close"]
+        )
+        return len(quotes)
 
     @staticmethod
     def get_asset_info(symbol: str) -> Dict:
-        """Get detailed asset information from yfinance"""
+        """Get detailed asset information; the provider is only called on a cache miss"""
+        key = symbol.upper()
+        cached = info_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        return info_flight.do(key, PriceService._fetch_asset_info, symbol)
+
+    @staticmethod
+    def _fetch_asset_info(symbol: str) -> Dict:
+        """
+        Get detailed asset information from the configured provider and cache it. When
+        the provider fails, answer with what the symbol directory knows instead
+        """
+        key = symbol.upper()
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            # Determine asset type based on available info
-            asset_type = AssetType.STOCK  # default
-            if 'fundFamily' in info or 'category' in info:
-                asset_type = AssetType.ETF
-            elif 'bondRating' in info or 'maturityDate' in info:
-                asset_type = AssetType.BOND
-            
-            return {
-                'symbol': symbol.upper(),
-                'name': info.get('longName', info.get('shortName', symbol)),
-                'asset_type': asset_type,
-                'exchange': info.get('exchange'),
-                'currency': info.get('currency', 'USD'),
-                'current_price': info.get('currentPrice', info.get('regularMarketPrice')),
-                'sector': info.get('sector'),
-                'industry': info.get('industry')
-            }
+            with provider_call("info"), span("price.info", symbol=symbol):
+                info = get_provider().info(symbol)
         except Exception as e:
             print(f"Error fetching asset info for {symbol}: {e}")
-            return {
-                'symbol': symbol.upper(),
-                'name': symbol.upper(),
-                'asset_type': AssetType.STOCK,
-                'currency': 'USD'
+            fallback = {'symbol': key, 'name': key, 'asset_type': AssetType.STOCK, 'currency': 'USD'}
+            entry = symbol_directory.get(key)
+            if entry is not None:
+                fallback.update(entry.as_dict())
+            return fallback
+        info_cache.put(key, info)
+        return dict(info)
+
+    @staticmethod
+    def backfill_history(db: Session, asset_obj, period: str = "1y") -> int:
+        """Store daily bars for an asset in price_history; returns the number of bars written"""
+        history = PriceService.get_historical_data(asset_obj.symbol, period=period, interval="1d")
+        if 'error' in history:
+            raise ValueError(history['error'])
+        bars = [
+            {
+                "asset_id": asset_obj.id,
+                "date": date.fromisoformat(bar['date']),
+                "open": Decimal(str(bar['open'])),
+                "high": Decimal(str(bar['high'])),
+                "low": Decimal(str(bar['low'])),
+                "close": Decimal(str(bar['close'])),
+                "volume": bar['volume'],
             }
+            for bar in history['data']
+        ]
+        return price_history.upsert_bars(db, bars=bars)
+
+    @staticmethod
+    async def get_asset_info_async(symbol: str) -> Dict:
+        """get_asset_info without blocking the event loop; cache hits never leave it"""
+        key = symbol.upper()
+        cached = info_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        return await info_flight.do_async(key, _offload, PriceService._fetch_asset_info, symbol)
+
+    @staticmethod
+    async def get_historical_data_async(symbol: str, period: str = "1y", interval: str = "1d") -> Dict:
+        """get_historical_data without blocking the event loop"""
+        return await history_flight.do_async(
+            (symbol, period, interval), _offload, PriceService.get_historical_data, symbol, period, interval
+        )
 
     @staticmethod
     def get_historical_data(symbol: str, period: str = "1y", interval: str = "1d") -> Dict:
+        """Historical market data; concurrent calls with the same arguments share one fetch"""
+        return history_flight.do(
+            (symbol, period, interval), PriceService._fetch_historical_data, symbol, period, interval
+        )
+
+    @staticmethod
+    def _fetch_historical_data(symbol: str, period: str = "1y", interval: str = "1d") -> Dict:
         """
         Get historical market data for a symbol
         
@@ -103,34 +208,26 @@ class PriceService:
         Returns:
             Dictionary containing historical data and metadata
         """
+        provider = get_provider()
         try:
-            ticker = yf.Ticker(symbol)
-            
-            # Get historical data
-            hist = ticker.history(period=period, interval=interval)
-            
-            if hist.empty:
+            with provider_call("history"), span("price.history", symbol=symbol, period=period):
+                data = provider.history(symbol, period=period, interval=interval)
+
+            if not data:
                 return {
                     'symbol': symbol.upper(),
                     'error': 'No data available for this symbol',
                     'data': []
                 }
-            
-            # Convert to list of dictionaries for JSON serialization
-            data = []
-            for date, row in hist.iterrows():
-                data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume']) if pd.notna(row['Volume']) else 0
-                })
-            
-            # Get basic info about the stock
-            info = ticker.info
-            
+
+            # Get basic info about the stock; the bars are still useful without it
+            try:
+                with provider_call("info"), span("price.info", symbol=symbol):
+                    info = provider.info(symbol)
+            except Exception as e:
+                print(f"Error fetching asset info for {symbol}: {e}")
+                info = {}
+
             # Calculate some basic statistics
             closes = [d['close'] for d in data]
             if len(closes) > 1:
@@ -150,9 +247,9 @@ class PriceService:
             
             return {
                 'symbol': symbol.upper(),
-                'name': info.get('longName', info.get('shortName', symbol.upper())),
-                'currency': info.get('currency', 'USD'),
-                'exchange': info.get('exchange', ''),
+                'name': info.get('name') or symbol.upper(),
+                'currency': info.get('currency') or 'USD',
+                'exchange': info.get('exchange') or '',
                 'period': period,
                 'interval': interval,
                 'current_price': closes[-1] if closes else None,
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select, union
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.watchlist import WatchlistItem
+from app.services.market_calendar import calendar_for, to_utc_naive
+
+# Budget for asset types missing from settings.price_staleness_seconds and its "default"
+DEFAULT_STALENESS_SECONDS = 900.0
+
+
+class RefreshPlanner:
+    """
+    Decides which prices a refresh should fetch: assets with a non-zero holding in
+    any portfolio or on any watchlist, whose last_updated is older than the
+    staleness budget for their asset type. Everything else in the assets table,
+    however large, costs nothing.
+
+    With market hours on, an asset whose exchange is closed is planned only until
+    its price has been fetched once after the latest session close, and assets on
+    open markets come first.
+    """
+
+    @staticmethod
+    def budget(asset_type: AssetType, budgets: Optional[Dict[str, float]] = None) -> timedelta:
+        budgets = settings.price_staleness_seconds if budgets is None else budgets
+        seconds = budgets.get(asset_type.value, budgets.get("default", DEFAULT_STALENESS_SECONDS))
+        return timedelta(seconds=seconds)
+
+    @staticmethod
+    def plan(
+        db: Session,
+        *,
+        now: Optional[datetime] = None,
+        budgets: Optional[Dict[str, float]] = None,
+        market_hours: Optional[bool] = None
+    ) -> List[Asset]:
+        """Held or watched non-cash assets due for a refresh, never-priced first, then stalest first"""
+        now = now or datetime.utcnow()
+        followed = union(
+            select(Holding.asset_id).where(Holding.quantity != 0),
+            select(WatchlistItem.asset_id),
+        )
+        stale = or_(
+            Asset.last_updated.is_(None),
+            *[
+                and_(Asset.asset_type == t, Asset.last_updated < now - RefreshPlanner.budget(t, budgets))
+                for t in AssetType if t != AssetType.CASH
+            ]
+        )
+        assets = (
+            db.query(Asset)
+            .filter(Asset.id.in_(followed), Asset.asset_type != AssetType.CASH, stale)
+            .order_by(Asset.last_updated.asc().nulls_first(), Asset.id)
+            .all()
+        )
+        if not (settings.price_market_hours if market_hours is None else market_hours):
+            return assets
+        return RefreshPlanner.by_market(assets, now)
+
+    @staticmethod
+    def by_market(assets: List[Asset], now: datetime) -> List[Asset]:
+        """Drop closed-market assets already priced since their last close; open markets first, order kept"""
+        states: Dict[str, Tuple[bool, Optional[datetime]]] = {}
+        open_markets, closed_markets = [], []
+        for asset_obj in assets:
+            calendar = calendar_for(asset_obj.exchange, asset_obj.asset_type)
+            if calendar.code not in states:
+                is_open = calendar.is_open(now)
+                states[calendar.code] = (is_open, None if is_open else calendar.previous_close(now))
+            is_open, last_close = states[calendar.code]
+            if is_open:
+                open_markets.append(asset_obj)
+            elif asset_obj.last_updated is None or (
+                last_close is not None and to_utc_naive(asset_obj.last_updated) < last_close
+            ):
+                # One final refresh picks up the closing price
+                closed_markets.append(asset_obj)
+        return open_markets + closed_markets
@@ -0,0 +1,184 @@
+import csv
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.core.metrics import cache_requests
+from app.models.asset import Asset, AssetType
+
+
+class SymbolEntry(NamedTuple):
+    symbol: str
+    name: str
+    asset_type: str
+    exchange: Optional[str]
+
+    def as_dict(self) -> Dict:
+        return self._asdict()
+
+
+class _Snapshot(NamedTuple):
+    """Sorted parallel arrays; never mutated once published"""
+    symbols: List[str]
+    names: List[str]
+    asset_types: List[str]
+    exchanges: List[Optional[str]]
+    # (lower-cased name word, symbol), sorted, for name prefix lookups
+    words: List[Tuple[str, str]]
+
+
+def _name_words(name: str) -> List[str]:
+    return sorted(set(name.lower().split()))
+
+
+def _discard(items: list, item) -> None:
+    i = bisect_left(items, item)
+    if i < len(items) and items[i] == item:
+        del items[i]
+
+
+class SymbolDirectory:
+    """
+    In-process symbol directory for typeahead: symbol, name, type and exchange in
+    sorted parallel arrays, answering prefix queries by binary search with no
+    network or database round-trip. Writers copy the arrays, apply their change
+    and publish the new snapshot, so lookups never take a lock.
+    """
+
+    def __init__(self):
+        self._write_lock = threading.Lock()
+        self._snapshot = _Snapshot([], [], [], [], [])
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._snapshot.symbols)
+
+    def load(self, entries: Iterable[SymbolEntry]) -> None:
+        """Replace the directory contents; later entries win on duplicate symbols"""
+        by_symbol = {entry.symbol: entry for entry in entries}
+        ordered = [by_symbol[symbol] for symbol in sorted(by_symbol)]
+        snapshot = _Snapshot(
+            symbols=[e.symbol for e in ordered],
+            names=[e.name for e in ordered],
+            asset_types=[e.asset_type for e in ordered],
+            exchanges=[e.exchange for e in ordered],
+            words=sorted((word, e.symbol) for e in ordered for word in _name_words(e.name)),
+        )
+        with self._write_lock:
+            self._snapshot = snapshot
+            self.loaded = True
+
+    def load_from_db(self, db: Session, listing_path: Optional[str] = None) -> int:
+        """Load the optional listing file, then the assets table on top of it"""
+        entries: List[SymbolEntry] = []
+        if listing_path:
+            entries.extend(self.read_listing(listing_path))
+        rows = db.query(Asset.symbol, Asset.name, Asset.asset_type, Asset.exchange).yield_per(5000)
+        entries.extend(self.make_entry(*row) for row in rows)
+        self.load(entries)
+        return len(self)
+
+    @staticmethod
+    def read_listing(path: str) -> List[SymbolEntry]:
+        """Read a CSV listing with symbol and name columns and optional asset_type/exchange"""
+        with open(path, newline="", encoding="utf-8") as f:
+            return [
+                SymbolDirectory.make_entry(
+                    row["symbol"], row.get("name"),
+                    row.get("asset_type") or AssetType.STOCK, row.get("exchange") or None
+                )
+                for row in csv.DictReader(f)
+                if row.get("symbol")
+            ]
+
+    def upsert_assets(self, assets: Sequence[Asset]) -> None:
+        """Apply created or updated assets"""
+        self.upsert([self.make_entry(a.symbol, a.name, a.asset_type, a.exchange) for a in assets])
+
+    def upsert(self, entries: Sequence[SymbolEntry]) -> None:
+        if not entries:
+            return
+        with self._write_lock:
+            symbols, names, asset_types, exchanges, words = (list(a) for a in self._snapshot)
+            for entry in entries:
+                i = bisect_left(symbols, entry.symbol)
+                if i < len(symbols) and symbols[i] == entry.symbol:
+                    for word in _name_words(names[i]):
+                        _discard(words, (word, entry.symbol))
+                    names[i], asset_types[i], exchanges[i] = entry.name, entry.asset_type, entry.exchange
+                else:
+                    symbols.insert(i, entry.symbol)
+                    names.insert(i, entry.name)
+                    asset_types.insert(i, entry.asset_type)
+                    exchanges.insert(i, entry.exchange)
+                for word in _name_words(entry.name):
+                    insort(words, (word, entry.symbol))
+            self._snapshot = _Snapshot(symbols, names, asset_types, exchanges, words)
+
+    def remove(self, symbols_to_remove: Sequence[str]) -> None:
+        with self._write_lock:
+            symbols, names, asset_types, exchanges, words = (list(a) for a in self._snapshot)
+            for symbol in symbols_to_remove:
+                i = bisect_left(symbols, symbol)
+                if i < len(symbols) and symbols[i] == symbol:
+                    for word in _name_words(names[i]):
+                        _discard(words, (word, symbol))
+                    for array in (symbols, names, asset_types, exchanges):
+                        del array[i]
+            self._snapshot = _Snapshot(symbols, names, asset_types, exchanges, words)
+
+    def get(self, symbol: str) -> Optional[SymbolEntry]:
+        snap = self._snapshot
+        i = self._index(snap, symbol.strip().upper())
+        cache_requests.inc(cache="symbol_directory", result="miss" if i is None else "hit")
+        return self._at(snap, i) if i is not None else None
+
+    def search(self, query: str, limit: int = 10) -> List[SymbolEntry]:
+        """
+        Exact symbol first, then symbol prefixes in symbol order, then symbols
+        whose name has a word starting with the query.
+        """
+        snap = self._snapshot
+        prefix = query.strip().upper()
+        if not prefix:
+            return []
+
+        positions: List[int] = []
+        i = bisect_left(snap.symbols, prefix)
+        while i < len(snap.symbols) and len(positions) < limit and snap.symbols[i].startswith(prefix):
+            positions.append(i)
+            i += 1
+
+        if len(positions) < limit:
+            word = prefix.lower()
+            seen = set(positions)
+            j = bisect_left(snap.words, (word, ""))
+            while j < len(snap.words) and len(positions) < limit and snap.words[j][0].startswith(word):
+                position = self._index(snap, snap.words[j][1])
+                if position is not None and position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+                j += 1
+
+        return [self._at(snap, i) for i in positions]
+
+    @staticmethod
+    def _index(snap: _Snapshot, symbol: str) -> Optional[int]:
+        i = bisect_left(snap.symbols, symbol)
+        if i < len(snap.symbols) and snap.symbols[i] == symbol:
+            return i
+        return None
+
+    @staticmethod
+    def _at(snap: _Snapshot, i: int) -> SymbolEntry:
+        return SymbolEntry(snap.symbols[i], snap.names[i], snap.asset_types[i], snap.exchanges[i])
+
+    @staticmethod
+    def make_entry(symbol, name, asset_type, exchange) -> SymbolEntry:
+        if isinstance(asset_type, AssetType):
+            asset_type = asset_type.value
+        symbol = symbol.strip().upper()
+        return SymbolEntry(symbol, name or symbol, str(asset_type), exchange)
+
+
+symbol_directory = SymbolDirectory()
@@ -0,0 +1,149 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction
+from app.providers import Priority, priority
+from app.services.analytics_service import get_analytics
+from app.services.price_service import PriceService
+from app.services.refresh_planner import RefreshPlanner
+from app.services.symbol_directory import symbol_directory
+
+
+class Warmup:
+    """
+    Startup warm-up: fills the symbol directory, refreshes stale held prices, and runs the
+    analytics queries once on the shared AnalyticsService, so the first real requests
+    reuse its connection and table handles instead of importing ibis and pandas,
+    reflecting tables or reading cold database pages. Valuations of the busiest
+    portfolios land in its valuation cache. Each step is timed and its error
+    recorded; a failed step does not keep the app from going ready.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.status = "pending"
+            self.started_at: Optional[datetime] = None
+            self.finished_at: Optional[datetime] = None
+            self.steps: Dict[str, Dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "status": self.status,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "steps": {name: dict(step) for name, step in self.steps.items()},
+            }
+
+    def run(
+        self,
+        db: Session,
+        *,
+        symbols: bool = True,
+        listing_path: Optional[str] = None,
+        prices: bool = False,
+        analytics: bool = True,
+        valuation_portfolios: int = 0,
+    ) -> None:
+        """Run the enabled steps in order, then mark the app ready"""
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.utcnow()
+            self.steps = {}
+        if symbols:
+            self._step("symbol_directory", lambda: self._load_symbols(db, listing_path))
+        if prices:
+            self._step("prices", lambda: self._refresh_prices(db))
+        if analytics or valuation_portfolios:
+            portfolio_ids = self.most_active_portfolios(db, max(valuation_portfolios, 1))
+            if analytics:
+                self._step("analytics", lambda: self._compile_analytics(portfolio_ids[:1]))
+            if valuation_portfolios and portfolio_ids:
+                self._step("valuations", lambda: self._value_portfolios(portfolio_ids))
+        with self._lock:
+            self.status = "ready"
+            self.finished_at = datetime.utcnow()
+
+    def _step(self, name: str, func: Callable[[], int]) -> None:
+        start = time.perf_counter()
+        step: Dict = {}
+        try:
+            step["count"] = func()
+        except Exception as e:
+            step["error"] = f"{type(e).__name__}: {e}"
+            print(f"Warm-up step {name} failed: {e}")
+        step["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        with self._lock:
+            self.steps[name] = step
+
+    @staticmethod
+    def most_active_portfolios(db: Session, limit: int) -> List[int]:
+        """Portfolios with holdings, most transactions first"""
+        # Count per portfolio before joining, so holdings do not multiply transactions
+        trades = (
+            select(Transaction.portfolio_id, func.count(Transaction.id).label("trades"))
+            .group_by(Transaction.portfolio_id)
+            .subquery()
+        )
+        rows = (
+            db.query(Portfolio.id)
+            .outerjoin(trades, trades.c.portfolio_id == Portfolio.id)
+            .filter(Portfolio.id.in_(select(Holding.portfolio_id)))
+            .order_by(func.coalesce(trades.c.trades, 0).desc(), Portfolio.id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    @staticmethod
+    def _load_symbols(db: Session, listing_path: Optional[str]) -> int:
+        return symbol_directory.load_from_db(db, listing_path=listing_path)
+
+    @staticmethod
+    def _refresh_prices(db: Session) -> int:
+        asset_ids = [a.id for a in RefreshPlanner.plan(db)]
+        if asset_ids:
+            with priority(Priority.BACKGROUND):
+                PriceService.update_asset_prices(db, asset_ids=asset_ids)
+        return len(asset_ids)
+
+    @staticmethod
+    def _compile_analytics(portfolio_ids: List[int]) -> int:
+        analytics = get_analytics()
+        if not portfolio_ids:
+            # Nothing to analyse yet; still pay for ibis and one compiled query
+            analytics.get_portfolio_value_analysis(0)
+            return 1
+        queries = (
+            analytics.get_portfolio_value_analysis,
+            analytics.get_portfolio_diversification_analysis,
+            analytics.get_portfolio_performance_metrics,
+            analytics.get_asset_allocation_analysis,
+        )
+        for query in queries:
+            query(portfolio_ids[0])
+        return len(queries)
+
+    @staticmethod
+    def _value_portfolios(portfolio_ids: List[int]) -> int:
+        # Cached where the valuation endpoints read them
+        analytics = get_analytics()
+        for portfolio_id in portfolio_ids:
+            analytics.portfolio_value(portfolio_id)
+        return len(portfolio_ids)
+
+
+warmup = Warmup()
@@ -0,0 +1,84 @@
+"""
+Standalone price worker: runs the price refresh and history backfill jobs that the
+API enqueues in the jobs table, so provider calls happen outside the web process.
+Run API processes with PRICE_JOBS_IN_API=false, then start one or more of:
+
+    python -m app.workers.price_worker [--threads 4] [--poll-interval 1.0] [--refresh-interval 60] [--once]
+
+With a refresh interval the worker also queues a planned price refresh every
+interval: held and watched assets past their staleness budget, skipping markets
+that are closed once their closing prices are stored.
+"""
+import argparse
+import signal
+import threading
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables
+from app.services.job_service import PRICE_JOB_TYPES, JobRunner, schedule_price_refresh
+
+
+def build_runner(session_factory=SessionLocal, threads: int = 4, poll_interval: float = 1.0) -> JobRunner:
+    return JobRunner(
+        session_factory,
+        workers=threads,
+        poll_interval=poll_interval,
+        stale_after=settings.job_stale_seconds,
+        job_types=PRICE_JOB_TYPES,
+    )
+
+
+def drain(runner: JobRunner) -> int:
+    """Run queued price jobs until none are left; returns how many ran"""
+    runner.requeue_stale()
+    count = 0
+    while runner.run_next() is not None:
+        count += 1
+    return count
+
+
+def schedule(runner: JobRunner) -> None:
+    db = runner.session_factory()
+    try:
+        schedule_price_refresh(runner, db)
+    except Exception as e:
+        print(f"Price refresh scheduling error: {e}")
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run queued price refresh and history backfill jobs")
+    parser.add_argument("--threads", type=int, default=4, help="jobs run concurrently")
+    parser.add_argument("--poll-interval", type=float, default=settings.job_poll_interval)
+    parser.add_argument(
+        "--refresh-interval", type=float, default=settings.price_refresh_interval,
+        help="seconds between planned price refreshes (0: none); with --once, plan one before draining"
+    )
+    parser.add_argument("--once", action="store_true", help="drain the queue and exit")
+    args = parser.parse_args(argv)
+
+    if settings.create_tables_on_startup:
+        create_tables()
+    runner = build_runner(threads=args.threads, poll_interval=args.poll_interval)
+    if args.once:
+        if args.refresh_interval:
+            schedule(runner)
+        print(f"Ran {drain(runner)} price jobs")
+        return
+
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+    runner.start()
+    print(f"Price worker running {args.threads} threads; waiting for jobs")
+    while True:
+        if args.refresh_interval:
+            schedule(runner)
+        if stopping.wait(args.refresh_interval or None):
+            break
+    runner.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark asset typeahead search over a synthetic symbol universe.
+
+Compares the in-memory symbol directory and the assets_fts index with the
+substring (ilike) scan they replace.
+
+Usage: python benchmarks/bench_asset_search.py [--assets 100000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.asset import asset
+from app.models.asset import Asset, AssetType
+from app.services.symbol_directory import SymbolDirectory
+
+WORDS = [
+    "Global", "Capital", "Energy", "Holdings", "Technologies", "Pharma", "Bank", "Trust",
+    "Industries", "Systems", "Networks", "Resources", "Financial", "Partners", "Realty",
+    "Mining", "Foods", "Motors", "Logistics", "Therapeutics", "Software", "Semiconductor",
+    "Airlines", "Retail", "Media", "Insurance", "Utilities", "Growth", "Income", "Index",
+]
+
+
+def universe(count, rng):
+    seen = set()
+    while len(seen) < count:
+        seen.add("".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))))
+    for symbol in seen:
+        name = " ".join(rng.sample(WORDS, 3)) + " Inc."
+        yield {"symbol": symbol, "name": name, "asset_type": AssetType.STOCK}
+
+
+def timings(db, queries, search):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        search(db, q)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def ilike_search(db, q):
+    return (
+        db.query(Asset)
+        .filter((Asset.name.ilike(f"%{q}%")) | (Asset.symbol.ilike(f"%{q}%")))
+        .limit(10)
+        .all()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        asset.bulk_create(db, objs_in=list(universe(args.assets, rng)))
+
+        symbols = [s for (s,) in db.query(Asset.symbol)]
+        # Typeahead keystrokes: 1-3 character symbol prefixes and name word prefixes
+        queries = [
+            rng.choice(symbols)[:rng.randint(1, 3)] if i % 2 else rng.choice(WORDS)[:rng.randint(2, 5)]
+            for i in range(args.queries)
+        ]
+
+        directory = SymbolDirectory()
+        start = time.perf_counter()
+        directory.load_from_db(db)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        print(f"Asset search benchmark ({args.assets} assets, {args.queries} queries, limit 10)")
+        print(f"{'':<10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for label, search in [
+            ("directory", lambda db, q: directory.search(q, limit=10)),
+            ("fts5", lambda db, q: asset.search_by_name_or_symbol(db, query=q)),
+            ("ilike", ilike_search),
+        ]:
+            mean, p50, p99 = timings(db, queries, search)
+            print(f"{label:<10} {mean:9.3f} {p50:9.3f} {p99:9.3f}")
+        print(f"directory load: {load_ms:.0f} ms")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
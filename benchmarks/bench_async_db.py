@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /holdings/?portfolio_id= throughput with sync and async database sessions.
+
+Runs the app in-process behind httpx's ASGI transport with --concurrency requests
+in flight, once with the thread-pool sync Session (ASYNC_DB unset) and once with
+the aiosqlite AsyncSession (ASYNC_DB=true).
+
+Usage: python benchmarks/bench_async_db.py [--holdings 50] [--requests 2000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, async_database_url, get_db
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from main import app
+
+
+def seed(db, holdings):
+    portfolio = Portfolio(name="Bench")
+    db.add(portfolio)
+    db.flush()
+    for i in range(holdings):
+        a = Asset(symbol=f"B{i}", name=f"Bench {i}", asset_type=AssetType.STOCK, current_price=Decimal("10"))
+        db.add(a)
+        db.flush()
+        db.add(Holding(portfolio_id=portfolio.id, asset_id=a.id, quantity=Decimal("1"), average_cost=Decimal("5")))
+    db.commit()
+    return portfolio.id
+
+
+async def load(portfolio_id, requests, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.get("/api/v1/holdings/", params={"portfolio_id": portfolio_id})
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--holdings", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        portfolio_id = seed(db, args.holdings)
+        db.close()
+
+        async_engine = create_async_engine(async_database_url(url))
+        async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        def sync_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def async_db():
+            async with async_factory() as db:
+                yield db
+
+        print(
+            f"GET /holdings/?portfolio_id= ({args.holdings} holdings, {args.requests} requests, "
+            f"concurrency {args.concurrency})"
+        )
+
+        async def run_modes():
+            # One event loop for both modes: pooled aiosqlite connections are bound to it
+            for label, dependency in [("sync", sync_db), ("async", async_db)]:
+                app.dependency_overrides[get_db] = dependency
+                await load(portfolio_id, min(args.requests, 100), args.concurrency)  # warm-up
+                rps = await load(portfolio_id, args.requests, args.concurrency)
+                print(f"{label:<6} {rps:9.1f} req/s")
+            await async_engine.dispose()
+
+        asyncio.run(run_modes())
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark CRUD latency while slow historical-data requests are in flight.
+
+The provider is replaced by a sleep of --upstream-ms. The async route offloads it
+to the bounded provider threads; the sync variant blocks a thread-pool thread per
+request, the way every network-bound route used to.
+
+Usage: python benchmarks/bench_async_providers.py [--in-flight 100] [--upstream-ms 500] [--probes 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_db
+from app.services.price_service import PriceService
+from main import app
+
+
+def percentiles(samples):
+    samples = sorted(s * 1000 for s in samples)
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+async def probe(client, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await client.get("/api/v1/portfolios/")
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(path, in_flight, probes):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        load = [asyncio.create_task(client.get(path.format(i=i))) for i in range(in_flight)]
+        await asyncio.sleep(0.05)
+        samples = await probe(client, probes)
+        await asyncio.gather(*load)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--in-flight", type=int, default=100)
+    parser.add_argument("--upstream-ms", type=float, default=500)
+    parser.add_argument("--probes", type=int, default=50)
+    args = parser.parse_args()
+
+    def slow_history(symbol, period="1y", interval="1d"):
+        time.sleep(args.upstream_ms / 1000)
+        return {"symbol": symbol, "data": []}
+    PriceService.get_historical_data = staticmethod(slow_history)
+
+    @app.get("/bench/sync-historical/{symbol}")
+    def sync_historical(symbol: str):
+        return PriceService.get_historical_data(symbol)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        def bench_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+        app.dependency_overrides[get_db] = bench_db
+
+        print(
+            f"CRUD latency with {args.in_flight} historical requests in flight "
+            f"({args.upstream_ms:.0f} ms upstream, {args.probes} probes)"
+        )
+        print(f"{'':<14} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for label, path, in_flight in [
+            ("idle", "", 0),
+            ("async route", "/api/v1/assets/SYM{i}/historical", args.in_flight),
+            ("sync route", "/bench/sync-historical/SYM{i}", args.in_flight),
+        ]:
+            mean, p50, p99 = percentiles(asyncio.run(run(path, in_flight, args.probes)))
+            print(f"{label:<14} {mean:9.2f} {p50:9.2f} {p99:9.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-row CRUD against the bulk CRUDBase methods.
+
+Usage: python benchmarks/bench_bulk_crud.py [--rows 10000] [--baseline-rows 1000]
+
+The per-row baseline commits once per row, so it is measured on a smaller
+sample and scaled linearly to --rows.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.asset import asset
+from app.models.asset import Asset, AssetType
+from app.schemas.asset import AssetCreate
+
+
+@contextmanager
+def fresh_session():
+    """Session on a throwaway file database, so commits pay real I/O"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            yield db
+        finally:
+            db.close()
+            engine.dispose()
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f}s")
+    return elapsed
+
+
+def assets_in(rows, prefix="SYM"):
+    return [
+        AssetCreate(symbol=f"{prefix}{i}", name=f"Asset {i}", asset_type=AssetType.STOCK)
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--baseline-rows", type=int, default=1000)
+    args = parser.parse_args()
+    rows = args.rows
+    sample = min(args.baseline_rows, rows)
+    scale = rows / sample
+
+    print(f"Bulk CRUD benchmark ({rows} rows, per-row baseline scaled from {sample})")
+    print("=" * 45)
+
+    with fresh_session() as db:
+        per_row = scale * timed(
+            f"create (per row, {sample})",
+            lambda: [asset.create(db, obj_in=a) for a in assets_in(sample)]
+        )
+        loaded = db.query(Asset).all()
+        per_row_update = scale * timed(f"update (per row, {sample})", lambda: [
+            asset.update(db, db_obj=a, obj_in={"current_price": Decimal("1.23")}) for a in loaded
+        ])
+
+    with fresh_session() as db:
+        bulk = timed("bulk_create", lambda: asset.bulk_create(db, objs_in=assets_in(rows)))
+        ids = [id for (id,) in db.query(Asset.id)]
+        bulk_update = timed("bulk_update", lambda: asset.bulk_update(
+            db, values_by_id={id: {"current_price": Decimal("1.23")} for id in ids}
+        ))
+        timed("upsert (all conflicting)", lambda: asset.upsert(
+            db, objs_in=assets_in(rows), index_elements=["symbol"]
+        ))
+        timed("upsert (all new)", lambda: asset.upsert(
+            db, objs_in=assets_in(rows, prefix="NEW"), index_elements=["symbol"]
+        ))
+
+    print("=" * 45)
+    print(f"create speedup: {per_row / bulk:6.1f}x")
+    print(f"update speedup: {per_row_update / bulk_update:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
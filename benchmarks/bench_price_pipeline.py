@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the price refresh and analytics pipeline offline at any universe size.
+
+Seeds a throwaway database with --assets assets and --portfolios portfolios, then
+times planned batch price updates (stale held assets only), a PRICE_REFRESH job
+over every asset, a HISTORY_BACKFILL job and the analytics queries against a
+synthetic random-walk provider, or a recording made with app.providers.record
+(--replay), with --latency-ms injected per provider call.
+
+Usage: python benchmarks/bench_price_pipeline.py [--assets 1000] [--portfolios 10] [--holdings 50]
+           [--backfill 100] [--latency-ms 0] [--jitter-ms 0] [--replay recording.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.job import JobType
+from app.models.portfolio import Portfolio
+from app.providers import ReplayProvider, SyntheticProvider, set_provider
+from app.services import analytics_service
+from app.services.job_service import JobRunner
+from app.services.price_service import PriceService
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return result
+
+
+def seed(db, symbols, portfolios, holdings):
+    db.add_all([Asset(symbol=s, name=f"Bench {s}", asset_type=AssetType.STOCK) for s in symbols])
+    db.flush()
+    asset_ids = [id for (id,) in db.query(Asset.id)]
+    rng = random.Random(0)
+    portfolio_ids = []
+    for i in range(portfolios):
+        p = Portfolio(name=f"Bench {i}")
+        db.add(p)
+        db.flush()
+        portfolio_ids.append(p.id)
+        db.add_all([
+            Holding(portfolio_id=p.id, asset_id=asset_id, quantity=Decimal(rng.randint(1, 500)),
+                    average_cost=Decimal(rng.randint(10, 400)))
+            for asset_id in rng.sample(asset_ids, min(holdings, len(asset_ids)))
+        ])
+    db.commit()
+    return asset_ids, portfolio_ids
+
+
+def run_job(runner, db, job_type, params):
+    job_obj = runner.submit(db, job_type, params)
+    runner.run_next()
+    db.refresh(job_obj)
+    return job_obj
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--portfolios", type=int, default=10)
+    parser.add_argument("--holdings", type=int, default=50, help="holdings per portfolio")
+    parser.add_argument("--backfill", type=int, default=100, help="assets whose 1y history is backfilled")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--replay", help="replay this recording instead of synthetic prices")
+    args = parser.parse_args()
+
+    if args.replay:
+        provider = ReplayProvider(args.replay, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=0)
+        symbols = (provider.symbols * (args.assets // max(len(provider.symbols), 1) + 1))[:args.assets]
+        symbols = list(dict.fromkeys(symbols))
+    else:
+        provider = SyntheticProvider(seed=0, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+        symbols = [f"SYN{i}" for i in range(args.assets)]
+    set_provider(provider)
+
+    print(
+        f"Price pipeline ({provider.name} provider, {len(symbols)} assets, {args.portfolios} portfolios "
+        f"x {args.holdings} holdings, {args.latency_ms:g} ms latency)"
+    )
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        asset_ids, portfolio_ids = timed("seed", lambda: seed(db, symbols, args.portfolios, args.holdings))
+
+        # Without asset ids the refresh planner picks only held assets whose price is stale
+        planned = timed("update_asset_prices (stale held assets)", lambda: PriceService.update_asset_prices(db))
+        fresh = timed("update_asset_prices (again, all fresh)", lambda: PriceService.update_asset_prices(db))
+        print(f"  planned {planned} of {len(asset_ids)} assets, then {fresh}")
+        runner = JobRunner(session_factory)
+        refresh = timed("PRICE_REFRESH job (all, quote each)", lambda: run_job(
+            runner, db, JobType.PRICE_REFRESH, {"asset_ids": asset_ids}
+        ))
+        backfill = timed(f"HISTORY_BACKFILL job ({min(args.backfill, len(asset_ids))} assets)", lambda: run_job(
+            runner, db, JobType.HISTORY_BACKFILL, {"asset_ids": asset_ids[:args.backfill], "period": "1y"}
+        ))
+
+        analytics_service.get_db_url = lambda: url
+        analytics = timed("AnalyticsService() (ibis import, connect)", analytics_service.AnalyticsService)
+        queries = (
+            analytics.get_portfolio_value_analysis,
+            analytics.get_portfolio_diversification_analysis,
+            analytics.get_portfolio_performance_metrics,
+            analytics.get_asset_allocation_analysis,
+        )
+        timed(f"analytics ({len(queries)} queries x {len(portfolio_ids)} portfolios)", lambda: [
+            query(portfolio_id) for portfolio_id in portfolio_ids for query in queries
+        ])
+
+        print("=" * 50)
+        for job_obj in (refresh, backfill):
+            print(f"{job_obj.job_type.value}: {job_obj.status.value}, "
+                  f"{job_obj.completed_items} ok, {job_obj.failed_items} failed")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark quote tail latency with and without the hedged provider chain.
+
+The primary stand-in answers in --latency-ms but stalls for --stall-ms on
+--stall-rate of calls (a throttled or hanging upstream); the secondary always
+answers in --latency-ms. Quotes are fetched one after another, as a refresh job
+does, straight from the primary and then through a ProviderChain with hedging.
+
+Usage: python benchmarks/bench_provider_chain.py [--quotes 400] [--latency-ms 20] [--stall-ms 2000]
+           [--stall-rate 0.03] [--deadline-ms 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.providers import ProviderChain, SyntheticProvider
+
+
+class Stalling(SyntheticProvider):
+    def __init__(self, name, latency_ms, stall_ms, stall_rate, seed):
+        super().__init__(seed=seed)
+        self.name = name
+        self.latency_ms = latency_ms
+        self.stall_ms = stall_ms
+        self.stall_rate = stall_rate
+        self.rng = random.Random(seed)
+
+    def quote(self, symbol):
+        stalled = self.rng.random() < self.stall_rate
+        time.sleep((self.stall_ms if stalled else self.latency_ms) / 1000)
+        return super().quote(symbol)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return pick(0.5), pick(0.95), pick(0.99), samples[-1] * 1000
+
+
+def run(label, provider, quotes):
+    samples, failures = [], 0
+    for i in range(quotes):
+        start = time.perf_counter()
+        try:
+            provider.quote(f"S{i}")
+        except Exception:
+            failures += 1
+        samples.append(time.perf_counter() - start)
+    p50, p95, p99, worst = percentiles(samples)
+    print(f"{label:<10} {p50:8.1f} {p95:8.1f} {p99:8.1f} {worst:8.1f} {sum(samples):8.2f}s {failures:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quotes", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--stall-ms", type=float, default=2000)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--deadline-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    def primary():
+        return Stalling("primary", args.latency_ms, args.stall_ms, args.stall_rate, seed=1)
+
+    secondary = Stalling("secondary", args.latency_ms, args.stall_ms, 0.0, seed=2)
+    chain = ProviderChain([primary(), secondary], deadline=args.deadline_ms / 1000, hedge_min_delay=0.0)
+
+    print(f"{args.quotes} sequential quotes, {args.stall_rate:.0%} of primary calls stall {args.stall_ms:g} ms")
+    print(f"{'':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'total':>9} {'failed':>6}")
+    run("direct", primary(), args.quotes)
+    run("chain", chain, args.quotes)
+
+
+if __name__ == "__main__":
+    main()
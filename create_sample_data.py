@@ -52,13 +52,15 @@ def create_sample_data():
             {"symbol": "CASH", "name": "Cash Holdings", "asset_type": AssetType.CASH, "currency": "USD"},
         ]
         
-        created_assets = []
-        for asset_data in assets_data:
-            created_asset = asset.create(
-                db,
-                obj_in=AssetCreate(**asset_data)
-            )
-            created_assets.append(created_asset)
+        # One upsert keyed on symbol, so re-running the script refreshes instead of failing
+        asset.upsert(
+            db,
+            objs_in=[AssetCreate(**asset_data) for asset_data in assets_data],
+            index_elements=["symbol"]
+        )
+        created_assets = [
+            asset.get_by_symbol(db, symbol=asset_data["symbol"]) for asset_data in assets_data
+        ]
         
         # Create sample transactions for portfolio 1 (Growth Portfolio)
         transactions_p1 = [
@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosResponse } from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:12000/api/v1';
 
@@ -110,6 +110,19 @@ export interface HistoricalData {
   error?: string;
 }
 
+// List endpoints return one page at a time; follow X-Next-Cursor until the last page
+const getAllPages = async <T>(url: string, params: Record<string, unknown> = {}): Promise<AxiosResponse<T[]>> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  let response: AxiosResponse<T[]>;
+  do {
+    response = await api.get<T[]>(url, { params: cursor ? { ...params, cursor } : params });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { ...response, data: items };
+};
+
 // API Functions
 export const portfolioApi = {
   getAll: () => api.get<Portfolio[]>('/portfolios/'),
@@ -137,7 +150,7 @@ export const assetApi = {
 export const holdingApi = {
   getAll: (portfolioId?: number) => {
     const params = portfolioId ? { portfolio_id: portfolioId } : {};
-    return api.get<Holding[]>('/holdings/', { params });
+    return getAllPages<Holding>('/holdings/', params);
   },
   getById: (id: number) => api.get<Holding>(`/holdings/${id}`),
   create: (data: Omit<Holding, 'id' | 'created_at' | 'updated_at' | 'asset'>) => 
@@ -150,7 +163,7 @@ export const holdingApi = {
 export const transactionApi = {
   getAll: (portfolioId?: number) => {
     const params = portfolioId ? { portfolio_id: portfolioId } : {};
-    return api.get<Transaction[]>('/transactions/', { params });
+    return getAllPages<Transaction>('/transactions/', params);
   },
   getById: (id: number) => api.get<Transaction>(`/transactions/${id}`),
   create: (data: Omit<Transaction, 'id' | 'created_at' | 'asset'>) => 
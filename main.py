@@ -1,18 +1,75 @@
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.config import settings
-from app.core.database import engine
-from app.models import portfolio, asset, holding, transaction
+from app.core.database import SessionLocal, create_tables, engine
+from app.core.instrumentation import QueryStatsMiddleware, slow_query_log
+from app.core.metrics import MetricsMiddleware, registry, track_pool
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, make_exporter
+from app.services.analytics_service import close_analytics
+from app.services.job_service import job_runner
+from app.services.warmup import warmup
+
+slow_query_log.configure(
+    settings.slow_query_ms,
+    settings.slow_query_log_path,
+    max_bytes=settings.slow_query_log_max_bytes,
+    backup_count=settings.slow_query_log_backups,
+)
+
+trace_exporter = (
+    make_exporter(settings.tracing_exporter, settings.tracing_jsonl_path, settings.tracing_otlp_endpoint)
+    if settings.tracing_exporter else None
+)
+
+
+def run_warmup() -> None:
+    db = SessionLocal()
+    try:
+        warmup.run(
+            db,
+            symbols=settings.preload_symbol_directory,
+            listing_path=settings.symbol_listing_path,
+            prices=settings.warmup_prices,
+            analytics=settings.warmup_analytics,
+            valuation_portfolios=settings.warmup_valuation_portfolios,
+        )
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.create_tables_on_startup:
+        create_tables()
+    warmup.reset()
+    if settings.warmup_background:
+        threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+    else:
+        run_warmup()
+    if job_runner.workers:
+        job_runner.start()
+    yield
+    job_runner.stop()
+    close_analytics()
+    if trace_exporter is not None:
+        trace_exporter.flush()
+    if settings.metrics_multiprocess_dir:
+        # Keep this worker's counters in the merged totals, but drop its gauges
+        registry.write_snapshot(settings.metrics_multiprocess_dir, include_gauges=False)
 
-# Create database tables
-portfolio.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Portfolio Tracker API",
     description="A comprehensive portfolio tracking application backend",
     version="1.0.0",
     openapi_url="/api/v1/openapi.json" if settings.debug else None,
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -22,8 +79,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers hide response headers from scripts unless listed; the list endpoints page with this one
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.sql_instrumentation:
+    app.add_middleware(QueryStatsMiddleware)
+
+if trace_exporter is not None:
+    app.add_middleware(
+        TracingMiddleware, exporter=trace_exporter, sample_rate=settings.tracing_sample_rate
+    )
+
+if settings.admin_token or settings.profile_sample_rate > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        admin_token=settings.admin_token,
+        sample_rate=settings.profile_sample_rate,
+        interval=settings.profile_interval_ms / 1000,
+    )
+
+if settings.metrics_enabled:
+    track_pool(engine)
+    app.add_middleware(
+        MetricsMiddleware,
+        multiprocess_dir=settings.metrics_multiprocess_dir,
+        flush_interval=settings.metrics_flush_interval,
+    )
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -42,6 +125,25 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """Ready once the startup warm-up has finished; 503 while it is still running"""
+    state = warmup.as_dict()
+    if not warmup.ready:
+        return JSONResponse(jsonable_encoder(state), status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return state
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics, merged across workers in multiprocess mode"""
+    if settings.metrics_multiprocess_dir:
+        body = registry.render_multiprocess(settings.metrics_multiprocess_dir)
+    else:
+        body = registry.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
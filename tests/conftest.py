@@ -4,15 +4,45 @@ Test configuration and fixtures for Portfolio Tracker tests
 import pytest
 import tempfile
 import os
+from datetime import date
+from decimal import Decimal
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from app.core.database import Base, get_db
-from app.core.config import Settings
+from app.core.config import Settings, settings
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.providers import SyntheticProvider, set_provider
+from app.services.job_service import job_runner
+from app.services.price_service import info_cache
 from main import app
 
 
+@pytest.fixture(scope="session", autouse=True)
+def quiet_lifespan():
+    """Keep the app's startup off the real database: no table creation, warm-up steps or job workers"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "create_tables_on_startup", False)
+        mp.setattr(settings, "preload_symbol_directory", False)
+        mp.setattr(settings, "warmup_background", False)
+        mp.setattr(settings, "warmup_prices", False)
+        mp.setattr(settings, "warmup_analytics", False)
+        mp.setattr(settings, "warmup_valuation_portfolios", 0)
+        mp.setattr(job_runner, "workers", 0)
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_info_cache():
+    """Every test starts without cached provider records, so mocked providers are actually called"""
+    info_cache.clear()
+    yield
+    info_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def test_settings():
     """Test settings with in-memory database"""
@@ -66,6 +96,60 @@ def client(test_db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def fresh_db():
+    """Isolated in-memory database session that keeps its schema across connections"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def fresh_client(fresh_db):
+    """Create test client backed by the isolated fresh_db session"""
+    def override_get_db():
+        yield fresh_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def hold(fresh_db):
+    """Hold the given assets in a portfolio, so refreshes without asset ids pick them up"""
+    def hold(*assets):
+        portfolio = Portfolio(name="Held")
+        fresh_db.add(portfolio)
+        fresh_db.flush()
+        fresh_db.add_all([
+            Holding(portfolio_id=portfolio.id, asset_id=a.id, quantity=Decimal("1"), average_cost=Decimal("1"))
+            for a in assets
+        ])
+        fresh_db.commit()
+        return portfolio
+    return hold
+
+
+@pytest.fixture
+def synthetic_provider():
+    """Offline, deterministic price provider installed for the duration of a test"""
+    provider = SyntheticProvider(seed=1, end=date(2024, 6, 28))
+    previous = set_provider(provider)
+    yield provider
+    set_provider(previous)
+
+
 @pytest.fixture
 def sample_portfolio_data():
     """Sample portfolio data for testing"""
@@ -0,0 +1,100 @@
+"""
+Unit tests for the full-text asset search
+"""
+import pytest
+from fastapi import status
+
+from app.crud.asset import asset
+from app.models.asset import Asset, AssetType
+from app.schemas.asset import AssetCreate
+
+
+@pytest.fixture
+def universe(fresh_db):
+    rows = [
+        ("AA", "Alcoa Corporation"),
+        ("AAL", "American Airlines Group Inc."),
+        ("AAPL", "Apple Inc."),
+        ("APLE", "Apple Hospitality REIT Inc."),
+        ("BRK.B", "Berkshire Hathaway Inc."),
+        ("MSFT", "Microsoft Corporation"),
+        ("PINE", "Alpine Income Property Trust"),
+    ]
+    asset.bulk_create(fresh_db, objs_in=[
+        AssetCreate(symbol=symbol, name=name, asset_type=AssetType.STOCK)
+        for symbol, name in rows
+    ])
+    return rows
+
+
+def symbols(results):
+    return [a.symbol for a in results]
+
+
+class TestAssetSearchRanking:
+    """Test result ordering of search_by_name_or_symbol"""
+
+    def test_exact_symbol_first(self, fresh_db, universe):
+        """Test an exact symbol match outranks longer symbol prefixes"""
+        results = asset.search_by_name_or_symbol(fresh_db, query="aa")
+        assert symbols(results)[:3] == ["AA", "AAL", "AAPL"]
+
+    def test_symbol_prefix_before_name_prefix(self, fresh_db, universe):
+        """Test symbol prefixes rank ahead of name token prefixes"""
+        results = asset.search_by_name_or_symbol(fresh_db, query="apl")
+        assert symbols(results) == ["APLE"]
+
+        results = asset.search_by_name_or_symbol(fresh_db, query="apple")
+        assert set(symbols(results)) == {"AAPL", "APLE"}
+
+    def test_name_token_prefix(self, fresh_db, universe):
+        """Test name matches are on token prefixes, not arbitrary substrings"""
+        assert symbols(asset.search_by_name_or_symbol(fresh_db, query="berk")) == ["BRK.B"]
+        # "pine" is a substring of "Alpine" but only the PINE symbol starts with it
+        assert symbols(asset.search_by_name_or_symbol(fresh_db, query="pine")) == ["PINE"]
+
+    def test_multi_token_query(self, fresh_db, universe):
+        """Test every token must prefix-match"""
+        results = asset.search_by_name_or_symbol(fresh_db, query="apple hosp")
+        assert symbols(results) == ["APLE"]
+
+    def test_dotted_symbol(self, fresh_db, universe):
+        """Test symbols with punctuation are searchable as one token"""
+        assert symbols(asset.search_by_name_or_symbol(fresh_db, query="BRK.B")) == ["BRK.B"]
+
+    def test_limit_and_empty_query(self, fresh_db, universe):
+        """Test limit is honoured and punctuation-only queries return nothing"""
+        assert len(asset.search_by_name_or_symbol(fresh_db, query="a", limit=2)) == 2
+        assert asset.search_by_name_or_symbol(fresh_db, query='"*') == []
+
+
+class TestAssetSearchSync:
+    """Test the index follows writes to the assets table"""
+
+    def test_update_and_delete(self, fresh_db, universe):
+        """Test renamed and deleted assets are reflected immediately"""
+        msft = asset.get_by_symbol(fresh_db, symbol="MSFT")
+        asset.update(fresh_db, db_obj=msft, obj_in={"name": "Macrohard Corporation"})
+        assert symbols(asset.search_by_name_or_symbol(fresh_db, query="macro")) == ["MSFT"]
+        assert asset.search_by_name_or_symbol(fresh_db, query="microsoft") == []
+
+        asset.remove(fresh_db, id=msft.id)
+        assert asset.search_by_name_or_symbol(fresh_db, query="msft") == []
+
+    def test_upsert(self, fresh_db, universe):
+        """Test bulk upserts keep the index in sync"""
+        asset.upsert(
+            fresh_db,
+            objs_in=[{"symbol": "AAPL", "name": "Pineapple Computer", "asset_type": AssetType.STOCK}],
+            index_elements=["symbol"],
+        )
+        assert "AAPL" in symbols(asset.search_by_name_or_symbol(fresh_db, query="pineapple"))
+
+
+class TestSearchEndpoint:
+    """Test the /assets/search endpoint"""
+
+    def test_search(self, fresh_client, universe):
+        response = fresh_client.get("/api/v1/assets/search", params={"q": "aap"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [a["symbol"] for a in response.json()] == ["AAPL"]
@@ -0,0 +1,94 @@
+"""
+Unit tests for the async database session used by the list and read endpoints
+"""
+import pytest
+from decimal import Decimal
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.database import Base, async_database_url, get_db
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from main import app
+
+
+@pytest.fixture
+def async_client(tmp_path, monkeypatch):
+    """Client whose read endpoints get an aiosqlite AsyncSession over a seeded file database"""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    portfolio = Portfolio(name="Async")
+    db.add(portfolio)
+    db.flush()
+    for i in range(5):
+        a = Asset(symbol=f"ASY{i}", name=f"Async {i}", asset_type=AssetType.STOCK, current_price=Decimal("2"))
+        db.add(a)
+        db.flush()
+        db.add(Holding(portfolio_id=portfolio.id, asset_id=a.id, quantity=Decimal("1"), average_cost=Decimal("1")))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+    async_engine = create_async_engine(async_database_url(url))
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    def no_thread_hops(*args, **kwargs):
+        raise AssertionError("async session work was sent to the thread pool")
+    monkeypatch.setattr(database, "run_in_threadpool", no_thread_hops)
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+class TestAsyncReads:
+    """List and read endpoints work unchanged on an AsyncSession"""
+
+    def test_holdings_by_portfolio_paged(self, async_client):
+        """Eager-loaded holdings are served and paged with the usual cursor header"""
+        first = async_client.get("/api/v1/holdings/", params={"portfolio_id": 1, "limit": 3})
+        assert first.status_code == status.HTTP_200_OK
+        assert [h["asset"]["symbol"] for h in first.json()] == ["ASY0", "ASY1", "ASY2"]
+        rest = async_client.get(
+            "/api/v1/holdings/",
+            params={"portfolio_id": 1, "limit": 3, "cursor": first.headers["x-next-cursor"]}
+        )
+        assert [h["asset"]["symbol"] for h in rest.json()] == ["ASY3", "ASY4"]
+
+    def test_portfolio_with_holdings(self, async_client):
+        """The selectin-loaded holdings collection serializes outside the session's greenlet"""
+        response = async_client.get("/api/v1/portfolios/1")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["holdings"]) == 5
+
+    def test_read_endpoints(self, async_client):
+        """Asset and transaction list/read endpoints, including 404s and bad cursors"""
+        assert len(async_client.get("/api/v1/assets/").json()) == 5
+        assert async_client.get("/api/v1/assets/2").json()["symbol"] == "ASY1"
+        assert async_client.get("/api/v1/assets/99").status_code == status.HTTP_404_NOT_FOUND
+        assert async_client.get("/api/v1/transactions/").json() == []
+        bad = async_client.get("/api/v1/transactions/", params={"cursor": "garbage"})
+        assert bad.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestAsyncDatabaseUrl:
+    """Sync URLs map onto their async drivers"""
+
+    def test_driver_substitution(self):
+        """SQLite uses aiosqlite; unknown schemes are rejected"""
+        assert async_database_url("sqlite:///./portfolio.db") == "sqlite+aiosqlite:///./portfolio.db"
+        assert async_database_url("postgresql://u@h/db") == "postgresql+asyncpg://u@h/db"
+        with pytest.raises(ValueError):
+            async_database_url("mysql://u@h/db")
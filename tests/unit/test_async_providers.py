@@ -0,0 +1,87 @@
+"""
+Load test for the async price-provider path: slow upstream calls must not starve
+the thread pool that serves the sync CRUD endpoints
+"""
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import status
+
+from app.core.database import get_db
+from app.services import price_service
+from app.services.price_service import PriceService
+from main import app
+
+UPSTREAM_SECONDS = 0.25
+IN_FLIGHT = 100
+
+
+def slow_history(symbol, period="1y", interval="1d"):
+    time.sleep(UPSTREAM_SECONDS)
+    return {"symbol": symbol, "period": period, "interval": interval, "data": []}
+
+
+@pytest.fixture
+def async_client(fresh_db, monkeypatch):
+    monkeypatch.setattr(PriceService, "get_historical_data", staticmethod(slow_history))
+    app.dependency_overrides[get_db] = lambda: fresh_db
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+async def _crud_latencies(client, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/portfolios/")
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == status.HTTP_200_OK
+    return samples
+
+
+class TestAsyncProviderLoad:
+    """Network-bound routes wait on the provider limiter, not the sync thread pool"""
+
+    def test_crud_latency_flat_under_historical_load(self, async_client):
+        """CRUD requests never wait on an upstream call while 100 historical requests are in flight"""
+        async def scenario():
+            async with async_client as client:
+                idle = await _crud_latencies(client, 10)
+                history = [
+                    asyncio.create_task(client.get(f"/api/v1/assets/SYM{i}/historical"))
+                    for i in range(IN_FLIGHT)
+                ]
+                await asyncio.sleep(0.05)
+                loaded = await _crud_latencies(client, 20)
+                in_flight = sum(not task.done() for task in history)
+                responses = await asyncio.gather(*history)
+            return idle, loaded, in_flight, responses
+
+        idle, loaded, in_flight, responses = asyncio.run(scenario())
+        assert all(r.status_code == status.HTTP_200_OK for r in responses)
+        assert in_flight > IN_FLIGHT // 2
+        # A starved pool would make each probe queue behind at least one upstream call
+        assert max(loaded) < UPSTREAM_SECONDS
+        assert sorted(loaded)[len(loaded) // 2] < max(10 * sorted(idle)[len(idle) // 2], 0.05)
+
+    def test_provider_concurrency_bounded(self, monkeypatch):
+        """No more than the limiter's tokens run upstream calls at once"""
+        monkeypatch.setattr(price_service, "provider_limiter", price_service.CapacityLimiter(4))
+        running, peak = 0, 0
+
+        def history(symbol, period, interval):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            time.sleep(0.02)
+            running -= 1
+            return {"symbol": symbol}
+
+        async def scenario():
+            return await asyncio.gather(*(PriceService.get_historical_data_async(f"S{i}") for i in range(20)))
+
+        monkeypatch.setattr(PriceService, "_fetch_historical_data", staticmethod(history))
+        results = asyncio.run(scenario())
+        assert [r["symbol"] for r in results] == [f"S{i}" for i in range(20)]
+        assert peak <= 4
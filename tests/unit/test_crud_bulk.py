@@ -0,0 +1,161 @@
+"""
+Unit tests for the bulk CRUDBase methods
+"""
+import pytest
+from decimal import Decimal
+from sqlalchemy import event
+
+from app.crud.asset import asset
+from app.crud.watchlist import watchlist
+from app.models.asset import Asset, AssetType
+from app.models.portfolio import Portfolio
+from app.models.watchlist import WatchlistItem
+from app.schemas.asset import AssetCreate
+from app.services.price_service import PriceService
+
+
+@pytest.fixture
+def statement_log(fresh_db):
+    """Record (statement, executemany) for every statement sent to the driver"""
+    log = []
+    engine = fresh_db.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        log.append((statement, executemany))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield log
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _assets(count, prefix="SYM"):
+    return [
+        AssetCreate(symbol=f"{prefix}{i}", name=f"Asset {i}", asset_type=AssetType.STOCK)
+        for i in range(count)
+    ]
+
+
+class TestBulkCreate:
+    """Test CRUDBase.bulk_create"""
+
+    def test_inserts_all_rows_in_batches(self, fresh_db, statement_log):
+        """Test rows are inserted with one executemany per batch"""
+        assert asset.bulk_create(fresh_db, objs_in=_assets(25), batch_size=10) == 25
+        assert fresh_db.query(Asset).count() == 25
+        inserts = [s for s, _ in statement_log if s.startswith("INSERT")]
+        assert len(inserts) == 3
+
+    def test_applies_column_defaults(self, fresh_db):
+        """Test Python-side column defaults are applied"""
+        asset.bulk_create(fresh_db, objs_in=[
+            {"symbol": "EUR1", "name": "Euro asset", "asset_type": AssetType.BOND}
+        ])
+        assert asset.get_by_symbol(fresh_db, symbol="EUR1").currency == "USD"
+
+
+class TestBulkUpdate:
+    """Test CRUDBase.bulk_update"""
+
+    def test_updates_by_id(self, fresh_db, statement_log):
+        """Test values are applied per id with a single executemany"""
+        asset.bulk_create(fresh_db, objs_in=_assets(5))
+        ids = [a.id for a in fresh_db.query(Asset).order_by(Asset.id)]
+        statement_log.clear()
+
+        asset.bulk_update(fresh_db, values_by_id={
+            ids[0]: {"current_price": Decimal("1.5")},
+            ids[3]: {"current_price": Decimal("4.5")},
+        })
+
+        updates = [(s, many) for s, many in statement_log if s.startswith("UPDATE")]
+        assert len(updates) == 1 and updates[0][1]
+        prices = {a.id: a.current_price for a in fresh_db.query(Asset)}
+        assert prices[ids[0]] == Decimal("1.5")
+        assert prices[ids[3]] == Decimal("4.5")
+        assert prices[ids[1]] is None
+
+    def test_mixed_columns(self, fresh_db):
+        """Test rows updating different columns are all applied"""
+        asset.bulk_create(fresh_db, objs_in=_assets(2))
+        first, second = fresh_db.query(Asset).order_by(Asset.id).all()
+        asset.bulk_update(fresh_db, values_by_id={
+            first.id: {"name": "Renamed"},
+            second.id: {"exchange": "NYSE"},
+        })
+        assert first.name == "Renamed"
+        assert second.exchange == "NYSE"
+
+
+class TestUpsert:
+    """Test CRUDBase.upsert"""
+
+    def test_inserts_then_updates(self, fresh_db):
+        """Test conflicting rows are updated in place and new rows inserted"""
+        asset.upsert(fresh_db, objs_in=_assets(3), index_elements=["symbol"])
+        original_ids = {a.symbol: a.id for a in fresh_db.query(Asset)}
+
+        renamed = [
+            AssetCreate(symbol="SYM1", name="Renamed", asset_type=AssetType.ETF),
+            AssetCreate(symbol="NEW", name="New asset", asset_type=AssetType.STOCK),
+        ]
+        assert asset.upsert(fresh_db, objs_in=renamed, index_elements=["symbol"]) == 2
+
+        rows = {a.symbol: a for a in fresh_db.query(Asset)}
+        assert len(rows) == 4
+        assert rows["SYM1"].id == original_ids["SYM1"]
+        assert rows["SYM1"].name == "Renamed"
+        assert rows["SYM1"].asset_type == AssetType.ETF
+
+    def test_update_fields_limits_columns(self, fresh_db):
+        """Test only the listed columns are overwritten on conflict"""
+        asset.upsert(fresh_db, objs_in=_assets(1), index_elements=["symbol"])
+        asset.upsert(
+            fresh_db,
+            objs_in=[{"symbol": "SYM0", "name": "Ignored", "asset_type": AssetType.STOCK,
+                      "current_price": Decimal("9")}],
+            index_elements=["symbol"],
+            update_fields=["current_price"],
+        )
+        row = asset.get_by_symbol(fresh_db, symbol="SYM0")
+        assert row.name == "Asset 0"
+        assert row.current_price == Decimal("9")
+
+    def test_index_fields_only(self, fresh_db):
+        """Test rows made only of the conflict target are inserted once and otherwise skipped"""
+        p = Portfolio(name="Watching")
+        fresh_db.add(p)
+        fresh_db.commit()
+        asset.upsert(fresh_db, objs_in=_assets(2), index_elements=["symbol"])
+        ids = [a.id for a in fresh_db.query(Asset).order_by(Asset.id)]
+        rows = [{"portfolio_id": p.id, "asset_id": asset_id} for asset_id in ids]
+        keys = ["portfolio_id", "asset_id"]
+
+        assert watchlist.upsert(fresh_db, objs_in=rows[:1], index_elements=keys) == 1
+        assert watchlist.upsert(fresh_db, objs_in=rows, index_elements=keys) == 2
+        assert sorted(w.asset_id for w in fresh_db.query(WatchlistItem)) == ids
+
+    def test_unsupported_dialect(self, fresh_db, monkeypatch):
+        """Test dialects without ON CONFLICT are rejected with ValueError"""
+        monkeypatch.setattr(fresh_db.get_bind().dialect, "name", "mssql")
+        with pytest.raises(ValueError):
+            asset.upsert(fresh_db, objs_in=_assets(1), index_elements=["symbol"])
+
+
+class TestPriceRefreshUsesBulkUpdate:
+    """Test PriceService writes refreshed prices in one batch"""
+
+    def test_single_update_statement(self, fresh_db, hold, statement_log, monkeypatch):
+        """Test a refresh of many assets issues one UPDATE executemany and one commit"""
+        asset.bulk_create(fresh_db, objs_in=_assets(20))
+        hold(*fresh_db.query(Asset))
+        monkeypatch.setattr(
+            PriceService, "get_multiple_prices",
+            staticmethod(lambda symbols: {s: Decimal("12.34") for s in symbols})
+        )
+        statement_log.clear()
+
+        PriceService.update_asset_prices(fresh_db)
+
+        updates = [s for s, _ in statement_log if s.startswith("UPDATE")]
+        assert len(updates) == 1
+        assert {a.current_price for a in fresh_db.query(Asset)} == {Decimal("12.34")}
@@ -0,0 +1,111 @@
+"""
+Unit tests for CRUDBase.update
+"""
+import pytest
+from decimal import Decimal
+from sqlalchemy import event, inspect
+
+from app.crud.asset import asset
+from app.crud.base import column_keys
+from app.models.asset import Asset, AssetType
+from app.schemas.asset import AssetCreate, AssetUpdate
+
+
+@pytest.fixture
+def apple(fresh_db):
+    return asset.create(fresh_db, obj_in=AssetCreate(
+        symbol="AAPL", name="Apple Inc.", asset_type=AssetType.STOCK
+    ))
+
+
+@pytest.fixture
+def statements(fresh_db):
+    """Record every statement sent to the driver"""
+    log = []
+    engine = fresh_db.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        log.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield log
+    event.remove(engine, "before_cursor_execute", record)
+
+
+class TestColumnKeys:
+    """Test cached column metadata"""
+
+    def test_columns_only(self):
+        """Test relationships are excluded and the result is cached"""
+        keys = column_keys(Asset)
+        assert {"symbol", "current_price", "last_updated"} <= keys
+        assert "holdings" not in keys
+        assert column_keys(Asset) is keys
+
+
+class TestUpdate:
+    """Test CRUDBase.update"""
+
+    def test_applies_schema_fields(self, fresh_db, apple):
+        """Test only fields set on the schema are applied"""
+        asset.update(fresh_db, db_obj=apple, obj_in=AssetUpdate(name="Apple"))
+        fresh_db.expire_all()
+        assert apple.name == "Apple"
+        assert apple.symbol == "AAPL"
+
+    def test_ignores_unknown_fields(self, fresh_db, apple):
+        """Test keys that are not columns are ignored"""
+        asset.update(fresh_db, db_obj=apple, obj_in={"holdings": [], "exchange": "NASDAQ"})
+        assert apple.exchange == "NASDAQ"
+
+    def test_unchanged_values_write_nothing(self, fresh_db, apple, statements):
+        """Test an update that changes nothing issues no writes"""
+        fresh_db.refresh(apple)
+        statements.clear()
+        asset.update(fresh_db, db_obj=apple, obj_in={"name": "Apple Inc.", "symbol": "AAPL"})
+        assert [s for s in statements if not s.startswith("SELECT")] == []
+
+    def test_unchanged_update_still_commits(self, fresh_db, apple):
+        """Test work pending in the session is committed even when obj_in changes nothing"""
+        pending = Asset(symbol="MSFT", name="Microsoft", asset_type=AssetType.STOCK)
+        fresh_db.add(pending)
+        asset.update(fresh_db, db_obj=apple, obj_in={"name": "Apple Inc."})
+        fresh_db.rollback()
+        assert fresh_db.query(Asset).filter_by(symbol="MSFT").count() == 1
+
+    def test_only_changed_columns_in_update(self, fresh_db, apple, statements):
+        """Test the UPDATE statement only sets columns whose value changed"""
+        fresh_db.refresh(apple)
+        statements.clear()
+        asset.update(fresh_db, db_obj=apple, obj_in={"name": "Apple Inc.", "exchange": "NYSE"})
+        updates = [s for s in statements if s.startswith("UPDATE")]
+        assert len(updates) == 1
+        assert "exchange" in updates[0] and "name" not in updates[0]
+
+    def test_refresh_false_skips_select(self, fresh_db, apple, statements):
+        """Test no-refresh mode skips the post-commit SELECT and keeps values usable"""
+        fresh_db.refresh(apple)
+        statements.clear()
+        asset.update(
+            fresh_db, db_obj=apple, obj_in={"current_price": Decimal("101.5")}, refresh=False
+        )
+        assert apple.current_price == Decimal("101.5")
+        assert apple.name == "Apple Inc."
+        assert not [s for s in statements if s.startswith("SELECT")]
+
+    def test_refresh_false_is_scoped_to_the_object(self, fresh_db, apple):
+        """Test no-refresh mode leaves the session setting and other objects' expiry alone"""
+        other = asset.create(fresh_db, obj_in=AssetCreate(
+            symbol="MSFT", name="Microsoft", asset_type=AssetType.STOCK
+        ))
+        fresh_db.refresh(apple)
+        asset.update(fresh_db, db_obj=apple, obj_in={"current_price": Decimal("101.5")}, refresh=False)
+        assert fresh_db.expire_on_commit is True
+        assert "name" not in inspect(other).dict
+        assert inspect(apple).dict["current_price"] == Decimal("101.5")
+
+    def test_refresh_true_reloads(self, fresh_db, apple, statements):
+        """Test the default mode re-selects the row after commit"""
+        statements.clear()
+        asset.update(fresh_db, db_obj=apple, obj_in={"current_price": Decimal("99")})
+        assert [s for s in statements if s.startswith("SELECT")]
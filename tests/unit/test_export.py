@@ -0,0 +1,116 @@
+"""
+Unit tests for streaming ledger exports
+"""
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import status
+
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction, TransactionType
+from app.services import export_service
+from app.services.export_service import ExportService
+
+
+@pytest.fixture
+def exported_portfolio(fresh_db):
+    """Portfolio with one holding and a handful of transactions"""
+    portfolio = Portfolio(name="Export Portfolio")
+    apple = Asset(symbol="AAPL", name="Apple Inc.", asset_type=AssetType.STOCK,
+                  current_price=Decimal("190.5"))
+    fresh_db.add_all([portfolio, apple])
+    fresh_db.flush()
+    for i in range(5):
+        fresh_db.add(Transaction(
+            portfolio_id=portfolio.id,
+            asset_id=apple.id,
+            transaction_type=TransactionType.BUY,
+            quantity=Decimal("2"),
+            price=Decimal("150.25"),
+            total_amount=Decimal("300.5"),
+            transaction_date=datetime(2024, 1, 1) + timedelta(days=i),
+            notes="with, comma" if i == 0 else None,
+        ))
+    fresh_db.add(Holding(portfolio_id=portfolio.id, asset_id=apple.id,
+                         quantity=Decimal("10"), average_cost=Decimal("150.25")))
+    fresh_db.commit()
+    return portfolio
+
+
+class TestTransactionExport:
+    """Test the transaction ledger export endpoint"""
+
+    def test_csv_export(self, fresh_client, exported_portfolio):
+        """Test CSV export has a header and one row per transaction, oldest first"""
+        response = fresh_client.get(
+            f"/api/v1/portfolios/{exported_portfolio.id}/transactions/export",
+            params={"format": "csv"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 5
+        assert rows[0]["symbol"] == "AAPL"
+        assert rows[0]["transaction_type"] == "buy"
+        assert rows[0]["notes"] == "with, comma"
+        assert rows[0]["transaction_date"] < rows[-1]["transaction_date"]
+
+    def test_ndjson_export(self, fresh_client, exported_portfolio):
+        """Test NDJSON export emits one JSON object per line"""
+        response = fresh_client.get(
+            f"/api/v1/portfolios/{exported_portfolio.id}/transactions/export",
+            params={"format": "ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 5
+        assert Decimal(lines[0]["price"]) == Decimal("150.25")
+
+    def test_unknown_format_rejected(self, fresh_client, exported_portfolio):
+        """Test unsupported formats are rejected"""
+        response = fresh_client.get(
+            f"/api/v1/portfolios/{exported_portfolio.id}/transactions/export",
+            params={"format": "xlsx"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_missing_portfolio(self, fresh_client):
+        """Test exporting a nonexistent portfolio returns 404"""
+        response = fresh_client.get("/api/v1/portfolios/999/transactions/export")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestHoldingExport:
+    """Test the holdings export endpoint"""
+
+    def test_csv_export(self, fresh_client, exported_portfolio):
+        """Test holdings export includes asset details"""
+        response = fresh_client.get(
+            f"/api/v1/portfolios/{exported_portfolio.id}/holdings/export"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["symbol"] for r in rows] == ["AAPL"]
+        assert rows[0]["asset_type"] == "stock"
+
+
+class TestExportStreaming:
+    """Test the export stream is produced batch by batch"""
+
+    def test_stream_yields_per_batch(self, fresh_db, exported_portfolio, monkeypatch):
+        """Test the header is emitted first and rows arrive in bounded batches"""
+        monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 2)
+        chunks = list(ExportService.stream(
+            fresh_db.get_bind(),
+            ExportService.transactions_statement(exported_portfolio.id),
+            "csv",
+        ))
+        assert chunks[0].startswith("id,transaction_date,symbol")
+        # Header chunk plus ceil(5 / 2) row chunks
+        assert len(chunks) == 4
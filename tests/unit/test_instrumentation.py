@@ -0,0 +1,152 @@
+"""
+Unit tests for per-request SQL instrumentation
+"""
+import logging
+import ibis
+import pytest
+from decimal import Decimal
+from fastapi import status
+
+from app.core.instrumentation import (
+    QueryStats, QueryStatsMiddleware, _current, instrument_ibis, statement_shape
+)
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from main import app
+
+
+def _db_metric(header):
+    name, dur, desc = header.split(", ")[0].split(";")
+    return name, float(dur.split("=")[1]), desc
+
+
+class TestStatementShape:
+    """Statement shapes fold values so repeated lookups compare equal"""
+
+    def test_literals_and_in_lists_fold(self):
+        """Literal values and IN-list lengths do not change the shape"""
+        a = statement_shape("SELECT * FROM assets WHERE id = 1 AND symbol IN (?, ?)")
+        b = statement_shape("SELECT *\n  FROM assets WHERE id = 42 AND symbol IN (?)")
+        assert a == b == "SELECT * FROM assets WHERE id = ? AND symbol IN (?)"
+
+    def test_identifiers_are_kept(self):
+        """Digits inside identifiers such as anon_1 are not folded"""
+        assert "anon_1" in statement_shape("SELECT anon_1.id FROM (SELECT 1) AS anon_1")
+
+
+class TestQueryStats:
+    """Per-request statement accounting"""
+
+    def test_keeps_slowest_and_totals(self):
+        """Count and total time cover every statement, slowest keeps the top N"""
+        stats = QueryStats(keep_slowest=2)
+        for i, duration in enumerate([0.001, 0.005, 0.002, 0.004]):
+            stats.record(f"SELECT {i}", duration)
+        assert stats.count == 4
+        assert stats.total_time == pytest.approx(0.012)
+        assert stats.slowest == [(0.005, "SELECT 1"), (0.004, "SELECT 3")]
+
+    def test_repeated_shapes_over_threshold(self):
+        """Only shapes seen more than the threshold are reported"""
+        stats = QueryStats()
+        for i in range(4):
+            stats.record(f"SELECT * FROM assets WHERE id = {i}", 0.0)
+        stats.record("SELECT * FROM portfolios", 0.0)
+        assert stats.repeated(3) == [("SELECT * FROM assets WHERE id = ?", 4)]
+        assert stats.repeated(4) == []
+
+    def test_server_timing_quotes_statements(self):
+        """Statement descriptions cannot break out of the quoted desc value"""
+        stats = QueryStats(keep_slowest=1)
+        stats.record('SELECT "symbol" FROM assets', 0.0025)
+        header = stats.server_timing(statements=True)
+        assert header.startswith('db;dur=2.50;desc="1 queries", db-slow-1;dur=2.50;')
+        assert 'desc="SELECT \'symbol\' FROM assets"' in header
+
+    def test_server_timing_omits_statements_by_default(self):
+        """Only the DB total and count are published unless statements are asked for"""
+        stats = QueryStats()
+        stats.record("SELECT secret_column FROM assets", 0.0025)
+        assert stats.server_timing() == 'db;dur=2.50;desc="1 queries"'
+
+
+class TestQueryStatsMiddleware:
+    """Requests report their SQL work in the Server-Timing header"""
+
+    def test_server_timing_counts_request_queries(self, fresh_client, fresh_db):
+        """The db metric counts the statements the endpoint issued"""
+        fresh_db.add(Portfolio(name="Timed"))
+        fresh_db.commit()
+        response = fresh_client.get("/api/v1/portfolios/")
+        assert response.status_code == status.HTTP_200_OK
+        name, duration, desc = _db_metric(response.headers["server-timing"])
+        assert name == "db"
+        assert duration >= 0
+        assert desc == 'desc="1 queries"'
+
+    def test_statements_need_debug_or_admin_token(self, fresh_client, fresh_db, monkeypatch):
+        """Outside debug mode statement text is only sent to admin token holders"""
+        monkeypatch.setattr("app.core.instrumentation.settings.debug", False)
+        monkeypatch.setattr("app.core.instrumentation.settings.admin_token", "s3cret")
+        header = fresh_client.get("/api/v1/portfolios/").headers["server-timing"]
+        assert "db-slow" not in header
+        header = fresh_client.get("/api/v1/portfolios/", headers={"X-Admin-Token": "wrong"}).headers["server-timing"]
+        assert "db-slow" not in header
+        header = fresh_client.get("/api/v1/portfolios/", headers={"X-Admin-Token": "s3cret"}).headers["server-timing"]
+        assert "db-slow-1" in header and "portfolios" in header
+
+    def test_no_recording_outside_requests(self, fresh_db):
+        """Statements outside a request are not attributed to anything"""
+        assert _current.get() is None
+        fresh_db.query(Portfolio).all()
+        assert _current.get() is None
+
+    def test_warns_on_repeated_statement(self, fresh_client, fresh_db, caplog, monkeypatch):
+        """A lazy load per row is reported as a possible N+1"""
+        portfolio = Portfolio(name="Lazy")
+        fresh_db.add(portfolio)
+        fresh_db.flush()
+        for i in range(5):
+            a = Asset(symbol=f"N{i}", name=f"N {i}", asset_type=AssetType.STOCK)
+            fresh_db.add(a)
+            fresh_db.flush()
+            fresh_db.add(Holding(
+                portfolio_id=portfolio.id, asset_id=a.id,
+                quantity=Decimal("1"), average_cost=Decimal("1")
+            ))
+        fresh_db.commit()
+        fresh_db.expunge_all()
+
+        # Drop the eager-load policy so every holding lazily loads its asset
+        monkeypatch.setattr("app.api.endpoints.holdings.loading_policy", lambda schema: ())
+        middleware = next(m for m in app.user_middleware if m.cls is QueryStatsMiddleware)
+        monkeypatch.setitem(middleware.kwargs, "repeat_threshold", 3)
+        app.middleware_stack = None
+
+        with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+            response = fresh_client.get("/api/v1/holdings/")
+        app.middleware_stack = None
+        assert response.status_code == status.HTTP_200_OK
+        assert _db_metric(response.headers["server-timing"])[2] == 'desc="6 queries"'
+        warnings = [r.getMessage() for r in caplog.records]
+        assert len(warnings) == 1
+        assert "repeated 5 times in GET /api/v1/holdings/" in warnings[0]
+        assert "FROM assets" in warnings[0]
+
+
+class TestIbisInstrumentation:
+    """ibis statements count towards the active request"""
+
+    def test_ibis_execute_is_recorded(self):
+        """Executing an ibis expression records its compiled SQL"""
+        con = instrument_ibis(ibis.sqlite.connect())
+        con.raw_sql("CREATE TABLE t (x INTEGER)")
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            con.table("t").x.sum().execute()
+        finally:
+            _current.reset(token)
+        assert stats.count >= 1
+        assert any("SUM" in shape.upper() for shape in stats.shapes)
@@ -0,0 +1,271 @@
+"""
+Unit tests for the background job runner and job endpoints
+"""
+import time
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from fastapi import status
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.holding import holding as holding_crud
+from app.crud.job import job
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.job import Job, JobStatus, JobType
+from app.models.portfolio import Portfolio
+from app.models.price_history import PriceHistory
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.job import JobCreate
+from app.services.job_service import JobContext, JobRunner
+from app.services.portfolio_service import PortfolioService
+from app.services.price_service import PriceService
+
+
+@pytest.fixture
+def runner(fresh_db):
+    """Runner sharing fresh_db's in-memory database"""
+    return JobRunner(sessionmaker(bind=fresh_db.get_bind()), workers=1, poll_interval=0.05)
+
+
+@pytest.fixture
+def assets(fresh_db):
+    objs = [
+        Asset(symbol=symbol, name=symbol, asset_type=asset_type)
+        for symbol, asset_type in [("AAA", AssetType.STOCK), ("BAD", AssetType.STOCK),
+                                   ("CCC", AssetType.ETF), ("USD", AssetType.CASH)]
+    ]
+    fresh_db.add_all(objs)
+    fresh_db.commit()
+    return objs
+
+
+def _quote(symbol):
+    return None if symbol == "BAD" else Decimal("42")
+
+
+class TestJobRunner:
+    """Jobs run once, record per-item outcomes and resume after a restart"""
+
+    def test_price_refresh(self, fresh_db, runner, assets, hold, monkeypatch):
+        """Prices are written, failures are listed per symbol and cash is skipped"""
+        hold(*assets)
+        monkeypatch.setattr(PriceService, "get_current_price", staticmethod(_quote))
+        job_id = runner.submit(fresh_db, JobType.PRICE_REFRESH).id
+        assert runner.run_next() == job_id
+        assert runner.run_next() is None
+
+        fresh_db.expire_all()
+        job_obj = job.get(fresh_db, id=job_id)
+        assert job_obj.status == JobStatus.SUCCEEDED
+        assert (job_obj.total_items, job_obj.completed_items, job_obj.failed_items) == (3, 2, 1)
+        assert job_obj.progress == 1.0
+        assert job_obj.errors == [{"item": "BAD", "error": "No price returned"}]
+        assert job_obj.duration_seconds >= 0
+        prices = {a.symbol: a.current_price for a in fresh_db.query(Asset)}
+        assert prices == {"AAA": Decimal("42"), "BAD": None, "CCC": Decimal("42"), "USD": None}
+
+    def test_resumes_stale_job(self, fresh_db, runner, assets, hold, monkeypatch):
+        """A job abandoned mid-run is queued again and skips the items it already recorded"""
+        hold(*assets)
+        fetched = []
+        monkeypatch.setattr(
+            PriceService, "get_current_price", staticmethod(lambda s: fetched.append(s) or Decimal("1"))
+        )
+        abandoned = Job(
+            job_type=JobType.PRICE_REFRESH, status=JobStatus.RUNNING, params={},
+            total_items=3, completed_items=1, attempts=1,
+            started_at=datetime.utcnow(), heartbeat_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        fresh_db.add(abandoned)
+        fresh_db.commit()
+
+        assert runner.run_next() is None
+        assert runner.requeue_stale() == 1
+        assert runner.run_next() == abandoned.id
+        fresh_db.refresh(abandoned)
+        assert fetched == ["BAD", "CCC"]
+        assert abandoned.status == JobStatus.SUCCEEDED
+        assert (abandoned.completed_items, abandoned.attempts) == (3, 2)
+
+    def test_heartbeat_inside_batch(self, fresh_db):
+        """A batch longer than the heartbeat interval commits the heartbeat between its items"""
+        commits = []
+        event.listen(fresh_db, "after_commit", lambda session: commits.append(1))
+        for interval, expected in ((3600, 2), (0, 6)):
+            job_obj = job.create(fresh_db, obj_in=JobCreate(job_type=JobType.PRICE_REFRESH))
+            commits.clear()
+            JobContext(fresh_db, job_obj, heartbeat_interval=interval).each(range(5), lambda i: i, batch_size=50)
+            assert len(commits) == expected
+            assert job_obj.completed_items == 5
+
+    def test_import_resumes_without_duplicates(self, fresh_db, runner, assets, monkeypatch):
+        """A worker dying right after a row's commit leaves that row counted, so the retry skips it"""
+        p = Portfolio(name="Crash")
+        fresh_db.add(p)
+        fresh_db.commit()
+        row = {"portfolio_id": p.id, "asset_id": assets[0].id, "transaction_type": "buy", "quantity": "1",
+               "price": "10", "total_amount": "10", "transaction_date": "2024-01-01T00:00:00"}
+        job_id = runner.submit(fresh_db, JobType.BULK_IMPORT, {"transactions": [row, row, row]}).id
+
+        class Crash(BaseException):
+            pass
+        process = PortfolioService.process_transaction
+
+        def crash_after_second(db, data):
+            result = process(db, data)
+            if db.query(Transaction).count() == 2:
+                raise Crash()
+            return result
+        monkeypatch.setattr(PortfolioService, "process_transaction", staticmethod(crash_after_second))
+        with pytest.raises(Crash):
+            runner.run_next()
+        monkeypatch.setattr(PortfolioService, "process_transaction", staticmethod(process))
+
+        fresh_db.expire_all()
+        job.get(fresh_db, id=job_id).heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        fresh_db.commit()
+        assert runner.requeue_stale() == 1
+        assert runner.run_next() == job_id
+        fresh_db.expire_all()
+        assert fresh_db.query(Transaction).count() == 3
+        assert job.get(fresh_db, id=job_id).completed_items == 3
+
+    def test_import_row_is_atomic(self, fresh_db, runner, assets, monkeypatch):
+        """A failed holding write stores neither the row's transaction nor its progress"""
+        p = Portfolio(name="Atomic")
+        fresh_db.add(p)
+        fresh_db.commit()
+        row = {"portfolio_id": p.id, "asset_id": assets[0].id, "transaction_type": "buy", "quantity": "1",
+               "price": "10", "total_amount": "10", "transaction_date": "2024-01-01T00:00:00"}
+        job_id = runner.submit(fresh_db, JobType.BULK_IMPORT, {"transactions": [row]}).id
+
+        def broken(db, **kwargs):
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(holding_crud, "create", broken)
+        runner.run_next()
+
+        fresh_db.expire_all()
+        job_obj = job.get(fresh_db, id=job_id)
+        assert (job_obj.completed_items, job_obj.failed_items) == (0, 1)
+        assert fresh_db.query(Transaction).count() == 0
+
+    def test_claim_is_exclusive(self, fresh_db, runner):
+        """A queued job is handed to exactly one claimer"""
+        runner.submit(fresh_db, JobType.HOLDINGS_REBUILD)
+        other = sessionmaker(bind=fresh_db.get_bind())()
+        assert job.claim_next(fresh_db) is not None
+        assert job.claim_next(other) is None
+        other.close()
+
+    def test_holdings_rebuild(self, fresh_db, runner, assets):
+        """Holdings are recomputed from the transaction history"""
+        p = Portfolio(name="Rebuild")
+        fresh_db.add(p)
+        fresh_db.flush()
+        for day, kind, quantity, price in [(1, TransactionType.BUY, 10, 10), (2, TransactionType.BUY, 10, 20),
+                                           (3, TransactionType.SELL, 5, 30)]:
+            fresh_db.add(Transaction(
+                portfolio_id=p.id, asset_id=assets[0].id, transaction_type=kind, quantity=Decimal(quantity),
+                price=Decimal(price), total_amount=Decimal(quantity * price), transaction_date=datetime(2024, 1, day)
+            ))
+        fresh_db.add(Holding(portfolio_id=p.id, asset_id=assets[2].id, quantity=Decimal("99"), average_cost=Decimal("1")))
+        fresh_db.commit()
+
+        runner.submit(fresh_db, JobType.HOLDINGS_REBUILD, {"portfolio_ids": [p.id]})
+        runner.run_next()
+        fresh_db.expire_all()
+        holdings = fresh_db.query(Holding).filter(Holding.portfolio_id == p.id).all()
+        assert [(h.asset_id, h.quantity, h.average_cost) for h in holdings] == [
+            (assets[0].id, Decimal("15"), Decimal("15"))
+        ]
+
+    def test_history_backfill(self, fresh_db, runner, assets, monkeypatch):
+        """Daily bars are upserted, so a rerun does not duplicate them"""
+        bars = [{"date": f"2024-01-0{d}", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100}
+                for d in (2, 3)]
+        monkeypatch.setattr(PriceService, "get_historical_data", staticmethod(
+            lambda symbol, period="1y", interval="1d":
+                {"symbol": symbol, "error": "No data"} if symbol == "BAD" else {"symbol": symbol, "data": bars}
+        ))
+        for _ in range(2):
+            runner.submit(fresh_db, JobType.HISTORY_BACKFILL, {"asset_ids": [assets[0].id, assets[1].id]})
+            runner.run_next()
+        rows = fresh_db.query(PriceHistory).order_by(PriceHistory.date).all()
+        assert [(r.asset_id, r.date, r.close) for r in rows] == [
+            (assets[0].id, date(2024, 1, 2), Decimal("1.5")), (assets[0].id, date(2024, 1, 3), Decimal("1.5"))
+        ]
+        assert job.get_recent(fresh_db, limit=1)[0].errors == [{"item": "BAD", "error": "No data"}]
+
+    def test_worker_threads(self, tmp_path, monkeypatch):
+        """Started workers pick up submitted jobs without being called"""
+        # Worker threads need their own connections, which fresh_db's single shared one cannot give
+        engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        asset_obj = Asset(symbol="AAA", name="AAA", asset_type=AssetType.STOCK)
+        db.add(asset_obj)
+        db.commit()
+        monkeypatch.setattr(PriceService, "get_current_price", staticmethod(_quote))
+        runner = JobRunner(session_factory, workers=1, poll_interval=0.05)
+        runner.start()
+        try:
+            job_id = runner.submit(db, JobType.PRICE_REFRESH, {"asset_ids": [asset_obj.id]}).id
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                db.expire_all()
+                if job.get(db, id=job_id).status == JobStatus.SUCCEEDED:
+                    break
+                time.sleep(0.02)
+        finally:
+            runner.stop()
+        try:
+            assert job.get(db, id=job_id).status == JobStatus.SUCCEEDED
+        finally:
+            db.close()
+            engine.dispose()
+
+
+class TestJobEndpoints:
+    """Long operations return a job immediately and are polled at /jobs/{id}"""
+
+    def test_import_transactions(self, fresh_client, fresh_db, runner, assets):
+        """Bulk import reports each row that failed"""
+        p = Portfolio(name="Import")
+        fresh_db.add(p)
+        fresh_db.commit()
+        row = {"portfolio_id": p.id, "asset_id": assets[0].id, "transaction_date": "2024-01-01T00:00:00"}
+        rows = [
+            {**row, "transaction_type": "buy", "quantity": "5", "price": "10", "total_amount": "50"},
+            {**row, "transaction_type": "sell", "quantity": "50", "price": "10", "total_amount": "500"},
+            {**row, "transaction_type": "sell", "quantity": "2", "price": "10", "total_amount": "20"},
+        ]
+        response = fresh_client.post("/api/v1/transactions/import", json=rows)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["status"] == "queued"
+
+        runner.run_next()
+        body = fresh_client.get(f"/api/v1/jobs/{response.json()['id']}").json()
+        assert body["status"] == "succeeded"
+        assert (body["completed_items"], body["failed_items"], body["progress"]) == (2, 1, 1.0)
+        assert body["errors"] == [{"item": 1, "error": "Insufficient holdings to sell"}]
+        fresh_db.expire_all()
+        assert fresh_db.query(Holding).one().quantity == Decimal("3")
+        assert fresh_db.query(Transaction).count() == 2
+
+    def test_update_prices_returns_job(self, fresh_client):
+        """update-prices no longer blocks on the provider"""
+        response = fresh_client.post("/api/v1/assets/update-prices")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["job_type"] == "price_refresh"
+        listed = fresh_client.get("/api/v1/jobs/", params={"job_type": "price_refresh"}).json()
+        assert [j["id"] for j in listed] == [response.json()["id"]]
+
+    def test_missing(self, fresh_client):
+        """Unknown jobs and portfolios 404"""
+        assert fresh_client.get("/api/v1/jobs/999").status_code == status.HTTP_404_NOT_FOUND
+        response = fresh_client.post("/api/v1/portfolios/999/rebuild-holdings")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,107 @@
+"""
+Unit tests for the eager-loading policies used by the read endpoints
+"""
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import status
+from sqlalchemy import event
+
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction, TransactionType
+
+ROWS = 24
+
+
+@pytest.fixture
+def book(fresh_db):
+    """Portfolio holding ROWS distinct assets, with one transaction per asset"""
+    portfolio = Portfolio(name="Eager Portfolio")
+    assets = [
+        Asset(symbol=f"EAG{i}", name=f"Eager {i}", asset_type=AssetType.STOCK)
+        for i in range(ROWS)
+    ]
+    fresh_db.add(portfolio)
+    fresh_db.add_all(assets)
+    fresh_db.flush()
+    start = datetime(2024, 1, 1)
+    for i, a in enumerate(assets):
+        fresh_db.add(Holding(
+            portfolio_id=portfolio.id, asset_id=a.id,
+            quantity=Decimal("1"), average_cost=Decimal("10"),
+        ))
+        fresh_db.add(Transaction(
+            portfolio_id=portfolio.id, asset_id=a.id,
+            transaction_type=TransactionType.BUY, quantity=Decimal("1"),
+            price=Decimal("10"), total_amount=Decimal("10"),
+            transaction_date=start + timedelta(days=i),
+        ))
+    fresh_db.commit()
+    return {"portfolio_id": portfolio.id, "asset_id": assets[0].id}
+
+
+@contextmanager
+def count_selects(db):
+    """Count SELECT statements sent through the session's engine, from a cold identity map"""
+    db.expunge_all()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestLoadingPolicy:
+    """Read endpoints issue a fixed number of queries regardless of page size"""
+
+    @pytest.mark.parametrize("url, filter_key, expected", [
+        ("/api/v1/holdings/", None, 1),
+        ("/api/v1/holdings/", "portfolio_id", 1),
+        ("/api/v1/transactions/", None, 1),
+        ("/api/v1/transactions/", "portfolio_id", 1),
+        ("/api/v1/transactions/", "asset_id", 1),
+    ])
+    def test_list_query_count_independent_of_page_size(
+        self, fresh_client, fresh_db, book, url, filter_key, expected
+    ):
+        """Listing a small and a large page costs the same number of SELECTs"""
+        for limit in (2, ROWS):
+            params = {"limit": limit}
+            if filter_key:
+                params[filter_key] = book[filter_key]
+            with count_selects(fresh_db) as statements:
+                response = fresh_client.get(url, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            rows = response.json()
+            assert len(rows) == (1 if filter_key == "asset_id" else limit)
+            assert all(row["asset"]["symbol"].startswith("EAG") for row in rows)
+            assert len(statements) == expected, statements
+
+    def test_portfolio_with_holdings_query_count(self, fresh_client, fresh_db, book):
+        """A portfolio with all of its holdings and their assets loads in two SELECTs"""
+        with count_selects(fresh_db) as statements:
+            response = fresh_client.get(f"/api/v1/portfolios/{book['portfolio_id']}")
+        assert response.status_code == status.HTTP_200_OK
+        holdings = response.json()["holdings"]
+        assert len(holdings) == ROWS
+        assert all(h["asset"]["symbol"].startswith("EAG") for h in holdings)
+        assert len(statements) == 2, statements
+
+    def test_single_row_reads_use_one_query(self, fresh_client, fresh_db, book):
+        """Reading one holding or transaction fetches its asset in the same SELECT"""
+        for url in ("/api/v1/holdings/1", "/api/v1/transactions/1"):
+            with count_selects(fresh_db) as statements:
+                response = fresh_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["asset"]["symbol"].startswith("EAG")
+            assert len(statements) == 1, statements
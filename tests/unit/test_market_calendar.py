@@ -0,0 +1,101 @@
+"""
+Unit tests for the offline exchange trading calendars
+"""
+import pytest
+from datetime import date, datetime, timezone
+
+from app.models.asset import AssetType
+from app.services import market_holidays
+from app.services.market_calendar import CALENDARS, calendar_for
+
+NYSE = CALENDARS["XNYS"]
+
+
+class TestExchangeCalendar:
+    """Sessions follow local hours, weekends, holidays and early closes"""
+
+    @pytest.mark.parametrize("at, expected", [
+        (datetime(2026, 10, 19, 13, 29), False),  # Monday 09:29 New York
+        (datetime(2026, 10, 19, 13, 30), True),
+        (datetime(2026, 10, 19, 19, 59), True),
+        (datetime(2026, 10, 19, 20, 0), False),  # 16:00 close
+        (datetime(2026, 10, 17, 15, 0), False),  # Saturday
+        (datetime(2026, 11, 26, 15, 0), False),  # Thanksgiving
+        (datetime(2026, 11, 27, 17, 30), True),  # early close at 13:00 EST = 18:00 UTC
+        (datetime(2026, 11, 27, 18, 0), False),
+        (datetime(2026, 3, 9, 13, 30), True),  # first Monday of daylight saving time
+    ])
+    def test_nyse_hours(self, at, expected):
+        """Regular hours in local time, so the UTC open moves with daylight saving"""
+        assert NYSE.is_open(at) is expected
+
+    def test_aware_times(self):
+        """Aware datetimes are converted to UTC first"""
+        assert NYSE.is_open(datetime(2026, 10, 19, 14, 0, tzinfo=timezone.utc))
+
+    def test_previous_close(self):
+        """The latest close skips weekends and holidays"""
+        assert NYSE.previous_close(datetime(2026, 10, 19, 12, 0)) == datetime(2026, 10, 16, 20, 0)
+        assert NYSE.previous_close(datetime(2026, 10, 19, 20, 0)) == datetime(2026, 10, 19, 20, 0)
+        # Monday after Good Friday: the last session closed on Thursday
+        assert NYSE.previous_close(datetime(2026, 4, 6, 12, 0)) == datetime(2026, 4, 2, 20, 0)
+
+    def test_closed_session_date(self):
+        """The trading date a closing price belongs to, in exchange-local terms"""
+        assert NYSE.closed_session_date(datetime(2026, 10, 19, 17, 0)) is None  # open
+        assert NYSE.closed_session_date(datetime(2026, 10, 20, 2, 0)) == date(2026, 10, 19)
+        assert NYSE.closed_session_date(datetime(2026, 10, 20, 12, 0)) == date(2026, 10, 19)  # before the open
+        assert NYSE.closed_session_date(datetime(2026, 11, 26, 15, 0)) == date(2026, 11, 25)  # Thanksgiving
+        assert CALENDARS["24/7"].closed_session_date(datetime(2026, 10, 19, 17, 0)) is None
+
+    def test_london(self):
+        """London closes on bank holidays and at 12:30 on Christmas Eve"""
+        london = CALENDARS["XLON"]
+        assert not london.is_open(datetime(2026, 8, 31, 10, 0))
+        assert london.session(date(2026, 12, 24)) == (datetime(2026, 12, 24, 8, 0), datetime(2026, 12, 24, 12, 30))
+
+    def test_overnight_futures(self):
+        """CME sessions open the evening before their trading date and break for an hour"""
+        cme = CALENDARS["CMES"]
+        assert cme.is_open(datetime(2026, 10, 18, 23, 0))  # Sunday 18:00 Chicago
+        assert not cme.is_open(datetime(2026, 10, 19, 21, 30))  # daily break
+        assert not cme.is_open(datetime(2026, 10, 17, 12, 0))  # Saturday
+
+    def test_crypto_never_closes(self):
+        """Crypto trades around the clock and has no close"""
+        crypto = calendar_for(None, AssetType.CRYPTO)
+        assert crypto.is_open(datetime(2026, 12, 25, 3, 0))
+        assert crypto.previous_close(datetime(2026, 12, 25, 3, 0)) is None
+
+    def test_holiday_tables_are_weekdays(self):
+        """Every bundled closure falls on a weekday inside the bundled years"""
+        tables = [market_holidays.US_EQUITY_HOLIDAYS, market_holidays.LONDON_HOLIDAYS,
+                  market_holidays.XETRA_HOLIDAYS, market_holidays.TORONTO_HOLIDAYS,
+                  market_holidays.US_EQUITY_EARLY_CLOSES, market_holidays.LONDON_EARLY_CLOSES]
+        for table in tables:
+            for day in table:
+                assert day.weekday() < 5 and day.year in market_holidays.HOLIDAY_YEARS, day
+
+
+class TestCalendarFor:
+    """Assets map to calendars by exchange, falling back by asset type"""
+
+    @pytest.mark.parametrize("exchange, asset_type, code", [
+        ("NASDAQ", AssetType.STOCK, "XNYS"),
+        ("nms", AssetType.ETF, "XNYS"),
+        ("LSE", AssetType.STOCK, "XLON"),
+        ("GER", AssetType.STOCK, "XETR"),
+        ("TOR", AssetType.STOCK, "XTSE"),
+        ("NYM", AssetType.COMMODITY, "CMES"),
+        (None, AssetType.COMMODITY, "CMES"),
+        ("LSE", AssetType.CRYPTO, "24/7"),
+        (None, AssetType.BOND, "XNYS"),
+        ("UNKNOWN", AssetType.STOCK, "XNYS"),
+    ])
+    def test_lookup(self, exchange, asset_type, code):
+        """Known exchange names and yfinance codes resolve; unknown ones use the default calendar"""
+        assert calendar_for(exchange, asset_type).code == code
+
+    def test_cash(self):
+        """Cash has no market"""
+        assert calendar_for(None, AssetType.CASH) is None
@@ -0,0 +1,144 @@
+"""
+Unit tests for the metrics registry and the /metrics endpoint
+"""
+import json
+import re
+import pytest
+from fastapi import status
+
+from app.core.metrics import (
+    MetricsRegistry, price_provider_calls, provider_call, render_snapshots, route_template
+)
+
+
+def _sample(text, name, **labels):
+    """Value of one sample line in a text exposition, or None"""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = rf"^{re.escape(name)}(?:\{{{re.escape(wanted)}\}})? (\S+)$" if wanted else rf"^{re.escape(name)} (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class TestRegistry:
+    """Counters, gauges and histograms render in the Prometheus text format"""
+
+    def test_counter_and_gauge(self):
+        """Counters accumulate per label set; gauges keep the last value"""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("route",))
+        pool = registry.gauge("pool", "Pool usage", ("state",))
+        requests.inc(route="/a")
+        requests.inc(2, route="/a")
+        requests.inc(route="/b")
+        pool.set(3, state="checkedout")
+        pool.set(1, state="checkedout")
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert _sample(text, "requests_total", route="/a") == 3
+        assert _sample(text, "requests_total", route="/b") == 1
+        assert _sample(text, "pool", state="checkedout") == 1
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket counts include every observation at or below the bound"""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, route="/a")
+        text = registry.render()
+        assert _sample(text, "latency_seconds_bucket", route="/a", le="0.1") == 2
+        assert _sample(text, "latency_seconds_bucket", route="/a", le="1") == 3
+        assert _sample(text, "latency_seconds_bucket", route="/a", le="+Inf") == 4
+        assert _sample(text, "latency_seconds_count", route="/a") == 4
+        assert _sample(text, "latency_seconds_sum", route="/a") == pytest.approx(3.65)
+
+    def test_label_mismatch_rejected(self):
+        """Observations must supply exactly the declared labels"""
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "C", ("route",))
+        with pytest.raises(ValueError):
+            counter.inc(path="/a")
+
+    def test_label_values_escaped(self):
+        """Quotes and backslashes in label values are escaped"""
+        registry = MetricsRegistry()
+        registry.counter("c_total", "C", ("route",)).inc(route='a"b\\c')
+        assert 'c_total{route="a\\"b\\\\c"} 1' in registry.render()
+
+
+class TestMultiprocess:
+    """Snapshots from several workers merge into one exposition"""
+
+    def test_snapshots_are_summed(self, tmp_path):
+        """Counters and histograms from every snapshot file are added together"""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs", ("kind",)).inc(2, kind="price")
+        registry.histogram("d_seconds", "D", buckets=(1.0,)).observe(0.5)
+
+        other = MetricsRegistry()
+        other.counter("jobs_total", "Jobs", ("kind",)).inc(3, kind="price")
+        other.histogram("d_seconds", "D", buckets=(1.0,)).observe(2.0)
+        (tmp_path / "metrics_99999999.json").write_text(json.dumps(other.snapshot()))
+
+        text = registry.render_multiprocess(str(tmp_path))
+        assert _sample(text, "jobs_total", kind="price") == 5
+        assert _sample(text, "d_seconds_bucket", le="1") == 1
+        assert _sample(text, "d_seconds_count") == 2
+        assert len(list(tmp_path.glob("metrics_*.json"))) == 2
+
+    def test_shutdown_snapshot_drops_gauges(self, tmp_path):
+        """A worker's final snapshot keeps its counters but not its gauges"""
+        registry = MetricsRegistry()
+        registry.counter("c_total", "C").inc()
+        registry.gauge("g", "G").set(7)
+        registry.write_snapshot(str(tmp_path), include_gauges=False)
+        text = render_snapshots([json.loads(p.read_text()) for p in tmp_path.glob("metrics_*.json")])
+        assert _sample(text, "c_total") == 1
+        assert "# TYPE g gauge" not in text
+
+
+class TestInstrumentation:
+    """Application metrics are recorded by the middleware and services"""
+
+    def test_route_template(self):
+        """Included routers keep their prefix; unmatched paths collapse to one label"""
+        class Route:
+            path = "/lookup/{symbol}"
+
+        scope = {"path": "/api/v1/assets/lookup/AAPL", "route": Route()}
+        assert route_template(scope) == "/api/v1/assets/lookup/{symbol}"
+        assert route_template({"path": "/whatever"}) == "unmatched"
+
+    def test_provider_call_counts_errors(self):
+        """Exceptions inside provider_call are counted as errors and re-raised"""
+        def count(outcome):
+            return price_provider_calls.samples().get(("test", outcome), 0)
+
+        ok, error = count("ok"), count("error")
+        with provider_call("test"):
+            pass
+        with pytest.raises(RuntimeError):
+            with provider_call("test"):
+                raise RuntimeError("provider down")
+        assert count("ok") == ok + 1
+        assert count("error") == error + 1
+
+    def test_metrics_endpoint_reports_routes(self, fresh_client):
+        """Requests appear under their route template with status and latency"""
+        before = _sample(
+            fresh_client.get("/metrics").text, "http_requests_total",
+            method="GET", route="/api/v1/holdings/{holding_id}", status=404
+        ) or 0
+        assert fresh_client.get("/api/v1/holdings/12345").status_code == status.HTTP_404_NOT_FOUND
+        response = fresh_client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert _sample(
+            text, "http_requests_total",
+            method="GET", route="/api/v1/holdings/{holding_id}", status=404
+        ) == before + 1
+        assert _sample(
+            text, "http_request_duration_seconds_count",
+            method="GET", route="/api/v1/holdings/{holding_id}"
+        ) >= 1
+        assert "# TYPE db_pool_connections gauge" in text
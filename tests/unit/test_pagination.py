@@ -0,0 +1,158 @@
+"""
+Unit tests for keyset pagination of holdings and transactions
+"""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import status
+
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.crud.transaction import transaction
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction, TransactionType
+
+
+@pytest.fixture
+def ledger(fresh_db):
+    """Portfolio with 25 transactions (several sharing a timestamp) and 7 holdings"""
+    portfolio = Portfolio(name="Paged Portfolio")
+    assets = [
+        Asset(symbol=f"SYM{i}", name=f"Asset {i}", asset_type=AssetType.STOCK)
+        for i in range(7)
+    ]
+    fresh_db.add(portfolio)
+    fresh_db.add_all(assets)
+    fresh_db.flush()
+
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    for i in range(25):
+        fresh_db.add(Transaction(
+            portfolio_id=portfolio.id,
+            asset_id=assets[i % 7].id,
+            transaction_type=TransactionType.BUY,
+            quantity=Decimal("1"),
+            price=Decimal("10"),
+            total_amount=Decimal("10"),
+            # Groups of three share a timestamp so the id tie-breaker matters
+            transaction_date=start + timedelta(days=i // 3),
+        ))
+    for a in assets:
+        fresh_db.add(Holding(
+            portfolio_id=portfolio.id,
+            asset_id=a.id,
+            quantity=Decimal("1"),
+            average_cost=Decimal("10"),
+        ))
+    fresh_db.commit()
+    return portfolio
+
+
+def _collect_pages(client, url, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page) <= limit
+        ids.extend(row["id"] for row in page)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages
+
+
+class TestCursorEncoding:
+    """Test opaque cursor round-tripping"""
+
+    def test_round_trip(self):
+        """Test datetimes and ids survive encoding"""
+        when = datetime(2024, 3, 1, 9, 30)
+        assert decode_cursor(encode_cursor([when, 42])) == [when.isoformat(), 42]
+
+    def test_invalid_cursor(self):
+        """Test garbage cursors are rejected"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor!")
+
+
+class TestTransactionPagination:
+    """Test keyset pagination of transaction listings"""
+
+    def test_pages_cover_portfolio_once_in_order(self, fresh_client, fresh_db, ledger):
+        """Test walking all pages yields every transaction exactly once, newest first"""
+        ids, pages = _collect_pages(
+            fresh_client, f"/api/v1/transactions/?portfolio_id={ledger.id}", limit=4
+        )
+        expected = [
+            t.id for t in transaction.get_by_portfolio(fresh_db, portfolio_id=ledger.id)
+        ]
+        assert ids == expected
+        assert len(ids) == 25
+        assert pages == 7
+
+    def test_unfiltered_listing_is_paged(self, fresh_client, ledger):
+        """Test the unfiltered listing honours limit and cursor"""
+        ids, _ = _collect_pages(fresh_client, "/api/v1/transactions/", limit=10)
+        assert len(ids) == len(set(ids)) == 25
+
+    def test_asset_filter_is_paged(self, fresh_client, ledger):
+        """Test the asset filter honours limit"""
+        response = fresh_client.get("/api/v1/transactions/", params={"asset_id": 1, "limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+        assert "X-Next-Cursor" in response.headers
+
+    def test_limit_is_capped(self, fresh_client, ledger):
+        """Test requests above the page cap are rejected"""
+        response = fresh_client.get("/api/v1/transactions/", params={"limit": 100000})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_invalid_cursor_returns_400(self, fresh_client, ledger):
+        """Test a malformed cursor is a client error"""
+        response = fresh_client.get("/api/v1/transactions/", params={"cursor": "bogus"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_deprecated_skip(self, fresh_client, ledger):
+        """Test skip still offsets the listing for clients written before cursors"""
+        url = f"/api/v1/transactions/?portfolio_id={ledger.id}"
+        everything = [row["id"] for row in fresh_client.get(url, params={"limit": 25}).json()]
+        response = fresh_client.get(url, params={"skip": 5, "limit": 4})
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["id"] for row in response.json()] == everything[5:9]
+
+    def test_cursor_header_exposed_to_browsers(self, fresh_client, ledger):
+        """Test cross-origin responses let scripts read X-Next-Cursor"""
+        response = fresh_client.get(
+            "/api/v1/transactions/", params={"limit": 2}, headers={"Origin": "http://localhost:3000"}
+        )
+        assert "X-Next-Cursor" in response.headers
+        assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+
+
+class TestHoldingPagination:
+    """Test keyset pagination of holding listings"""
+
+    def test_portfolio_holdings_pages(self, fresh_client, ledger):
+        """Test walking holdings of a portfolio page by page"""
+        ids, pages = _collect_pages(
+            fresh_client, f"/api/v1/holdings/?portfolio_id={ledger.id}", limit=3
+        )
+        assert ids == sorted(ids)
+        assert len(ids) == 7
+        assert pages == 3
+
+    def test_all_holdings_pages(self, fresh_client, ledger):
+        """Test walking all holdings page by page"""
+        ids, _ = _collect_pages(fresh_client, "/api/v1/holdings/", limit=5)
+        assert len(ids) == 7
+
+    def test_deprecated_skip(self, fresh_client, ledger):
+        """Test skip still offsets holdings for clients written before cursors"""
+        response = fresh_client.get("/api/v1/holdings/", params={"portfolio_id": ledger.id, "skip": 5})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
@@ -0,0 +1,169 @@
+"""
+Unit tests for the standalone price worker
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.crud.job import job
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.job import Job, JobStatus, JobType
+from app.models.portfolio import Portfolio
+from app.models.price_history import PriceHistory
+from app.services.job_service import PRICE_JOB_TYPES, JobRunner, api_job_types, schedule_price_refresh
+from app.services.price_service import PriceService
+from app.workers.price_worker import build_runner, drain
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class TestPriceWorker:
+    """The worker takes only price jobs and writes quotes in bulk"""
+
+    def test_drains_only_price_jobs(self, fresh_db, hold, monkeypatch):
+        """Price jobs run; other job types stay queued for the API's runner"""
+        monkeypatch.setattr(PriceService, "get_current_price", staticmethod(lambda s: Decimal("7")))
+        a = Asset(symbol="WRK", name="Worker", asset_type=AssetType.STOCK)
+        fresh_db.add(a)
+        fresh_db.commit()
+        hold(a)
+        api = JobRunner(sessionmaker(bind=fresh_db.get_bind()))
+        refresh = api.submit(fresh_db, JobType.PRICE_REFRESH)
+        rebuild = api.submit(fresh_db, JobType.HOLDINGS_REBUILD)
+
+        assert drain(build_runner(sessionmaker(bind=fresh_db.get_bind()))) == 1
+        fresh_db.expire_all()
+        assert job.get(fresh_db, id=refresh.id).status == JobStatus.SUCCEEDED
+        assert job.get(fresh_db, id=rebuild.id).status == JobStatus.QUEUED
+        assert fresh_db.get(Asset, a.id).current_price == Decimal("7")
+
+    def test_store_quotes_writes_session_close(self, fresh_db):
+        """Only quotes taken after the close become a bar, dated by the exchange's trading date"""
+        a = Asset(symbol="UPS", name="Upsert", asset_type=AssetType.STOCK, exchange="NYSE")
+        coin = Asset(symbol="COIN", name="Coin", asset_type=AssetType.CRYPTO)
+        fresh_db.add_all([a, coin])
+        fresh_db.commit()
+        monday = date(2026, 10, 19)
+        fresh_db.add(PriceHistory(asset_id=a.id, date=monday, open=Decimal("1"), close=Decimal("1")))
+        fresh_db.commit()
+
+        def bars():
+            fresh_db.expire_all()
+            rows = fresh_db.query(PriceHistory).order_by(PriceHistory.date)
+            return [(b.asset_id, b.date, b.open, b.close) for b in rows]
+
+        # Intraday quotes move the current price but leave the bar alone
+        PriceService.store_quotes(
+            fresh_db, {a.id: Decimal("2"), coin.id: Decimal("5")}, now=datetime(2026, 10, 19, 17, 0)
+        )
+        assert bars() == [(a.id, monday, Decimal("1"), Decimal("1"))]
+        assert fresh_db.get(Asset, a.id).current_price == Decimal("2")
+        # 22:00 New York is already Tuesday in UTC; the close still belongs to Monday
+        PriceService.store_quotes(
+            fresh_db, {a.id: Decimal("3"), coin.id: Decimal("6")}, now=datetime(2026, 10, 20, 2, 0)
+        )
+        assert bars() == [(a.id, monday, Decimal("1"), Decimal("3"))]
+        # Over the weekend the close is Friday's
+        PriceService.store_quotes(fresh_db, {a.id: Decimal("4")}, now=datetime(2026, 10, 24, 15, 0))
+        assert bars()[-1][1:] == (date(2026, 10, 23), None, Decimal("4"))
+
+    def test_schedule_price_refresh(self, fresh_db, hold):
+        """A refresh is queued only when prices are due and none is pending"""
+        runner = JobRunner(sessionmaker(bind=fresh_db.get_bind()))
+        assert schedule_price_refresh(runner, fresh_db) is None
+        a = Asset(symbol="SCH", name="Scheduled", asset_type=AssetType.CRYPTO)
+        fresh_db.add(a)
+        fresh_db.commit()
+        hold(a)
+
+        queued = schedule_price_refresh(runner, fresh_db)
+        assert queued is not None and queued.job_type == JobType.PRICE_REFRESH
+        assert schedule_price_refresh(runner, fresh_db) is None
+        assert fresh_db.query(Job).count() == 1
+
+    def test_api_runner_can_leave_price_jobs(self, monkeypatch):
+        """With price_jobs_in_api off the API's runner skips price job types"""
+        assert set(PRICE_JOB_TYPES) <= set(api_job_types())
+        monkeypatch.setattr(settings, "price_jobs_in_api", False)
+        assert api_job_types() == [JobType.BULK_IMPORT, JobType.HOLDINGS_REBUILD]
+
+
+class TestPriceWorkerProcess:
+    """The entry point runs as its own process against the shared database"""
+
+    def _env(self, tmp_path):
+        return {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'worker.db'}"}
+
+    def _queue(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add(Job(job_type=JobType.PRICE_REFRESH, status=JobStatus.QUEUED, params={}))
+        db.commit()
+        return engine, db
+
+    def test_once(self, tmp_path):
+        """--once drains the queue and exits"""
+        engine, db = self._queue(tmp_path)
+        out = subprocess.run(
+            [sys.executable, "-m", "app.workers.price_worker", "--once"],
+            cwd=ROOT, env=self._env(tmp_path), capture_output=True, text=True, check=True, timeout=60
+        ).stdout
+        assert "Ran 1 price jobs" in out
+        assert db.query(Job).one().status == JobStatus.SUCCEEDED
+        db.close()
+        engine.dispose()
+
+    def test_once_plans_a_refresh(self, tmp_path):
+        """With a refresh interval, --once queues a planned refresh for held assets and runs it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        p, a = Portfolio(name="Worker"), Asset(symbol="BTC-USD", name="Bitcoin", asset_type=AssetType.CRYPTO)
+        db.add_all([p, a])
+        db.flush()
+        db.add(Holding(portfolio_id=p.id, asset_id=a.id, quantity=Decimal("1"), average_cost=Decimal("1")))
+        db.commit()
+        env = {**self._env(tmp_path), "PRICE_PROVIDER": "synthetic", "PRICE_PROVIDER_CHAIN": "synthetic"}
+        out = subprocess.run(
+            [sys.executable, "-m", "app.workers.price_worker", "--once", "--refresh-interval", "60"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True, timeout=60
+        ).stdout
+        assert "Ran 1 price jobs" in out
+        assert db.query(Job).one().status == JobStatus.SUCCEEDED
+        assert db.get(Asset, a.id).current_price is not None
+        db.close()
+        engine.dispose()
+
+    def test_runs_until_terminated(self, tmp_path):
+        """The long-running worker picks up queued jobs and stops cleanly on SIGTERM"""
+        engine, db = self._queue(tmp_path)
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "app.workers.price_worker", "--poll-interval", "0.05"],
+            cwd=ROOT, env=self._env(tmp_path), stdout=subprocess.PIPE, text=True
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                db.expire_all()
+                if db.query(Job).one().status == JobStatus.SUCCEEDED:
+                    break
+                time.sleep(0.05)
+            proc.send_signal(signal.SIGTERM)
+            assert proc.wait(timeout=10) == 0
+        finally:
+            proc.kill()
+        assert db.query(Job).one().status == JobStatus.SUCCEEDED
+        db.close()
+        engine.dispose()
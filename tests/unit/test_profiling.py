@@ -0,0 +1,98 @@
+"""
+Unit tests for on-demand request profiling
+"""
+import time
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware
+
+TOKEN = "profile-secret"
+
+
+def busy_endpoint():
+    deadline = time.perf_counter() + 0.1
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return {"total": total}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path), max_files=3)
+
+
+def _profiled_app(store, sample_rate=0.0):
+    app = FastAPI()
+    app.get("/busy")(busy_endpoint)
+    app.add_middleware(
+        ProfilingMiddleware, admin_token=TOKEN, sample_rate=sample_rate, interval=0.002, store=store
+    )
+    return app
+
+
+class TestProfilingMiddleware:
+    """Selected requests are sampled and stored in collapsed-stack format"""
+
+    def test_admin_header_profiles_request(self, store):
+        """The profile id is returned and its stacks include the endpoint"""
+        client = TestClient(_profiled_app(store))
+        response = client.get("/busy", headers={"X-Profile": TOKEN})
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response.headers["x-profile-id"]
+        body = store.read(profile_id)
+        assert body
+        lines = body.splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("busy_endpoint (" in line for line in lines)
+
+    def test_unprofiled_requests_untouched(self, store):
+        """No header, a wrong token or a zero sampling rate leaves the request alone"""
+        client = TestClient(_profiled_app(store))
+        assert "x-profile-id" not in client.get("/busy").headers
+        assert "x-profile-id" not in client.get("/busy", headers={"X-Profile": "wrong"}).headers
+        assert store.list() == []
+
+    def test_sampling_rate(self, store):
+        """A sampling rate of 1 profiles every request without the header"""
+        client = TestClient(_profiled_app(store, sample_rate=1.0))
+        assert "x-profile-id" in client.get("/busy").headers
+
+    def test_store_prunes_oldest(self, store):
+        """Only the newest max_files profiles are kept"""
+        for i in range(5):
+            store.save(f"p{i}", "main 1\n")
+            time.sleep(0.01)
+        assert [p["id"] for p in store.list()] == ["p4", "p3", "p2"]
+        assert store.read("../p4") is None
+
+
+class TestAdminProfileEndpoints:
+    """Stored profiles are listed and served to admins only"""
+
+    def test_requires_token(self, client, monkeypatch):
+        """Admin endpoints are hidden without a configured token and reject bad tokens"""
+        monkeypatch.setattr(settings, "admin_token", None)
+        assert client.get("/api/v1/admin/profiles").status_code == status.HTTP_404_NOT_FOUND
+        monkeypatch.setattr(settings, "admin_token", TOKEN)
+        response = client.get("/api/v1/admin/profiles", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_list_and_read(self, client, store, monkeypatch):
+        """Profiles are listed newest first and returned as plain text"""
+        monkeypatch.setattr(settings, "admin_token", TOKEN)
+        monkeypatch.setattr("app.api.endpoints.admin.profile_store", store)
+        store.save("20240101T000000_GET_busy_abcd", "main;busy 3\n")
+        headers = {"X-Admin-Token": TOKEN}
+
+        listing = client.get("/api/v1/admin/profiles", headers=headers).json()
+        assert [p["id"] for p in listing] == ["20240101T000000_GET_busy_abcd"]
+
+        response = client.get(f"/api/v1/admin/profiles/{listing[0]['id']}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == "main;busy 3\n"
+        missing = client.get("/api/v1/admin/profiles/nope", headers=headers)
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,251 @@
+"""
+Unit tests for the provider fallback chain, against local stand-in providers
+"""
+import json
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import price_provider_attempts, price_provider_hedges
+from app.providers import (
+    AlphaVantageProvider, CircuitBreaker, ProviderChain, ProviderUnavailable, SyntheticProvider, set_provider
+)
+from app.providers.factory import chain_names
+from app.services.price_service import PriceService
+
+END = date(2024, 6, 28)
+
+
+class StandIn(SyntheticProvider):
+    """Synthetic prices with a settable delay, failure and set of unknown symbols"""
+
+    def __init__(self, name, delay=0.0, fail=False, unknown=()):
+        super().__init__(seed=len(name), end=END)
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.unknown = set(unknown)
+        self.calls = 0
+
+    def _serve(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+
+    def quote(self, symbol):
+        self._serve()
+        return None if symbol in self.unknown else super().quote(symbol)
+
+    def quotes(self, symbols):
+        self._serve()
+        return {s: None if s in self.unknown else self._last_close(s) for s in symbols}
+
+    def history(self, symbol, period="1y", interval="1d"):
+        self._serve()
+        return super().history(symbol, period, interval)
+
+
+class Looped(StandIn):
+    """A provider without a batch request, like yfinance: quotes() is one quote() per symbol"""
+
+    batch_quotes = False
+
+    def quotes(self, symbols):
+        return {s: self.quote(s) for s in symbols}
+
+
+def _attempts(provider, outcome, operation="quote"):
+    return price_provider_attempts.samples().get((provider, operation, outcome), 0)
+
+
+class TestFallback:
+    """Errors and missing data fall through to the next provider"""
+
+    def test_error_falls_through(self):
+        """A failing primary is answered by the secondary and counted as an error"""
+        primary, secondary = StandIn("p1", fail=True), StandIn("s1")
+        chain = ProviderChain([primary, secondary])
+        before = _attempts("p1", "error")
+        assert chain.quote("SPY") == secondary.quote("SPY")
+        assert _attempts("p1", "error") - before == 1
+
+    def test_missing_symbol_falls_through(self):
+        """A symbol the primary does not know is priced by the secondary"""
+        primary, secondary = StandIn("p2", unknown={"ODD"}), StandIn("s2")
+        chain = ProviderChain([primary, secondary])
+        assert chain.quote("ODD") == secondary.quote("ODD")
+        assert chain.quote("SPY") == primary.quote("SPY")
+        assert ProviderChain([StandIn("p2b", unknown={"ODD"})]).quote("ODD") is None
+
+    def test_batch_fills_gaps(self):
+        """quotes() asks the secondary only for the symbols the primary lacked"""
+        primary, secondary = StandIn("p3", unknown={"B"}), StandIn("s3")
+        prices = ProviderChain([primary, secondary]).quotes(["A", "B", "C"])
+        assert prices == {"A": primary.quote("A"), "B": secondary.quote("B"), "C": primary.quote("C")}
+        assert secondary.calls == 2
+
+
+class TestDeadlinesAndHedging:
+    """Slow providers are hedged and nothing waits past the deadline"""
+
+    def test_hedges_past_p95(self):
+        """Once the primary's p95 is known, a slow call is raced against the secondary"""
+        primary, secondary = StandIn("p4"), StandIn("s4")
+        chain = ProviderChain([primary, secondary], deadline=5.0, hedge_min_samples=5, hedge_min_delay=0.02)
+        for _ in range(5):
+            chain.quote("SPY")
+        primary.delay = 1.0
+
+        before = price_provider_hedges.samples().get(("s4",), 0)
+        start = time.perf_counter()
+        assert chain.quote("SPY") == secondary.quote("SPY")
+        assert time.perf_counter() - start < 0.5
+        assert price_provider_hedges.samples().get(("s4",), 0) - before == 1
+
+    def test_deadline_bounds_tail(self):
+        """Hanging providers cost one deadline, and PriceService reports no price"""
+        chain = ProviderChain([StandIn("p5", delay=2.0), StandIn("s5", delay=2.0)], deadline=0.2)
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            chain.quote("SPY")
+        assert time.perf_counter() - start < 0.5
+
+        previous = set_provider(chain)
+        try:
+            start = time.perf_counter()
+            assert PriceService.get_current_price("SPY") is None
+            assert "error" in PriceService.get_historical_data("SPY", "5d")
+            assert time.perf_counter() - start < 1.0
+        finally:
+            set_provider(previous)
+
+    def test_deadline_per_symbol(self):
+        """Providers that loop over quote() get a deadline per symbol, not one for the whole batch"""
+        looped = Looped("p9", delay=0.05)
+        symbols = [f"S{i}" for i in range(10)]
+        prices = ProviderChain([looped], deadline=0.2).quotes(symbols)
+        assert prices == {s: looped.quote(s) for s in symbols}
+        assert None not in prices.values()
+
+
+class TestCircuitBreaker:
+    """Failing providers are skipped until a trial call succeeds"""
+
+    def test_breaker_states(self):
+        """Closed -> open after the threshold -> one half-open trial -> closed"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_after=10, clock=lambda: now[0])
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+        now[0] = 10
+        assert breaker.allow() and not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    def test_open_circuit_skips_provider(self):
+        """After the threshold the failing primary is not called until its reset time"""
+        now = [0.0]
+        primary, secondary = StandIn("p6", fail=True), StandIn("s6")
+        chain = ProviderChain([primary, secondary], failure_threshold=3, reset_after=30, clock=lambda: now[0])
+        for _ in range(5):
+            chain.quote("SPY")
+        assert primary.calls == 3
+        assert chain.status()[0]["circuit"] == "open"
+
+        primary.fail = False
+        now[0] = 30
+        assert chain.quote("SPY") == primary.quote("SPY")
+        assert chain.status()[0]["circuit"] == "closed"
+
+    def test_all_open(self):
+        """With every circuit open the chain fails fast"""
+        chain = ProviderChain([StandIn("p7", fail=True)], failure_threshold=1, reset_after=60)
+        with pytest.raises(ConnectionError):
+            chain.quote("SPY")
+        with pytest.raises(ProviderUnavailable):
+            chain.quote("SPY")
+
+
+class _AlphaVantageStandIn(BaseHTTPRequestHandler):
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        symbol = params.get("symbol")
+        if symbol == "LIMIT":
+            body = {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+        elif symbol == "NOPE":
+            body = {"Error Message": "Invalid API call."}
+        elif params["function"] == "GLOBAL_QUOTE":
+            body = {"Global Quote": {"01. symbol": symbol, "05. price": "101.2500"}}
+        elif params["function"] == "OVERVIEW":
+            body = {"Symbol": symbol, "AssetType": "ETF", "Name": "Stand-in ETF", "Exchange": "NYSE", "Currency": "USD"}
+        else:
+            body = {"Time Series (Daily)": {
+                f"2024-06-{d}": {"1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": str(d), "5. volume": "10"}
+                for d in range(20, 29)
+            }}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAlphaVantageProvider:
+    """The fallback provider parses Alpha Vantage responses served locally"""
+
+    @pytest.fixture
+    def alpha_vantage(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _AlphaVantageStandIn)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield AlphaVantageProvider("demo", base_url=f"http://127.0.0.1:{server.server_port}/query", timeout=5)
+        server.shutdown()
+        server.server_close()
+
+    def test_responses(self, alpha_vantage):
+        """Quote, overview and daily series map onto the provider interface"""
+        assert alpha_vantage.quote("SPY") == Decimal("101.2500")
+        info = alpha_vantage.info("SPY")
+        assert (info["name"], info["asset_type"].value, info["exchange"]) == ("Stand-in ETF", "etf", "NYSE")
+        bars = alpha_vantage.history("SPY", "5d")
+        assert [b["date"] for b in bars] == [f"2024-06-{d}" for d in range(24, 29)]
+        assert bars[-1]["close"] == 28.0
+
+    def test_errors(self, alpha_vantage):
+        """Throttling counts against the circuit; unknown symbols do not"""
+        with pytest.raises(RuntimeError):
+            alpha_vantage.quote("LIMIT")
+        with pytest.raises(LookupError):
+            alpha_vantage.quote("NOPE")
+
+    def test_behind_failing_primary(self, alpha_vantage):
+        """With yfinance down, quotes come from Alpha Vantage"""
+        chain = ProviderChain([StandIn("p8", fail=True), alpha_vantage])
+        assert chain.quote("SPY") == Decimal("101.2500")
+
+
+class TestChainConfiguration:
+    """Alpha Vantage joins the chain when its key is configured"""
+
+    def test_default_order(self, monkeypatch):
+        """price_provider first, then alpha_vantage; an explicit chain wins"""
+        monkeypatch.setattr(settings, "price_provider", "yfinance")
+        monkeypatch.setattr(settings, "price_provider_chain", None)
+        monkeypatch.setattr(settings, "alpha_vantage_api_key", None)
+        assert chain_names() == ["yfinance"]
+        monkeypatch.setattr(settings, "alpha_vantage_api_key", "key")
+        assert chain_names() == ["yfinance", "alpha_vantage"]
+        monkeypatch.setattr(settings, "price_provider_chain", "replay, synthetic")
+        assert chain_names() == ["replay", "synthetic"]
@@ -0,0 +1,151 @@
+"""
+Unit tests for the pluggable price providers
+"""
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from app.models.asset import Asset, AssetType
+from app.models.job import JobType
+from app.models.price_history import PriceHistory
+from app.providers import (
+    PriceProvider, ReplayProvider, SyntheticProvider, YFinanceProvider, build_provider, record, set_provider
+)
+from app.services.job_service import JobRunner
+from app.services.price_service import PriceService
+
+END = date(2024, 6, 28)
+
+
+class TestSyntheticProvider:
+    """Seeded random walks: any symbol, same bars every time"""
+
+    def test_protocol(self):
+        """All three implementations satisfy PriceProvider"""
+        for provider in (YFinanceProvider(), SyntheticProvider(), ReplayProvider.__new__(ReplayProvider)):
+            assert isinstance(provider, PriceProvider)
+
+    def test_deterministic(self):
+        """Paths depend only on seed and symbol; shorter periods are suffixes of longer ones"""
+        a, b = SyntheticProvider(seed=1, end=END), SyntheticProvider(seed=1, end=END)
+        year = a.history("SPY", "1y")
+        assert year == b.history("SPY", "1y")
+        assert year != SyntheticProvider(seed=2, end=END).history("SPY", "1y")
+        assert a.history("SPY", "5d") == year[-5:] == a.history("SPY", "5y")[-5:]
+        assert a.quote("SPY") == Decimal(str(year[-1]["close"]))
+        assert all(bar["low"] <= min(bar["open"], bar["close"]) <= max(bar["open"], bar["close"]) <= bar["high"]
+                   for bar in year)
+
+    def test_batch_pays_latency_once(self):
+        """quotes() sleeps the injected latency once per batch, not once per symbol"""
+        provider = SyntheticProvider(end=END, latency_ms=20)
+        start = time.perf_counter()
+        prices = provider.quotes([f"S{i}" for i in range(20)])
+        assert time.perf_counter() - start < 0.2
+        assert len(prices) == 20 and all(p > 0 for p in prices.values())
+
+    def test_daily_only(self):
+        """Intraday intervals are rejected rather than faked"""
+        with pytest.raises(ValueError):
+            SyntheticProvider(end=END).history("SPY", "5d", "1m")
+
+
+class TestReplayProvider:
+    """Recordings replay offline with the periods measured from their last bar"""
+
+    def test_json_round_trip(self, tmp_path):
+        """Quotes, info and history recorded from a provider replay unchanged"""
+        source = SyntheticProvider(seed=3, end=END)
+        path = record(source, ["AAA", "BBB"], tmp_path / "rec.json", period="1y")
+        replay = ReplayProvider(path)
+
+        assert replay.symbols == ["AAA", "BBB"]
+        assert replay.quotes(["AAA", "ZZZ"]) == {"AAA": source.quote("AAA"), "ZZZ": None}
+        assert replay.info("BBB") == source.info("BBB")
+        assert replay.history("AAA", "3mo") == source.history("AAA", "3mo")
+        assert replay.history("ZZZ") == []
+        with pytest.raises(LookupError):
+            replay.info("ZZZ")
+        with pytest.raises(ValueError):
+            replay.history("AAA", "1y", "1wk")
+
+    def test_parquet(self, tmp_path):
+        """Parquet recordings hold bars only; the quote is the last close"""
+        pytest.importorskip("pyarrow")
+        source = SyntheticProvider(seed=3, end=END)
+        replay = ReplayProvider(record(source, ["AAA"], tmp_path / "rec.parquet", period="6mo"))
+        assert replay.history("AAA", "6mo") == source.history("AAA", "6mo")
+        assert replay.quote("AAA") == source.quote("AAA")
+
+    def test_injected_latency(self, tmp_path):
+        """Each call sleeps the configured latency"""
+        path = record(SyntheticProvider(end=END), ["AAA"], tmp_path / "rec.json", period="5d")
+        replay = ReplayProvider(path, latency_ms=30)
+        start = time.perf_counter()
+        replay.quote("AAA")
+        replay.history("AAA", "5d")
+        assert time.perf_counter() - start >= 0.06
+
+
+class TestPriceServiceProviders:
+    """PriceService and the jobs built on it run against any provider"""
+
+    def test_build_from_settings(self, monkeypatch):
+        """Unknown names and a replay provider without a file are configuration errors"""
+        assert isinstance(build_provider("synthetic"), SyntheticProvider)
+        with pytest.raises(ValueError):
+            build_provider("nope")
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "price_replay_path", None)
+        with pytest.raises(ValueError):
+            build_provider("replay")
+
+    def test_historical_endpoint_offline(self, client, synthetic_provider):
+        """The historical route computes its statistics from provider bars"""
+        response = client.get("/api/v1/assets/SPY/historical", params={"period": "1mo"})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        bars = synthetic_provider.history("SPY", "1mo")
+        assert (body["name"], body["exchange"], body["data_points"]) == ("Synthetic SPY", "SYN", len(bars))
+        assert body["current_price"] == bars[-1]["close"]
+
+    def test_failures_become_fallbacks(self):
+        """Provider exceptions keep PriceService's None / fallback results"""
+        class Down(SyntheticProvider):
+            def quote(self, symbol):
+                raise ConnectionError("down")
+
+            def info(self, symbol):
+                raise ConnectionError("down")
+
+        previous = set_provider(Down())
+        try:
+            assert PriceService.get_current_price("SPY") is None
+            assert PriceService.get_asset_info("spy")["name"] == "SPY"
+            history = PriceService.get_historical_data("SPY", "5d")
+            assert history["data_points"] == 5 and history["name"] == "SPY"
+        finally:
+            set_provider(previous)
+
+    def test_refresh_and_backfill_jobs(self, fresh_db, hold, synthetic_provider):
+        """Refresh and backfill write provider prices without patching PriceService"""
+        assets = [Asset(symbol=s, name=s, asset_type=AssetType.STOCK) for s in ("AAA", "BBB")]
+        fresh_db.add_all(assets)
+        fresh_db.commit()
+        hold(*assets)
+        runner = JobRunner(sessionmaker(bind=fresh_db.get_bind()))
+        runner.submit(fresh_db, JobType.PRICE_REFRESH)
+        runner.submit(fresh_db, JobType.HISTORY_BACKFILL, {"period": "1mo"})
+        while runner.run_next() is not None:
+            pass
+
+        fresh_db.expire_all()
+        prices = {a.symbol: a.current_price for a in fresh_db.query(Asset)}
+        assert prices == {s: synthetic_provider.quote(s) for s in ("AAA", "BBB")}
+        # A refresh after the close also stores that session's bar; the backfill wrote the month up to END
+        backfilled = fresh_db.query(PriceHistory).filter(PriceHistory.date <= END).count()
+        assert backfilled == 2 * len(synthetic_provider.history("AAA", "1mo"))
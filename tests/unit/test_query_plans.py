@@ -0,0 +1,201 @@
+"""
+Query-plan regression tests: every hot CRUD and analytics lookup must be
+answered from an index, never by a full table scan.
+"""
+import re
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.crud.asset import asset
+from app.crud.holding import holding
+from app.crud.transaction import transaction
+from app.crud.watchlist import watchlist
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction, TransactionType
+from app.services import analytics_service
+from app.services.export_service import ExportService
+
+# Any SCAN of a base table (including "SCAN x USING INDEX", which walks a whole
+# index) fails; hot lookups must SEARCH. Virtual tables and subqueries are exempt.
+FULL_SCAN = re.compile(r"^SCAN (?!.*\b(VIRTUAL TABLE|CONSTANT ROW)\b)(?!\(subquery)")
+
+
+# Subqueries the planner evaluates into a temporary result show up as
+# "MATERIALIZE x" / "CO-ROUTINE x"; a later "SCAN x" reads that result, not a table.
+SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+
+
+def full_scans(plan_rows):
+    details = [detail for *_, detail in plan_rows]
+    subqueries = {m.group(1) for m in map(SUBQUERY.match, details) if m}
+    return [
+        detail for detail in details
+        if FULL_SCAN.match(detail) and detail.split()[1] not in subqueries
+    ]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """File-backed database shared by the SQLAlchemy session and ibis"""
+    path = tmp_path / "plans.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    portfolio = Portfolio(name="Plan Portfolio")
+    assets = [
+        Asset(symbol=f"SYM{i}", name=f"Asset {i}", asset_type=AssetType.STOCK,
+              current_price=Decimal("10") + i)
+        for i in range(5)
+    ]
+    session.add(portfolio)
+    session.add_all(assets)
+    session.flush()
+    for i, a in enumerate(assets):
+        session.add(Holding(portfolio_id=portfolio.id, asset_id=a.id,
+                            quantity=Decimal("3"), average_cost=Decimal("9")))
+        session.add(Transaction(
+            portfolio_id=portfolio.id, asset_id=a.id,
+            transaction_type=TransactionType.BUY, quantity=Decimal("3"),
+            price=Decimal("9"), total_amount=Decimal("27"),
+            transaction_date=datetime(2024, 1, 1) + timedelta(days=i),
+        ))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def traced_db(db_path):
+    """Session whose SELECT statements are captured together with their parameters"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    session = sessionmaker(bind=engine)()
+    session.captured = captured
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def explain(session, statement, parameters):
+    raw = session.connection().connection.dbapi_connection
+    return raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+
+
+CRUD_LOOKUPS = {
+    "asset.get": lambda db: asset.get(db, id=1),
+    "asset.get_by_symbol": lambda db: asset.get_by_symbol(db, symbol="SYM1"),
+    "asset.search_by_name_or_symbol": lambda db: asset.search_by_name_or_symbol(db, query="sym"),
+    "holding.get_by_portfolio": lambda db: holding.get_by_portfolio(db, portfolio_id=1, limit=2),
+    "holding.get_by_portfolio+cursor": lambda db: holding.get_by_portfolio(
+        db, portfolio_id=1, cursor=holding.cursor_for(holding.get(db, id=2)), limit=2
+    ),
+    "holding.get_by_portfolio_and_asset": lambda db: holding.get_by_portfolio_and_asset(
+        db, portfolio_id=1, asset_id=2
+    ),
+    "holding.get_multi_after+cursor": lambda db: holding.get_multi_after(
+        db, cursor=holding.cursor_for(holding.get(db, id=2)), limit=2
+    ),
+    "transaction.get_by_portfolio": lambda db: transaction.get_by_portfolio(
+        db, portfolio_id=1, limit=2
+    ),
+    "transaction.get_by_portfolio+cursor": lambda db: transaction.get_by_portfolio(
+        db, portfolio_id=1, cursor=transaction.cursor_for(transaction.get(db, id=3)), limit=2
+    ),
+    "transaction.get_by_asset+cursor": lambda db: transaction.get_by_asset(
+        db, asset_id=1, cursor=transaction.cursor_for(transaction.get(db, id=1)), limit=2
+    ),
+    "transaction.get_multi_after+cursor": lambda db: transaction.get_multi_after(
+        db, cursor=transaction.cursor_for(transaction.get(db, id=3)), limit=2
+    ),
+    "watchlist.get_by_portfolio": lambda db: watchlist.get_by_portfolio(db, portfolio_id=1),
+    "watchlist.get_by_portfolio_and_asset": lambda db: watchlist.get_by_portfolio_and_asset(
+        db, portfolio_id=1, asset_id=2
+    ),
+    "export.transactions": lambda db: db.execute(ExportService.transactions_statement(1)).all(),
+    "export.holdings": lambda db: db.execute(ExportService.holdings_statement(1)).all(),
+}
+
+
+class TestCrudQueryPlans:
+    """Test CRUD lookups are served by indexes"""
+
+    @pytest.mark.parametrize("name", sorted(CRUD_LOOKUPS))
+    def test_no_full_table_scan(self, traced_db, name):
+        """Test the statements issued by a CRUD lookup avoid full scans"""
+        CRUD_LOOKUPS[name](traced_db)
+        assert traced_db.captured, f"{name} issued no SELECT"
+        for statement, parameters in traced_db.captured:
+            scans = full_scans(explain(traced_db, statement, parameters))
+            assert not scans, f"{name} full-scans {scans}:\n{statement}"
+
+
+class TestAnalyticsQueryPlans:
+    """Test the ibis analytics queries are served by indexes"""
+
+    @pytest.mark.parametrize("method", [
+        "get_portfolio_value_analysis",
+        "get_portfolio_diversification_analysis",
+        "get_portfolio_performance_metrics",
+        "get_asset_allocation_analysis",
+    ])
+    def test_no_full_table_scan(self, db_path, monkeypatch, method):
+        """Test the SQL ibis compiles for an analytics call avoids full scans"""
+        monkeypatch.setattr(analytics_service, "get_db_url", lambda: f"sqlite:///{db_path}")
+        service = analytics_service.AnalyticsService()
+        raw = service.con.con
+        statements = []
+        raw.set_trace_callback(statements.append)
+        getattr(service, method)(1)
+        raw.set_trace_callback(None)
+
+        queries = [
+            s for s in statements
+            if s.lstrip().upper().startswith("SELECT") and "PRAGMA_TABLE_INFO" not in s
+        ]
+        assert queries, f"{method} issued no SELECT"
+        for statement in queries:
+            scans = full_scans(raw.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall())
+            assert not scans, f"{method} full-scans {scans}:\n{statement}"
+
+
+class TestPlanDetection:
+    """Test the full-scan detector itself"""
+
+    def test_detects_table_scan(self):
+        assert full_scans([(2, 0, 0, "SCAN holdings")]) == ["SCAN holdings"]
+
+    def test_detects_full_index_walk(self):
+        detail = "SCAN transactions USING INDEX ix_transactions_date_id"
+        assert full_scans([(3, 0, 0, detail)]) == [detail]
+
+    def test_ignores_index_search(self):
+        rows = [
+            (2, 0, 0, "SEARCH holdings USING INDEX uq_holdings_portfolio_asset (portfolio_id=?)"),
+            (4, 0, 0, "SEARCH assets USING INTEGER PRIMARY KEY (rowid=?)"),
+            (5, 0, 0, "SCAN main.PRAGMA_TABLE_INFO VIRTUAL TABLE INDEX 0:"),
+        ]
+        assert full_scans(rows) == []
+
+    def test_ignores_materialized_subquery(self):
+        rows = [
+            (2, 0, 0, "MATERIALIZE ranked"),
+            (9, 2, 0, "SEARCH assets USING INDEX ix_assets_symbol (symbol=?)"),
+            (40, 0, 0, "SCAN ranked"),
+        ]
+        assert full_scans(rows) == []
@@ -0,0 +1,195 @@
+"""
+Unit tests for the adaptive, priority-queued provider rate limiter
+"""
+import threading
+import time
+import urllib.error
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.metrics import price_provider_attempts, price_provider_queue_seconds
+from app.models.asset import Asset, AssetType
+from app.models.job import JobType
+from app.providers import (
+    AdaptiveRateLimiter, Priority, ProviderChain, ProviderThrottled, SyntheticProvider, priority, set_provider
+)
+from app.providers.ratelimit import current_priority, is_throttle
+from app.services.job_service import JobRunner
+
+END = date(2024, 6, 28)
+
+
+def _queued(name, level):
+    sample = price_provider_queue_seconds.samples().get((name, level))
+    return 0 if sample is None else sum(sample[:-1])
+
+
+class Throttling(SyntheticProvider):
+    """Answers 429 to the first `throttle` calls, then serves synthetic prices"""
+
+    rate_limited = True
+
+    def __init__(self, name, throttle=0):
+        super().__init__(seed=1, end=END)
+        self.name = name
+        self.throttle = throttle
+        self.calls = 0
+
+    def quote(self, symbol):
+        self.calls += 1
+        if self.calls <= self.throttle:
+            raise urllib.error.HTTPError("https://upstream", 429, "Too Many Requests", {}, None)
+        return super().quote(symbol)
+
+
+class TestTokenBucket:
+    """Tokens refill at the current rate and are handed out by priority"""
+
+    def test_rate(self):
+        """After the burst, tokens arrive at the configured rate"""
+        limiter = AdaptiveRateLimiter("bucket", rate=50, burst=1)
+        start = time.perf_counter()
+        for _ in range(11):
+            assert limiter.acquire()
+        assert 0.15 < time.perf_counter() - start < 0.5
+
+    def test_timeout(self):
+        """A caller that cannot get a token in time gives up"""
+        limiter = AdaptiveRateLimiter("bucket", rate=1, burst=1)
+        assert limiter.acquire(timeout=0.05)
+        assert not limiter.acquire(timeout=0.05)
+
+    def test_interactive_first(self):
+        """A user-facing call that arrives after queued background calls is served before them"""
+        limiter = AdaptiveRateLimiter("prio", rate=20, burst=1)
+        limiter.acquire()
+        order = []
+
+        def take(level, label):
+            limiter.acquire(level)
+            order.append(label)
+
+        threads = [threading.Thread(target=take, args=(Priority.BACKGROUND, f"bg{i}")) for i in range(4)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.005)
+        interactive = threading.Thread(target=take, args=(Priority.INTERACTIVE, "user"))
+        interactive.start()
+        for thread in [*threads, interactive]:
+            thread.join()
+        assert order.index("user") <= 1
+        assert [label for label in order if label != "user"] == ["bg0", "bg1", "bg2", "bg3"]
+
+    def test_priority_context(self):
+        """The priority block applies to calls made inside it and is restored after"""
+        assert current_priority() == Priority.INTERACTIVE
+        with priority(Priority.BACKGROUND):
+            assert current_priority() == Priority.BACKGROUND
+        assert current_priority() == Priority.INTERACTIVE
+
+
+class TestAdaptation:
+    """429s and slow answers lower the rate; saturation raises it"""
+
+    def test_aimd(self):
+        """Halve on throttling and hold; trim on slow calls; grow only while callers wait on tokens"""
+        now = [0.0]
+        limiter = AdaptiveRateLimiter("aimd", rate=10, burst=0, max_rate=12, latency_target=1.0,
+                                      cooldown=5, clock=lambda: now[0])
+        limiter.on_success(0.1)
+        assert limiter.rate == pytest.approx(10.1)
+
+        limiter.on_throttled()
+        assert limiter.rate == pytest.approx(5.05)
+        limiter.on_success(0.1)
+        assert limiter.rate == pytest.approx(5.05)
+        now[0] = 5
+        limiter.tokens = 0
+        limiter.on_success(0.1)
+        assert limiter.rate > 5.05
+
+        rate = limiter.rate
+        limiter.on_success(3.0)
+        assert limiter.rate == pytest.approx(rate * 0.9)
+
+    def test_idle_does_not_grow(self):
+        """With tokens to spare the rate stays put"""
+        limiter = AdaptiveRateLimiter("idle", rate=5, burst=10)
+        limiter.on_success(0.1)
+        assert limiter.rate == 5
+
+    def test_bounds(self):
+        """The rate never leaves [min_rate, max_rate]"""
+        limiter = AdaptiveRateLimiter("bounds", rate=1, min_rate=0.5)
+        for _ in range(5):
+            limiter.on_throttled()
+        assert limiter.rate == 0.5
+
+    def test_throttle_detection(self):
+        """HTTP 429s, rate-limit exception types and notices count as throttling"""
+        class YFRateLimitError(Exception):
+            pass
+
+        assert is_throttle(urllib.error.HTTPError("u", 429, "Too Many Requests", {}, None))
+        assert is_throttle(YFRateLimitError("Rate limited. Try after a while."))
+        assert is_throttle(ProviderThrottled("standard API rate limit is 25 requests per day"))
+        assert not is_throttle(ConnectionError("reset by peer"))
+
+
+class TestChainLimiting:
+    """The chain takes a token per call and feeds the outcome back to the limiter"""
+
+    def test_429_slows_down(self):
+        """Throttled answers halve the provider's rate and fall through to the next provider"""
+        primary, secondary = Throttling("t1", throttle=2), Throttling("t1b")
+        chain = ProviderChain(
+            [primary, secondary],
+            limiter_factory=lambda p: AdaptiveRateLimiter(p.name, rate=100, burst=10) if p is primary else None
+        )
+        before = price_provider_attempts.samples().get(("t1", "quote", "throttled"), 0)
+        assert chain.quote("SPY") == secondary.quote("SPY")
+        assert chain.quote("SPY") == secondary.quote("SPY")
+        assert chain.quote("SPY") == primary.quote("SPY")
+        assert price_provider_attempts.samples().get(("t1", "quote", "throttled"), 0) - before == 2
+        assert chain.status()[0]["rate_limit_per_second"] == 25
+
+    def test_queue_wait_spares_the_circuit(self):
+        """Calls that never got a token time out without counting against the provider"""
+        provider = Throttling("t2")
+        chain = ProviderChain(
+            [provider], deadline=0.1, failure_threshold=1,
+            limiter_factory=lambda p: AdaptiveRateLimiter(p.name, rate=0.5, min_rate=0.5, burst=1)
+        )
+        chain.quote("SPY")
+        with pytest.raises(TimeoutError):
+            chain.quote("SPY")
+        assert chain.status()[0]["circuit"] == "closed"
+        assert provider.calls == 1
+
+    def test_token_per_symbol(self):
+        """A batch of quotes takes one token per upstream request, not one for the batch"""
+        provider = Throttling("t4")
+        chain = ProviderChain([provider], limiter_factory=lambda p: AdaptiveRateLimiter(p.name, rate=1000))
+        prices = chain.quotes(["A", "B", "C", "D", "E"])
+        assert None not in prices.values()
+        assert (provider.calls, _queued("t4", "interactive")) == (5, 5)
+
+    def test_jobs_queue_as_background(self, fresh_db, hold):
+        """Refresh jobs take their tokens at background priority"""
+        provider = Throttling("t3")
+        chain = ProviderChain([provider], limiter_factory=lambda p: AdaptiveRateLimiter(p.name, rate=1000))
+        a = Asset(symbol="BGP", name="Background", asset_type=AssetType.STOCK)
+        fresh_db.add(a)
+        fresh_db.commit()
+        hold(a)
+        previous = set_provider(chain)
+        try:
+            runner = JobRunner(sessionmaker(bind=fresh_db.get_bind()))
+            runner.submit(fresh_db, JobType.PRICE_REFRESH)
+            runner.run_next()
+            chain.quote("SPY")
+        finally:
+            set_provider(previous)
+        assert (_queued("t3", "background"), _queued("t3", "interactive")) == (1, 1)
@@ -0,0 +1,155 @@
+"""
+Unit tests for the staleness-based refresh planner and portfolio watchlists
+"""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.job import job
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.job import JobType
+from app.models.watchlist import WatchlistItem
+from app.services.job_service import JobRunner
+from app.services.price_service import PriceService
+from app.services.refresh_planner import RefreshPlanner
+
+NOW = datetime(2024, 6, 28, 15, 0)
+BUDGETS = {"crypto": 300, "stock": 900, "bond": 21600, "default": 900}
+
+
+@pytest.fixture
+def universe(fresh_db, hold):
+    """Held, watched and unfollowed assets with varied price ages"""
+    ages = {
+        "BTC": (AssetType.CRYPTO, 600), "SPY": (AssetType.ETF, 600), "AAPL": (AssetType.STOCK, 1200),
+        "TBOND": (AssetType.BOND, 3600), "OLDBOND": (AssetType.BOND, 30000), "NEW": (AssetType.STOCK, None),
+        "USD": (AssetType.CASH, None), "SOLD": (AssetType.STOCK, 5000), "WATCH": (AssetType.CRYPTO, 900),
+        "IGNORED": (AssetType.STOCK, None),
+    }
+    assets = {
+        symbol: Asset(symbol=symbol, name=symbol, asset_type=asset_type,
+                      last_updated=None if age is None else NOW - timedelta(seconds=age))
+        for symbol, (asset_type, age) in ages.items()
+    }
+    fresh_db.add_all(assets.values())
+    fresh_db.commit()
+    portfolio = hold(*[a for s, a in assets.items() if s not in ("SOLD", "WATCH", "IGNORED")])
+    fresh_db.add(Holding(portfolio_id=portfolio.id, asset_id=assets["SOLD"].id,
+                         quantity=Decimal("0"), average_cost=Decimal("1")))
+    fresh_db.add(WatchlistItem(portfolio_id=portfolio.id, asset_id=assets["WATCH"].id))
+    fresh_db.commit()
+    return assets
+
+
+class TestRefreshPlanner:
+    """Only followed assets past their type's staleness budget are planned"""
+
+    def test_plan(self, fresh_db, universe):
+        """Held and watched assets are chosen by per-type budget, never-priced first, then stalest"""
+        planned = [a.symbol for a in RefreshPlanner.plan(fresh_db, now=NOW, budgets=BUDGETS)]
+        assert planned == ["NEW", "OLDBOND", "AAPL", "WATCH", "BTC"]
+
+    def test_budget_fallback(self):
+        """Types without their own budget use the default entry"""
+        assert RefreshPlanner.budget(AssetType.ETF, BUDGETS) == timedelta(seconds=900)
+        assert RefreshPlanner.budget(AssetType.ETF, {}) == timedelta(seconds=900)
+        assert RefreshPlanner.budget(AssetType.CRYPTO, BUDGETS) < RefreshPlanner.budget(AssetType.BOND, BUDGETS)
+
+    def test_update_prices_fetches_only_the_plan(self, fresh_db, universe, monkeypatch):
+        """A refresh without ids requests only stale followed assets, and a second one finds nothing to do"""
+        requested = []
+
+        def quotes(symbols):
+            requested.append(sorted(symbols))
+            return {s: Decimal("5") for s in symbols}
+        monkeypatch.setattr(PriceService, "get_multiple_prices", staticmethod(quotes))
+
+        assert PriceService.update_asset_prices(fresh_db) == 7
+        assert PriceService.update_asset_prices(fresh_db) == 0
+        assert requested == [["AAPL", "BTC", "NEW", "OLDBOND", "SPY", "TBOND", "WATCH"]]
+        fresh_db.expire_all()
+        assert fresh_db.query(Asset).filter_by(symbol="IGNORED").one().current_price is None
+
+    def test_job_keeps_its_plan(self, fresh_db, universe, monkeypatch):
+        """The refresh job stores the planned ids so a resumed run walks the same list"""
+        monkeypatch.setattr(PriceService, "get_current_price", staticmethod(lambda s: Decimal("5")))
+        planned = [a.id for a in RefreshPlanner.plan(fresh_db)]
+        runner = JobRunner(sessionmaker(bind=fresh_db.get_bind()))
+        job_id = runner.submit(fresh_db, JobType.PRICE_REFRESH, {"asset_ids": None}).id
+        runner.run_next()
+
+        fresh_db.expire_all()
+        job_obj = job.get(fresh_db, id=job_id)
+        assert job_obj.params["planned_asset_ids"] == planned
+        assert (job_obj.total_items, job_obj.completed_items) == (7, 7)
+
+
+class TestWatchlistEndpoints:
+    """Portfolios watch assets they do not hold"""
+
+    def test_watchlist(self, fresh_client, fresh_db, sample_portfolio_data):
+        """Assets can be watched once, listed and unwatched"""
+        portfolio_id = fresh_client.post("/api/v1/portfolios/", json=sample_portfolio_data).json()["id"]
+        watched = Asset(symbol="WTCH", name="Watched", asset_type=AssetType.STOCK)
+        fresh_db.add(watched)
+        fresh_db.commit()
+        asset_id = watched.id
+        url = f"/api/v1/portfolios/{portfolio_id}/watchlist"
+
+        first = fresh_client.post(url, json={"asset_id": asset_id})
+        assert first.status_code == status.HTTP_200_OK
+        assert fresh_client.post(url, json={"asset_id": asset_id}).json()["id"] == first.json()["id"]
+        listed = fresh_client.get(url).json()
+        assert [item["asset"]["symbol"] for item in listed] == ["WTCH"]
+        assert [a.id for a in RefreshPlanner.plan(fresh_db)] == [asset_id]
+
+        assert fresh_client.delete(f"{url}/{asset_id}").status_code == status.HTTP_200_OK
+        assert fresh_client.get(url).json() == []
+        assert fresh_client.delete(f"{url}/{asset_id}").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_missing_portfolio_or_asset(self, fresh_client, sample_portfolio_data):
+        """Watching needs an existing portfolio and asset"""
+        portfolio_id = fresh_client.post("/api/v1/portfolios/", json=sample_portfolio_data).json()["id"]
+        assert fresh_client.get("/api/v1/portfolios/999/watchlist").status_code == status.HTTP_404_NOT_FOUND
+        response = fresh_client.post(f"/api/v1/portfolios/{portfolio_id}/watchlist", json={"asset_id": 999})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestMarketHours:
+    """Closed markets get one refresh after their close; open markets go first"""
+
+    SATURDAY = datetime(2026, 10, 17, 15, 0)
+
+    @pytest.fixture
+    def weekend(self, fresh_db, hold):
+        friday = datetime(2026, 10, 16)
+        rows = [
+            ("PRECLOSE", AssetType.STOCK, "NYSE", friday.replace(hour=19, minute=45)),
+            ("POSTCLOSE", AssetType.STOCK, "NYSE", friday.replace(hour=20, minute=10)),
+            ("LONDON", AssetType.STOCK, "LSE", None),
+            ("ETH", AssetType.CRYPTO, None, self.SATURDAY - timedelta(hours=1)),
+        ]
+        assets = [Asset(symbol=s, name=s, asset_type=t, exchange=e, last_updated=u) for s, t, e, u in rows]
+        fresh_db.add_all(assets)
+        fresh_db.commit()
+        hold(*assets)
+        return assets
+
+    def test_weekend(self, fresh_db, weekend):
+        """Crypto keeps refreshing; equities priced after Friday's close wait for Monday"""
+        planned = RefreshPlanner.plan(fresh_db, now=self.SATURDAY, budgets=BUDGETS, market_hours=True)
+        assert [a.symbol for a in planned] == ["ETH", "LONDON", "PRECLOSE"]
+
+    def test_disabled(self, fresh_db, weekend):
+        """Without market hours every stale asset is planned"""
+        planned = RefreshPlanner.plan(fresh_db, now=self.SATURDAY, budgets=BUDGETS, market_hours=False)
+        assert [a.symbol for a in planned] == ["LONDON", "PRECLOSE", "POSTCLOSE", "ETH"]
+
+    def test_open_market_first(self, fresh_db, weekend):
+        """While New York trades, its stale assets come before London's final refresh"""
+        monday = datetime(2026, 10, 19, 17, 0)
+        planned = RefreshPlanner.plan(fresh_db, now=monday, budgets=BUDGETS, market_hours=True)
+        assert [a.symbol for a in planned] == ["PRECLOSE", "POSTCLOSE", "ETH", "LONDON"]
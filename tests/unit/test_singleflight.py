@@ -0,0 +1,133 @@
+"""
+Unit tests for single-flight coalescing of upstream lookups
+"""
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from fastapi import status
+
+from app.core.metrics import price_provider_coalesced
+from app.core.singleflight import SingleFlight
+from app.services.price_service import PriceService, history_flight
+from main import app
+
+
+def _coalesced(operation):
+    return price_provider_coalesced.samples().get((operation,), 0)
+
+
+class TestSingleFlight:
+    """Concurrent calls with one key run the function once and share its outcome"""
+
+    def test_threads_share_one_call(self):
+        """Twenty threads asking for the same key see one call and the same result"""
+        flight = SingleFlight("test")
+        calls, results = [], []
+        release = threading.Event()
+
+        def fetch(key):
+            calls.append(key)
+            release.wait(5)
+            return {"key": key}
+
+        before = _coalesced("test")
+        leader = threading.Thread(target=lambda: results.append(flight.do("SPY", fetch, "SPY")))
+        leader.start()
+        while not calls:
+            time.sleep(0.001)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("SPY", fetch, "SPY")))
+                     for _ in range(19)]
+        for thread in followers:
+            thread.start()
+        while _coalesced("test") - before < 19:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        assert calls == ["SPY"]
+        assert len(results) == 20 and all(r is results[0] for r in results)
+        assert flight.in_flight() == 0
+
+    def test_errors_shared_and_not_cached(self):
+        """Waiters get the leader's exception; the next call after it finishes runs again"""
+        flight = SingleFlight("test")
+        calls, errors = [], []
+        release = threading.Event()
+
+        def fail():
+            calls.append(1)
+            release.wait(5)
+            raise RuntimeError("upstream down")
+
+        def call():
+            try:
+                flight.do("k", fail)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        before = _coalesced("test")
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while len(calls) + _coalesced("test") - before < 5:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert (len(calls), errors) == (1, ["upstream down"] * 5)
+
+        assert flight.do("k", lambda: "fresh") == "fresh"
+
+    def test_distinct_keys_do_not_wait(self):
+        """Different arguments are fetched independently"""
+        flight = SingleFlight("test")
+        assert [flight.do(k, str.lower, k) for k in ("A", "B")] == ["a", "b"]
+
+
+class TestCoalescedLookups:
+    """Concurrent identical dashboard requests make one upstream call"""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch):
+        calls = []
+
+        def slow_history(symbol, period="1y", interval="1d"):
+            calls.append((symbol, period, interval))
+            time.sleep(0.2)
+            return {"symbol": symbol, "period": period, "interval": interval, "data": []}
+
+        monkeypatch.setattr(PriceService, "_fetch_historical_data", staticmethod(slow_history))
+        return calls
+
+    def test_historical_endpoint(self, upstream):
+        """50 concurrent SPY requests plus one for another period cost two upstream calls"""
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(
+                    *(client.get("/api/v1/assets/SPY/historical") for _ in range(50)),
+                    client.get("/api/v1/assets/SPY/historical", params={"period": "5d"})
+                )
+
+        before = _coalesced("history")
+        responses = asyncio.run(scenario())
+        assert all(r.status_code == status.HTTP_200_OK for r in responses)
+        assert sorted(upstream) == [("SPY", "1y", "1d"), ("SPY", "5d", "1d")]
+        assert _coalesced("history") - before == 49
+        assert history_flight.in_flight() == 0
+
+    def test_sync_callers_join_async_fetch(self, upstream):
+        """A background job asking while an API request is fetching waits for the same call"""
+        async def scenario():
+            request = asyncio.ensure_future(PriceService.get_historical_data_async("QQQ"))
+            while not upstream:
+                await asyncio.sleep(0.001)
+            job = await asyncio.to_thread(PriceService.get_historical_data, "QQQ")
+            return await request, job
+
+        request, job = asyncio.run(scenario())
+        assert request is job
+        assert upstream == [("QQQ", "1y", "1d")]
@@ -0,0 +1,99 @@
+"""
+Unit tests for the slow-query log
+"""
+import json
+import ibis
+import pytest
+from fastapi import status
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.instrumentation import instrument_ibis, slow_query_log
+from app.models.portfolio import Portfolio
+
+TOKEN = "slow-secret"
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """Slow-query log that records every statement, disabled again afterwards"""
+    path = tmp_path / "slow.log"
+    slow_query_log.configure(0, str(path))
+    yield path
+    slow_query_log.configure(None, str(path))
+
+
+def _entries(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSlowQueryLog:
+    """Statements over the threshold are logged with params and plan"""
+
+    def test_sqlalchemy_statement_logged_with_plan(self, fresh_db, log_path):
+        """Bound parameters and EXPLAIN QUERY PLAN rows are captured"""
+        fresh_db.execute(text("SELECT * FROM assets WHERE symbol = :symbol"), {"symbol": "AAPL"})
+        entry = _entries(log_path)[-1]
+        assert entry["source"] == "sqlalchemy"
+        assert entry["statement"] == "SELECT * FROM assets WHERE symbol = ?"
+        assert json.loads(entry["parameters"]) == ["AAPL"]
+        assert any("USING INDEX" in row for row in entry["plan"])
+        assert entry["endpoint"] is None
+
+    def test_threshold_filters(self, fresh_db, tmp_path):
+        """Statements faster than the threshold are not written"""
+        path = tmp_path / "quiet.log"
+        slow_query_log.configure(60_000, str(path))
+        try:
+            fresh_db.execute(text("SELECT 1"))
+        finally:
+            slow_query_log.configure(None, str(path))
+        assert not path.exists() or path.read_text() == ""
+
+    def test_ibis_statement_logged(self, log_path):
+        """ibis queries are logged with their own plan"""
+        con = instrument_ibis(ibis.sqlite.connect())
+        con.raw_sql("CREATE TABLE t (x INTEGER)")
+        con.table("t").x.sum().execute()
+        entries = [e for e in _entries(log_path) if e["source"] == "ibis"]
+        select = next(e for e in entries if "SUM" in e["statement"].upper())
+        assert any("SCAN" in row for row in select["plan"])
+
+    def test_endpoint_recorded(self, fresh_client, fresh_db, log_path):
+        """Statements issued while serving a request name its route"""
+        fresh_db.add(Portfolio(name="Slow"))
+        fresh_db.commit()
+        assert fresh_client.get("/api/v1/portfolios/1").status_code == status.HTTP_200_OK
+        endpoints = {e["endpoint"] for e in _entries(log_path)}
+        assert "GET /api/v1/portfolios/{portfolio_id}" in endpoints
+
+    def test_summary_ranks_by_total_time(self, log_path):
+        """Shapes are grouped across literal values and ordered by total time"""
+        for i, duration in enumerate([0.05, 0.05, 0.05]):
+            slow_query_log.maybe_record(f"SELECT * FROM a WHERE id = {i}", None, duration, lambda: ["SCAN a"], "test")
+        slow_query_log.maybe_record("SELECT * FROM b", None, 0.12, lambda: ["SCAN b"], "test")
+        summary = slow_query_log.summary(limit=2)
+        assert [s["statement"] for s in summary] == ["SELECT * FROM a WHERE id = ?", "SELECT * FROM b"]
+        assert summary[0]["count"] == 3
+        assert summary[0]["total_ms"] == pytest.approx(150)
+        assert summary[1]["plan"] == ["SCAN b"]
+
+
+class TestSlowQueryEndpoint:
+    """Admins can read the top offenders"""
+
+    def test_disabled_log(self, client, monkeypatch):
+        """The endpoint 404s while the slow-query log is off"""
+        monkeypatch.setattr(settings, "admin_token", TOKEN)
+        response = client.get("/api/v1/admin/slow-queries", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_summary(self, client, monkeypatch, log_path):
+        """The summary lists logged statement shapes"""
+        monkeypatch.setattr(settings, "admin_token", TOKEN)
+        slow_query_log.maybe_record("SELECT * FROM c", None, 0.2, lambda: None, "test")
+        response = client.get(
+            "/api/v1/admin/slow-queries", params={"limit": 5}, headers={"X-Admin-Token": TOKEN}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "SELECT * FROM c" in [s["statement"] for s in response.json()]
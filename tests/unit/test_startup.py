@@ -0,0 +1,73 @@
+"""
+Startup regression tests: importing the app stays cheap and side-effect free
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[2]
+
+HEAVY_MODULES = ("pandas", "numpy", "ibis", "yfinance")
+
+# Generous ceiling for `import main` in a fresh interpreter; it measures about 0.7s
+# locally, against 1.4s when pandas, ibis and yfinance were imported eagerly
+IMPORT_BUDGET_SECONDS = 1.2
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_main(tmp_path, runs=3):
+    """Import main in fresh interpreters against an unused database; best of runs"""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"}
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["seconds"])
+
+
+class TestStartup:
+    """Importing main defers heavy libraries and database work"""
+
+    def test_heavy_modules_are_lazy(self, tmp_path):
+        """pandas, numpy, ibis and yfinance load on first use, not at import"""
+        assert _import_main(tmp_path, runs=1)["loaded"] == []
+
+    def test_import_does_not_touch_database(self, tmp_path):
+        """Tables are created by the lifespan, so import leaves the database alone"""
+        _import_main(tmp_path, runs=1)
+        assert not (tmp_path / "startup.db").exists()
+
+    def test_import_time_budget(self, tmp_path):
+        """`import main` stays within the startup budget"""
+        assert _import_main(tmp_path)["seconds"] < IMPORT_BUDGET_SECONDS
+
+    def test_lifespan_creates_tables(self, tmp_path, monkeypatch):
+        """Application startup creates the schema before serving requests"""
+        from app.core import database
+        from app.core.config import settings
+        from main import app
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'lifespan.db'}")
+        monkeypatch.setattr(database, "engine", engine)
+        monkeypatch.setattr("main.SessionLocal", sessionmaker(bind=engine))
+        monkeypatch.setattr(settings, "create_tables_on_startup", True)
+        with TestClient(app):
+            tables = set(inspect(engine).get_table_names())
+        engine.dispose()
+        assert {"portfolios", "assets", "holdings", "transactions"} <= tables
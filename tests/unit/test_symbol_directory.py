@@ -0,0 +1,175 @@
+"""
+Unit tests for the in-memory symbol directory
+"""
+import pytest
+from fastapi import status
+
+from app.crud.asset import asset
+from app.models.asset import AssetType
+from app.schemas.asset import AssetCreate
+from app.services import price_service
+from app.services.symbol_directory import SymbolDirectory, SymbolEntry, symbol_directory
+
+
+def entry(symbol, name, asset_type="stock", exchange="NASDAQ"):
+    return SymbolEntry(symbol, name, asset_type, exchange)
+
+
+@pytest.fixture
+def directory():
+    d = SymbolDirectory()
+    d.load([
+        entry("AAPL", "Apple Inc."),
+        entry("AA", "Alcoa Corporation", exchange="NYSE"),
+        entry("AAL", "American Airlines Group Inc."),
+        entry("MSFT", "Microsoft Corporation"),
+        entry("APLE", "Apple Hospitality REIT Inc.", exchange="NYSE"),
+    ])
+    return d
+
+
+@pytest.fixture
+def loaded_directory(fresh_db):
+    """The shared directory loaded from fresh_db, emptied again afterwards"""
+    asset.bulk_create(fresh_db, objs_in=[
+        AssetCreate(symbol="AAPL", name="Apple Inc.", asset_type=AssetType.STOCK, exchange="NASDAQ"),
+        AssetCreate(symbol="SPY", name="SPDR S&P 500 ETF Trust", asset_type=AssetType.ETF, exchange="NYSE"),
+    ])
+    symbol_directory.load_from_db(fresh_db)
+    yield symbol_directory
+    symbol_directory.load([])
+    symbol_directory.loaded = False
+
+
+class TestSymbolDirectory:
+    """Test directory lookups"""
+
+    def test_get(self, directory):
+        """Test exact lookups are case-insensitive"""
+        assert directory.get("aapl").name == "Apple Inc."
+        assert directory.get("AAP") is None
+
+    def test_prefix_search_order(self, directory):
+        """Test exact match, then symbol prefixes, then name word prefixes"""
+        assert [e.symbol for e in directory.search("aa")] == ["AA", "AAL", "AAPL"]
+        assert [e.symbol for e in directory.search("app")] == ["AAPL", "APLE"]
+        assert [e.symbol for e in directory.search("corp")] == ["AA", "MSFT"]
+
+    def test_limit(self, directory):
+        assert len(directory.search("a", limit=2)) == 2
+        assert directory.search("   ") == []
+
+    def test_incremental_upsert_and_remove(self, directory):
+        """Test writes keep the arrays sorted and the name index consistent"""
+        directory.upsert([entry("AAPL", "Pineapple Computer"), entry("AB", "AllianceBernstein")])
+        assert [e.symbol for e in directory.search("aa")] == ["AA", "AAL", "AAPL"]
+        assert directory.get("AB").name == "AllianceBernstein"
+        assert [e.symbol for e in directory.search("pineapple")] == ["AAPL"]
+        assert [e.symbol for e in directory.search("apple")] == ["APLE"]
+
+        directory.remove(["AAL"])
+        assert directory.get("AAL") is None
+        assert directory.search("american") == []
+        assert len(directory) == 5
+
+    def test_listing_file(self, fresh_db, tmp_path):
+        """Test listing entries load first and database rows override them"""
+        listing = tmp_path / "listing.csv"
+        listing.write_text(
+            "symbol,name,asset_type,exchange\n"
+            "VOO,Vanguard S&P 500 ETF,etf,NYSE\n"
+            "AAPL,Old Apple Name,stock,NASDAQ\n"
+        )
+        asset.bulk_create(fresh_db, objs_in=[
+            AssetCreate(symbol="AAPL", name="Apple Inc.", asset_type=AssetType.STOCK)
+        ])
+        d = SymbolDirectory()
+        assert d.load_from_db(fresh_db, listing_path=str(listing)) == 2
+        assert d.get("VOO").asset_type == "etf"
+        assert d.get("AAPL").name == "Apple Inc."
+
+
+class TestDirectoryFollowsAssetWrites:
+    """Test CRUDAsset writes update the shared directory"""
+
+    def test_create_update_remove(self, fresh_db, loaded_directory):
+        created = asset.create(fresh_db, obj_in=AssetCreate(
+            symbol="MSFT", name="Microsoft Corporation", asset_type=AssetType.STOCK
+        ))
+        assert loaded_directory.get("MSFT") is not None
+
+        asset.update(fresh_db, db_obj=created, obj_in={"symbol": "MSFT2", "name": "Renamed"})
+        assert loaded_directory.get("MSFT") is None
+        assert loaded_directory.get("MSFT2").name == "Renamed"
+
+        asset.remove(fresh_db, id=created.id)
+        assert loaded_directory.get("MSFT2") is None
+
+    def test_bulk_writes(self, fresh_db, loaded_directory):
+        asset.upsert(
+            fresh_db,
+            objs_in=[{"symbol": "SPY", "name": "SPDR Trust", "asset_type": AssetType.ETF},
+                     {"symbol": "QQQ", "name": "Invesco QQQ", "asset_type": AssetType.ETF}],
+            index_elements=["symbol"],
+        )
+        assert loaded_directory.get("SPY").name == "SPDR Trust"
+        assert loaded_directory.get("QQQ").asset_type == "etf"
+
+        spy = asset.get_by_symbol(fresh_db, symbol="SPY")
+        asset.bulk_update(fresh_db, values_by_id={spy.id: {"exchange": "ARCA"}})
+        assert loaded_directory.get("SPY").exchange == "ARCA"
+
+
+class TestDirectoryEndpoints:
+    """Test typeahead served from the directory"""
+
+    def test_typeahead(self, fresh_client, loaded_directory):
+        response = fresh_client.get("/api/v1/assets/typeahead", params={"q": "sp"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["symbol"] == "SPY"
+
+    def test_lookup_keeps_full_info(self, fresh_client, loaded_directory, monkeypatch):
+        """Lookup answers with the provider's full record, fetched once per symbol"""
+        info = {"symbol": "AAPL", "name": "Apple Inc.", "asset_type": "stock", "exchange": "NASDAQ",
+                "currency": "USD", "current_price": 150.0, "sector": "Technology", "industry": "Hardware"}
+        calls = []
+
+        class Provider:
+            def info(self, symbol):
+                calls.append(symbol)
+                return info
+
+        monkeypatch.setattr(price_service, "get_provider", lambda: Provider())
+        for _ in range(2):
+            response = fresh_client.get("/api/v1/assets/lookup/aapl")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == info
+        assert calls == ["aapl"]
+
+    def test_lookup_refetches_after_ttl(self, fresh_client, monkeypatch):
+        """An expired record is fetched from the provider again"""
+        calls = []
+
+        class Provider:
+            def info(self, symbol):
+                calls.append(symbol)
+                return {"symbol": "AAPL", "name": "Apple Inc.", "asset_type": "stock"}
+
+        monkeypatch.setattr(price_service, "get_provider", lambda: Provider())
+        monkeypatch.setattr(price_service.settings, "asset_info_cache_seconds", 0)
+        fresh_client.get("/api/v1/assets/lookup/AAPL")
+        fresh_client.get("/api/v1/assets/lookup/AAPL")
+        assert len(calls) == 2
+
+    def test_lookup_falls_back_to_directory(self, fresh_client, loaded_directory, monkeypatch):
+        """When the provider fails, lookup answers from the directory and caches nothing"""
+        class Provider:
+            def info(self, symbol):
+                raise RuntimeError("upstream down")
+
+        monkeypatch.setattr(price_service, "get_provider", lambda: Provider())
+        response = fresh_client.get("/api/v1/assets/lookup/spy")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"symbol": "SPY", "name": "SPDR S&P 500 ETF Trust", "asset_type": "etf",
+                                   "exchange": "NYSE", "currency": "USD"}
+        assert price_service.info_cache.get("SPY") is None
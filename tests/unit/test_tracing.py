@@ -0,0 +1,172 @@
+"""
+Unit tests for request tracing
+"""
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import ibis
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import holdings
+from app.core.database import get_db
+from app.core.tracing import (
+    BatchExporter, JsonlExporter, OtlpHttpExporter, Trace, TracingMiddleware, _current_span,
+    _current_trace, span, stage_breakdown, trace_ibis
+)
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+
+
+@pytest.fixture
+def traces_path(tmp_path):
+    return tmp_path / "traces.jsonl"
+
+
+@pytest.fixture
+def traced_client(fresh_db, traces_path):
+    """Holdings router behind TracingMiddleware, exporting to a JSONL file"""
+    exporter = BatchExporter(JsonlExporter(str(traces_path)))
+    app = FastAPI()
+    app.include_router(holdings.router, prefix="/api/v1/holdings")
+    app.add_middleware(TracingMiddleware, exporter=exporter)
+    app.dependency_overrides[get_db] = lambda: fresh_db
+    portfolio = Portfolio(name="Traced")
+    fresh_db.add(portfolio)
+    fresh_db.flush()
+    for i in range(3):
+        a = Asset(symbol=f"TR{i}", name=f"Traced {i}", asset_type=AssetType.STOCK)
+        fresh_db.add(a)
+        fresh_db.flush()
+        fresh_db.add(Holding(
+            portfolio_id=portfolio.id, asset_id=a.id, quantity=Decimal("1"), average_cost=Decimal("1")
+        ))
+    fresh_db.commit()
+    with TestClient(app) as client:
+        yield client, exporter
+
+
+def _with_trace(trace):
+    """Make trace current, returning a function that restores the previous state"""
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+
+    def reset():
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+    return reset
+
+
+class TestSpans:
+    """Spans nest under the current span and are no-ops outside a trace"""
+
+    def test_noop_without_trace(self):
+        """span() yields None when no request is being traced"""
+        with span("anything") as s:
+            assert s is None
+
+    def test_nesting_and_errors(self):
+        """Child spans point at their parent and record exceptions"""
+        trace = Trace("test")
+        reset = _with_trace(trace)
+        try:
+            with span("outer") as outer:
+                with pytest.raises(ValueError):
+                    with span("inner"):
+                        raise ValueError("boom")
+        finally:
+            reset()
+        spans = {s["name"]: s for s in trace.as_dict()["spans"]}
+        assert spans["outer"]["parent_id"] == trace.root.span_id
+        assert spans["inner"]["parent_id"] == outer.span_id
+        assert spans["inner"]["error"] == "ValueError: boom"
+
+
+class TestTracingMiddleware:
+    """Requests are traced through the endpoint, its queries and serialization"""
+
+    def test_request_trace_exported(self, traced_client, traces_path):
+        """The exported trace has endpoint, db.query and serialize spans"""
+        client, exporter = traced_client
+        response = client.get("/api/v1/holdings/")
+        assert response.status_code == status.HTTP_200_OK
+        exporter.flush()
+
+        trace = json.loads(traces_path.read_text().splitlines()[-1])
+        assert trace["trace_id"] == response.headers["x-trace-id"]
+        assert trace["name"] == "GET /api/v1/holdings/"
+        assert trace["attributes"]["http.status_code"] == 200
+        spans = {s["name"]: s for s in trace["spans"]}
+        assert spans["endpoint"]["attributes"]["function"] == "read_holdings"
+        assert spans["db.query"]["parent_id"] == spans["endpoint"]["span_id"]
+        assert spans["db.query"]["attributes"]["statement"].startswith("SELECT holdings.id")
+        assert spans["serialize"]["start_ms"] >= spans["endpoint"]["start_ms"]
+
+    def test_stage_breakdown(self, traced_client, traces_path):
+        """The JSONL file aggregates into per-route stage means"""
+        client, exporter = traced_client
+        for _ in range(3):
+            client.get("/api/v1/holdings/")
+        exporter.flush()
+        summary = stage_breakdown(str(traces_path))
+        route = summary["GET /api/v1/holdings/"]
+        assert route["requests"] == 3
+        assert {"endpoint", "db.query", "serialize"} <= set(route["stage_mean_ms"])
+
+
+class TestIbisTracing:
+    """ibis execute() is split into compile, execute and materialize spans"""
+
+    def test_ibis_stages(self):
+        """Each stage of an ibis query shows up as its own span"""
+        con = trace_ibis(ibis.sqlite.connect())
+        con.raw_sql("CREATE TABLE t (x INTEGER)")
+        trace = Trace("test")
+        reset = _with_trace(trace)
+        try:
+            with span("analytics.test"):
+                con.table("t").x.sum().execute()
+        finally:
+            reset()
+        names = [s.name for s in trace.spans]
+        assert {"ibis.compile", "ibis.execute", "ibis.materialize"} <= set(names)
+
+
+class TestOtlpExporter:
+    """Traces are posted as OTLP/HTTP JSON"""
+
+    def test_posts_resource_spans(self):
+        """The collector receives every span with trace and parent ids"""
+        received = []
+
+        class Collector(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Collector)
+        thread = threading.Thread(target=server.handle_request, daemon=True)
+        thread.start()
+        try:
+            trace = Trace("GET /x")
+            child = trace.start_span("db.query", None, statement="SELECT 1")
+            child.finish()
+            trace.root.finish()
+            OtlpHttpExporter(f"http://127.0.0.1:{server.server_port}/v1/traces").export([trace])
+            thread.join(timeout=5)
+        finally:
+            server.server_close()
+
+        spans = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["GET /x", "db.query"]
+        assert all(s["traceId"] == trace.trace_id for s in spans)
+        assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+        assert spans[1]["attributes"] == [{"key": "statement", "value": {"stringValue": "SELECT 1"}}]
@@ -0,0 +1,143 @@
+"""
+Unit tests for the startup warm-up and readiness check
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.asset import Asset, AssetType
+from app.models.holding import Holding
+from app.models.portfolio import Portfolio
+from app.models.transaction import Transaction, TransactionType
+from app.services import analytics_service
+from app.services.portfolio_service import PortfolioService
+from app.services.price_service import PriceService
+from app.services.symbol_directory import symbol_directory
+from app.services.warmup import Warmup, warmup
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """File-backed database shared with ibis: portfolio 2 trades more than portfolio 1"""
+    path = tmp_path / "warmup.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(analytics_service, "get_db_url", lambda: f"sqlite:///{path}")
+    session = sessionmaker(bind=engine)()
+
+    assets = [
+        Asset(symbol="WARM", name="Warm Corp", asset_type=AssetType.STOCK, current_price=Decimal("10")),
+        Asset(symbol="USD", name="Cash", asset_type=AssetType.CASH, current_price=Decimal("1")),
+    ]
+    portfolios = [Portfolio(name="Quiet"), Portfolio(name="Busy"), Portfolio(name="Empty")]
+    session.add_all(assets + portfolios)
+    session.flush()
+    for p, trades in zip(portfolios[:2], (1, 3)):
+        for a in assets:
+            session.add(Holding(portfolio_id=p.id, asset_id=a.id, quantity=Decimal("2"), average_cost=Decimal("5")))
+        for _ in range(trades):
+            session.add(Transaction(
+                portfolio_id=p.id, asset_id=assets[0].id, transaction_type=TransactionType.BUY,
+                quantity=Decimal("1"), price=Decimal("5"), total_amount=Decimal("5"),
+                transaction_date=datetime(2024, 1, 1)
+            ))
+    session.commit()
+    yield session
+    session.close()
+    symbol_directory.load([])
+    symbol_directory.loaded = False
+    analytics_service.close_analytics()
+    engine.dispose()
+
+
+class TestWarmup:
+    """Warm-up steps are timed, recorded and never block readiness"""
+
+    def test_steps_recorded(self, db):
+        """Each enabled step reports its count and duration, then the app is ready"""
+        state = Warmup()
+        assert not state.ready
+        state.run(db, valuation_portfolios=5)
+        assert state.ready
+        steps = state.as_dict()["steps"]
+        assert steps["symbol_directory"]["count"] == 2
+        assert steps["analytics"]["count"] == 4
+        assert steps["valuations"]["count"] == 2
+        assert "prices" not in steps
+        assert all("error" not in step and step["duration_ms"] >= 0 for step in steps.values())
+
+    def test_most_active_portfolios(self, db):
+        """Portfolios with holdings are ordered by transaction count"""
+        assert Warmup.most_active_portfolios(db, 5) == [2, 1]
+        assert Warmup.most_active_portfolios(db, 1) == [2]
+
+    def test_most_active_ignores_holding_count(self, db):
+        """Many holdings with one trade do not outrank few holdings with many trades"""
+        quiet = db.get(Portfolio, 1)
+        for i in range(10):
+            extra = Asset(symbol=f"X{i}", name=f"Extra {i}", asset_type=AssetType.STOCK)
+            db.add(extra)
+            db.flush()
+            db.add(Holding(portfolio_id=quiet.id, asset_id=extra.id, quantity=Decimal("1"), average_cost=Decimal("1")))
+        db.commit()
+        assert Warmup.most_active_portfolios(db, 5) == [2, 1]
+
+    def test_requests_reuse_warm_state(self, db):
+        """The first valuation after warm-up comes from the shared service's cache, until a holding changes"""
+        Warmup().run(db, symbols=False, analytics=True, valuation_portfolios=2)
+        analytics = analytics_service.get_analytics()
+        assert set(analytics._tables) >= {"holdings", "assets", "transactions"}
+        warmed = PortfolioService.calculate_portfolio_value(db, 2)
+
+        def cold(portfolio_id):
+            raise AssertionError("valuation was not served from the warm-up")
+        analytics.get_portfolio_value_analysis = cold
+        try:
+            assert PortfolioService.calculate_portfolio_value(db, 2) is warmed
+        finally:
+            del analytics.get_portfolio_value_analysis
+
+        db.query(Holding).filter(Holding.portfolio_id == 2).first().quantity = Decimal("5")
+        db.commit()
+        assert analytics_service.get_analytics() is analytics
+        assert PortfolioService.calculate_portfolio_value(db, 2)["total_value"] == warmed["total_value"] + 30
+
+    def test_prices_refresh_held_tradeable_assets(self, db, monkeypatch):
+        """Only held non-cash assets are refreshed, and a failure is recorded, not raised"""
+        requested = []
+
+        def fail(db, asset_ids=None):
+            requested.append(asset_ids)
+            raise RuntimeError("provider down")
+        monkeypatch.setattr(PriceService, "update_asset_prices", fail)
+
+        state = Warmup()
+        state.run(db, symbols=False, prices=True, analytics=False)
+        assert requested == [[1]]
+        assert state.ready
+        assert state.as_dict()["steps"]["prices"]["error"] == "RuntimeError: provider down"
+
+
+class TestReadiness:
+    """/ready reports 503 until warm-up finishes"""
+
+    def test_ready_after_startup(self, client):
+        """The lifespan runs the warm-up before serving requests"""
+        response = client.get("/ready")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "ready"
+
+    def test_not_ready_while_warming(self, client):
+        """A pending warm-up answers 503 while liveness stays healthy"""
+        warmup.reset()
+        try:
+            response = client.get("/ready")
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert response.json()["status"] == "pending"
+            assert client.get("/health").status_code == status.HTTP_200_OK
+        finally:
+            warmup.status = "ready"